@@ -1,21 +1,26 @@
 import os
+import time
 from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from dotenv import load_dotenv
 
+# Measured from here so cold-start time can be compared across configurations
+_import_started = time.perf_counter()
+
 from models.db import db
 from models.user import User
 from models.task import Task
 from models.habit import Habit
 from models.habit_progress import HabitProgress
+from models.user_profile import UserProfile
+from models.ai_user_profile import AIUserProfile
 
 from routes.auth import auth_bp
 from routes.tasks import tasks_bp
 from routes.habits import habits_bp
 from routes.habit_progress import habit_progress_bp
-from routes.nlp import nlp_bp
 
 # Load environment variables
 load_dotenv()
@@ -47,7 +52,23 @@ app.register_blueprint(auth_bp, url_prefix='/api/auth')
 app.register_blueprint(tasks_bp, url_prefix='/api/tasks')
 app.register_blueprint(habits_bp, url_prefix='/api/habits')
 app.register_blueprint(habit_progress_bp, url_prefix='/api/habit-progress')
-app.register_blueprint(nlp_bp, url_prefix='/api/nlp')
+
+# The NLP blueprint is optional, so workers that only serve tasks and auth
+# never import spaCy. When enabled, models load on first use unless
+# NLP_WARMUP asks for them at startup.
+NLP_ENABLED = os.environ.get('ENABLE_NLP', 'True') == 'True'
+NLP_WARMUP = os.environ.get('NLP_WARMUP', 'False') == 'True'
+if NLP_ENABLED:
+    from routes.nlp import nlp_bp, warm_up
+    app.register_blueprint(nlp_bp, url_prefix='/api/nlp')
+    if NLP_WARMUP:
+        # The ML predictor binds its profile store to the app's database
+        with app.app_context():
+            warm_up()
+
+NLP_MODE = 'disabled' if not NLP_ENABLED else 'warm' if NLP_WARMUP else 'lazy'
+STARTUP_SECONDS = round(time.perf_counter() - _import_started, 3)
+print(f"Flask backend ready in {STARTUP_SECONDS:.2f}s (NLP {NLP_MODE})")
 
 # Health check endpoint
 @app.route('/api/health', methods=['GET'])
@@ -55,7 +76,9 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'name': 'ProdigyAI Flask Backend',
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'nlp': NLP_MODE,
+        'startup_seconds': STARTUP_SECONDS
     })
 
 # Error handlers
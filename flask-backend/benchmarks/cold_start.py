@@ -0,0 +1,45 @@
+"""
+Measure Flask backend cold-start time and memory per NLP mode
+
+Imports app.py in a fresh interpreter for each configuration and reports
+wall time, the startup time the app measured itself, and peak RSS.
+
+Usage (from flask-backend/):
+    python -m benchmarks.cold_start
+"""
+import os
+import resource
+import subprocess
+import sys
+import time
+
+MODES = {
+    'disabled': {'ENABLE_NLP': 'False', 'NLP_WARMUP': 'False'},
+    'lazy': {'ENABLE_NLP': 'True', 'NLP_WARMUP': 'False'},
+    'warm': {'ENABLE_NLP': 'True', 'NLP_WARMUP': 'True'},
+}
+
+SCRIPT = "import app; print('STARTUP', app.STARTUP_SECONDS)"
+
+
+def run_mode(env_overrides):
+    env = dict(os.environ, **env_overrides)
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', SCRIPT], env=env, capture_output=True, text=True, check=True).stdout
+    wall = time.perf_counter() - start
+    # ru_maxrss of children is the largest child so far, in KiB on Linux
+    peak_kib = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    startup = next(line.split()[1] for line in output.splitlines() if line.startswith('STARTUP'))
+    return wall, float(startup), peak_kib / 1024
+
+
+def main():
+    print(f"{'mode':>9} {'wall s':>8} {'startup s':>10} {'peak RSS MB':>12}")
+    # Run the lightest mode first so the children's peak RSS stays meaningful
+    for mode, env in MODES.items():
+        wall, startup, rss_mb = run_mode(env)
+        print(f"{mode:>9} {wall:>8.2f} {startup:>10.2f} {rss_mb:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark intent detection latency as intents.json grows
+
+Compares the original per-pattern Doc.similarity loop with the precomputed
+IntentIndex on synthetic intent sets of increasing size.
+
+Usage (from flask-backend/):
+    python -m benchmarks.intent_detection
+"""
+import time
+
+import spacy
+
+from services.intent_index import IntentIndex
+
+UTTERANCES = [
+    "add task buy milk tomorrow",
+    "remind me to call the dentist",
+    "track habit drink water",
+    "good morning",
+    "show my tasks for today",
+]
+
+BASE_PATTERNS = [
+    "add task", "create task", "new task", "remind me to", "track habit",
+    "new habit", "show my tasks", "list tasks", "hello", "goodbye",
+]
+
+
+def build_intents(intent_count, patterns_per_intent=6):
+    """Build a synthetic intents definition of the requested size"""
+    intents = []
+    for i in range(intent_count):
+        patterns = [
+            f"{BASE_PATTERNS[(i + j) % len(BASE_PATTERNS)]} item{i}"
+            for j in range(patterns_per_intent)
+        ]
+        intents.append({"tag": f"intent_{i}", "patterns": patterns, "responses": ["ok"]})
+    return {"intents": intents}
+
+
+def naive_detect(nlp, intents, text):
+    """The original scorer: parse and compare every pattern on every call"""
+    doc = nlp(text.lower())
+    max_score = 0
+    best_intent = None
+    for intent in intents['intents']:
+        scores = [doc.similarity(nlp(pattern.lower())) for pattern in intent['patterns']]
+        if scores:
+            avg_score = sum(scores) / len(scores)
+            if avg_score > max_score:
+                max_score = avg_score
+                best_intent = intent
+    return best_intent, max_score
+
+
+def indexed_detect(nlp, index, text):
+    """The indexed scorer: one parse and one matrix-vector product"""
+    return index.best_match(nlp(text.lower()).vector)
+
+
+def time_per_call(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for text in UTTERANCES:
+            fn(text)
+    return (time.perf_counter() - start) * 1000 / (repeats * len(UTTERANCES))
+
+
+def main():
+    nlp = spacy.load("en_core_web_md")
+
+    print(f"{'intents':>8} {'patterns':>9} {'naive ms':>10} {'index ms':>10} {'speedup':>8} {'agree':>6}")
+    for intent_count in (4, 16, 64, 256):
+        intents = build_intents(intent_count)
+        index = IntentIndex(nlp, intents)
+
+        agree = all(
+            (naive_detect(nlp, intents, text)[0] or {}).get('tag')
+            == (indexed_detect(nlp, index, text)[0] or {}).get('tag')
+            for text in UTTERANCES
+        )
+
+        naive_ms = time_per_call(lambda text: naive_detect(nlp, intents, text), repeats=1)
+        index_ms = time_per_call(lambda text: indexed_detect(nlp, index, text), repeats=20)
+        pattern_count = sum(len(intent['patterns']) for intent in intents['intents'])
+
+        print(f"{intent_count:>8} {pattern_count:>9} {naive_ms:>10.2f} {index_ms:>10.2f} "
+              f"{naive_ms / index_ms:>7.1f}x {str(agree):>6}")
+
+
+if __name__ == '__main__':
+    main()
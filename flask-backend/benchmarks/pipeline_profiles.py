@@ -0,0 +1,43 @@
+"""
+Benchmark spaCy latency for each pipeline profile
+
+Parses the same texts with every profile in PIPELINE_PROFILES, one call at a
+time and through nlp.pipe, and prints the mean per-document latency.
+
+Usage (from flask-backend/):
+    python -m benchmarks.pipeline_profiles
+"""
+import time
+
+from services.model_registry import get_model
+from services.pipeline_profiles import PIPELINE_PROFILES, disabled_components
+
+TEXTS = [
+    "add task finish the quarterly report by friday at 5pm",
+    "remind me to call John tomorrow morning about the budget",
+    "I feel overwhelmed and stressed, there is too much work this week",
+    "track habit read for 30 minutes every evening",
+    "schedule a high priority meeting with the design team next Monday",
+] * 20
+
+
+def mean_ms(fn, docs):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000 / docs
+
+
+def main():
+    nlp = get_model("en_core_web_md")
+    print(f"pipeline: {', '.join(nlp.pipe_names)}\n")
+    print(f"{'profile':>14} {'disabled':>40} {'call ms/doc':>12} {'pipe ms/doc':>12}")
+
+    for profile in PIPELINE_PROFILES:
+        disabled = disabled_components(nlp, profile)
+        single = mean_ms(lambda: [nlp(text, disable=disabled) for text in TEXTS], len(TEXTS))
+        piped = mean_ms(lambda: list(nlp.pipe(TEXTS, disable=disabled)), len(TEXTS))
+        print(f"{profile:>14} {','.join(disabled) or '-':>40} {single:>12.3f} {piped:>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark lexicon sentiment scoring against text length
+
+Compares the original per-token, per-word Token.similarity loop with the
+matrix product used by SentimentAnalyzer, and checks both give the same
+positive and negative counts.
+
+Usage (from flask-backend/):
+    python -m benchmarks.sentiment_lexicon
+"""
+import time
+
+from services.sentiment_service import SentimentAnalyzer
+from services.vectors import token_matrix
+
+WORDS = ("I feel great about the project but the deadline makes me anxious and "
+         "tired while the team is excited and confident about the launch").split()
+
+
+def make_text(length):
+    return ' '.join(WORDS[i % len(WORDS)] for i in range(length))
+
+
+def loop_counts(analyzer, tokens):
+    """The original scorer: one Token.similarity call per token and lexicon word"""
+    positive = negative = 0
+    for token in tokens:
+        if any(token.similarity(analyzer.nlp(word)) > 0.7 for word in analyzer.emotion_lexicon['positive']):
+            positive += 1
+        elif any(token.similarity(analyzer.nlp(word)) > 0.7 for word in analyzer.emotion_lexicon['negative']):
+            negative += 1
+    return positive, negative
+
+
+def matrix_counts(analyzer, tokens):
+    """The vectorized scorer: one matrix product per polarity"""
+    vectors = token_matrix(tokens, analyzer.nlp.vocab.vectors_length)
+    is_positive = (vectors @ analyzer.polarity_matrices['positive'].T > 0.7).any(axis=1)
+    is_negative = (vectors @ analyzer.polarity_matrices['negative'].T > 0.7).any(axis=1) & ~is_positive
+    return int(is_positive.sum()), int(is_negative.sum())
+
+
+def mean_ms(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return (time.perf_counter() - start) * 1000 / repeats, result
+
+
+def main():
+    analyzer = SentimentAnalyzer()
+    print(f"{'tokens':>7} {'loop ms':>10} {'matrix ms':>10} {'speedup':>8} {'agree':>6}")
+    for length in (5, 15, 30, 60, 120):
+        doc = analyzer.nlp.make_doc(make_text(length))
+        tokens = [token for token in doc if not token.is_stop and not token.is_punct]
+        loop_ms, loop_result = mean_ms(lambda: loop_counts(analyzer, tokens), repeats=1)
+        matrix_ms, matrix_result = mean_ms(lambda: matrix_counts(analyzer, tokens), repeats=50)
+        print(f"{length:>7} {loop_ms:>10.2f} {matrix_ms:>10.3f} {loop_ms / matrix_ms:>7.0f}x "
+              f"{str(loop_result == matrix_result):>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Give the Python AI service its own ai_user_profiles table
+
+Both services used to write user_profiles, each with its own profile
+shape. AI service profiles (the ones with time_patterns) move to
+ai_user_profiles, and both tables get their users foreign key.
+
+On an empty database there is nothing to split: the application creates
+every table, these included, when it starts.
+
+Revision ID: 3f9c2a7d1b4e
+Revises:
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+import json
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a7d1b4e'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+PROFILE_TABLES = ('user_profiles', 'ai_user_profiles')
+
+
+def _profile_table(name):
+    return sa.table(
+        name,
+        sa.column('id', sa.Integer),
+        sa.column('userId', sa.Integer),
+        sa.column('profile', sa.JSON),
+        sa.column('createdAt', sa.DateTime),
+        sa.column('updatedAt', sa.DateTime)
+    )
+
+
+def _create_profile_table(name):
+    op.create_table(
+        name,
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('userId', sa.Integer(), nullable=False),
+        sa.Column('profile', mysql.JSON(), nullable=False),
+        sa.Column('createdAt', sa.DateTime(), nullable=True),
+        sa.Column('updatedAt', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['userId'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('userId')
+    )
+
+
+def _has_users_foreign_key(inspector, name):
+    return any(key['referred_table'] == 'users' for key in inspector.get_foreign_keys(name))
+
+
+def _move_profiles(source, target, belongs_in_target):
+    """Move the rows of source whose profile belongs_in_target, unless target already has the user"""
+    connection = op.get_bind()
+    source_table, target_table = _profile_table(source), _profile_table(target)
+    taken = {row.userId for row in connection.execute(sa.select(target_table.c.userId))}
+    rows = connection.execute(sa.select(source_table)).fetchall()
+    now = datetime.utcnow()
+    for row in rows:
+        profile = json.loads(row.profile) if isinstance(row.profile, str) else row.profile
+        if not belongs_in_target(profile):
+            continue
+        if row.userId not in taken:
+            connection.execute(target_table.insert().values(
+                userId=row.userId, profile=profile, createdAt=row.createdAt or now, updatedAt=now))
+        connection.execute(source_table.delete().where(source_table.c.id == row.id))
+
+
+def _is_ai_profile(profile):
+    return isinstance(profile, dict) and 'time_patterns' in profile
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    if 'users' not in tables:
+        return
+
+    for name in PROFILE_TABLES:
+        if name not in tables:
+            _create_profile_table(name)
+        elif not _has_users_foreign_key(inspector, name):
+            # Created by the AI service without the foreign key; drop the
+            # profiles of users that no longer exist first
+            op.execute(f'DELETE FROM {name} WHERE userId NOT IN (SELECT id FROM users)')
+            op.create_foreign_key(f'fk_{name}_users', name, 'users', ['userId'], ['id'])
+
+    _move_profiles('user_profiles', 'ai_user_profiles', _is_ai_profile)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'ai_user_profiles' not in inspector.get_table_names():
+        return
+    if 'user_profiles' in inspector.get_table_names():
+        _move_profiles('ai_user_profiles', 'user_profiles', _is_ai_profile)
+    op.drop_table('ai_user_profiles')
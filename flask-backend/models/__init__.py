@@ -2,6 +2,8 @@ from .user import User
 from .task import Task
 from .habit import Habit
 from .habit_progress import HabitProgress
+from .user_profile import UserProfile
+from .ai_user_profile import AIUserProfile
 from .db import db
 
-__all__ = ['User', 'Task', 'Habit', 'HabitProgress', 'db'] 
\ No newline at end of file
+__all__ = ['User', 'Task', 'Habit', 'HabitProgress', 'UserProfile', 'AIUserProfile', 'db'] 
\ No newline at end of file
@@ -35,6 +35,8 @@ class User(db.Model):
     # Relationships
     tasks = db.relationship('Task', backref='user', lazy=True, cascade="all, delete-orphan")
     habits = db.relationship('Habit', backref='user', lazy=True, cascade="all, delete-orphan")
+    profile = db.relationship('UserProfile', backref='user', lazy=True, uselist=False, cascade="all, delete-orphan")
+    ai_profile = db.relationship('AIUserProfile', backref='user', lazy=True, uselist=False, cascade="all, delete-orphan")
     
     def __init__(self, name, email, password, **kwargs):
         self.name = name
@@ -0,0 +1,28 @@
+from datetime import datetime
+from sqlalchemy.dialects.mysql import JSON
+from .db import db
+
+class UserProfile(db.Model):
+    __tablename__ = 'user_profiles'
+
+    id = db.Column(db.Integer, primary_key=True)
+    userId = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, unique=True)
+    profile = db.Column(JSON, nullable=False, default={})
+    createdAt = db.Column(db.DateTime, default=datetime.utcnow)
+    updatedAt = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __init__(self, userId, profile, **kwargs):
+        self.userId = userId
+        self.profile = profile
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    def to_dict(self):
+        """Convert the user profile object to a dictionary"""
+        return {
+            'id': self.id,
+            'userId': self.userId,
+            'profile': self.profile,
+            'createdAt': self.createdAt.isoformat() if self.createdAt else None,
+            'updatedAt': self.updatedAt.isoformat() if self.updatedAt else None
+        }
@@ -1,16 +1,136 @@
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
-from services.nlp_service import NLPService
-from services.sentiment_service import SentimentAnalyzer
 from services.ml_service import MLPredictor
+from services.lazy_service import LazyService
+from services.model_registry import model_registry
+from services.nlp_executor import NLPExecutor, QueueFullError, WorkersUnavailableError
+from services.single_flight import single_flight
+from services.text_normalization import normalize_text
+from services.task_suggestions import suggestion_engine
+from services.pipeline_profiles import profile_timings, widest_profile
+from services.user_profiles import profile_store
+from utils.auth import admin_required
+from utils.validation import validate_integer_range
 
 nlp_bp = Blueprint('nlp', __name__)
 
-# Initialize services
-nlp_service = NLPService()
-sentiment_analyzer = SentimentAnalyzer()
-ml_predictor = MLPredictor()
+def _create_nlp_service():
+    from services.nlp_service import NLPService
+    return NLPService()
+
+def _create_sentiment_analyzer():
+    from services.sentiment_service import SentimentAnalyzer
+    return SentimentAnalyzer()
+
+def _create_ml_predictor():
+    """ML predictor with profiles in the app's database and learned task patterns"""
+    return MLPredictor(profile_store.get(), suggestion_engine.get())
+
+# Services are built on first use (or by warm_up), and their modules
+# imported then, so importing this blueprint does not load spaCy; with
+# NLP_WORKERS set, this process never does
+nlp_service = LazyService('nlp', _create_nlp_service)
+sentiment_analyzer = LazyService('sentiment', _create_sentiment_analyzer)
+ml_predictor = LazyService('ml', _create_ml_predictor)
+SERVICES = (nlp_service, sentiment_analyzer, ml_predictor)
+
+# With NLP_WORKERS > 0, spaCy work runs on worker processes instead of the
+# request thread
+nlp_executor = NLPExecutor.from_env()
+
+# Batch endpoint limits
+BATCH_OPERATIONS = ('analyze', 'entities', 'sentiment', 'parse-command')
+OPERATION_PROFILES = {
+    'analyze': 'full',
+    'entities': 'ner-only',
+    'sentiment': 'vectors-only',
+    'parse-command': 'ner-only'
+}
+MAX_BATCH_ITEMS = 1000
+MAX_BATCH_PROCESSES = 4
+
+def warm_up():
+    """
+    Load every NLP service now instead of on the first request
+    
+    Returns:
+        dict: Seconds spent loading each service
+    """
+    if nlp_executor.enabled:
+        start = time.perf_counter()
+        nlp_executor.start()
+        ml_predictor.get()
+        return {'workers': round(time.perf_counter() - start, 3), 'ml': ml_predictor.load_seconds}
+    
+    for service in SERVICES:
+        service.get()
+    return {service.name: service.load_seconds for service in SERVICES}
+
+# Methods whose results are computed from whitespace-normalized text, so
+# requests differing only in whitespace can share a computation
+NORMALIZED_METHODS = ('extract_entities', 'process')
+
+# NLP service methods whose results depend on the loaded intents
+INTENT_METHODS = ('process',)
+
+def _intents_key(service, method):
+    """
+    The intents a method's result depends on, or None if it does not
+    
+    Before the NLP service has loaded this is the same as right after, so
+    the requests of a cold-start burst share the computation that loads it.
+    """
+    if service is not nlp_service or method not in INTENT_METHODS:
+        return None
+    # Workers reload intents by being replaced
+    if nlp_executor.enabled:
+        return ('workers', nlp_executor.generation)
+    return ('reloads', nlp_service.get().intents_reloads if nlp_service.loaded else 0)
+
+def _run_nlp(service, method, text):
+    """
+    Run a service method on the worker pool when enabled, else in this thread
+    
+    Concurrent requests for the same method and text (and, for intent
+    methods, the same intents) wait on one computation instead of each
+    running the pipeline.
+    """
+    if not isinstance(text, str):
+        # Left to the service to reject
+        return _call_nlp(service, method, text)
+    key_text = normalize_text(text) if method in NORMALIZED_METHODS else text
+    key = (_intents_key(service, method), key_text)
+    return single_flight.do(f'{service.name}.{method}', key, _call_nlp, service, method, text)
+
+def _call_nlp(service, method, *args):
+    if nlp_executor.enabled:
+        return nlp_executor.call(service.name, method, *args)
+    return getattr(service.get(), method)(*args)
+
+@nlp_bp.errorhandler(QueueFullError)
+def queue_full(e):
+    """Reject quickly when every NLP worker is busy and the queue is full"""
+    response = jsonify({'error': 'NLP service is busy, please retry'})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+@nlp_bp.errorhandler(WorkersUnavailableError)
+def workers_unavailable(e):
+    """Ask the client to retry while dead or replaced NLP workers are restarted"""
+    response = jsonify({'error': 'NLP service is restarting, please retry'})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+@nlp_bp.errorhandler(FutureTimeoutError)
+def nlp_timeout(e):
+    """Report NLP work that did not finish within the executor timeout"""
+    return jsonify({'error': 'NLP request timed out'}), 504
 
 @nlp_bp.route('/analyze-text', methods=['POST'])
 @jwt_required()
@@ -21,7 +141,7 @@ def analyze_text():
         return jsonify({'error': 'Text is required'}), 400
     
     text = data['text']
-    result = nlp_service.analyze_text(text)
+    result = _run_nlp(nlp_service, 'analyze_text', text)
     return jsonify(result)
 
 @nlp_bp.route('/extract-entities', methods=['POST'])
@@ -33,7 +153,7 @@ def extract_entities():
         return jsonify({'error': 'Text is required'}), 400
     
     text = data['text']
-    entities = nlp_service.extract_entities(text)
+    entities = _run_nlp(nlp_service, 'extract_entities', text)
     return jsonify({'entities': entities})
 
 @nlp_bp.route('/sentiment-analysis', methods=['POST'])
@@ -45,7 +165,7 @@ def analyze_sentiment():
         return jsonify({'error': 'Text is required'}), 400
     
     text = data['text']
-    sentiment = sentiment_analyzer.analyze_sentiment(text)
+    sentiment = _run_nlp(sentiment_analyzer, 'analyze_sentiment', text)
     return jsonify(sentiment)
 
 @nlp_bp.route('/suggest-tasks', methods=['POST'])
@@ -57,13 +177,62 @@ def suggest_tasks():
     
     context = data.get('context', {})
     count = data.get('count', 5)
+    seed = data.get('seed')
+    if seed is not None and not validate_integer_range(seed, 0, 2 ** 32 - 1):
+        return jsonify({'error': 'seed must be a non-negative integer'}), 400
+    seed = int(seed) if seed is not None else None
     
     try:
-        suggestions = ml_predictor.suggest_tasks(user_id, context, count)
+        suggestions = ml_predictor.get().suggest_tasks(user_id, context, count, seed)
         return jsonify({'suggestions': suggestions})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@nlp_bp.route('/models', methods=['GET'])
+@jwt_required()
+def loaded_models():
+    """Report the spaCy models loaded in this process and their memory"""
+    return jsonify(model_registry.memory_report())
+
+@nlp_bp.route('/stats', methods=['GET'])
+@jwt_required()
+def nlp_stats():
+    """Report NLP runtime statistics for this process"""
+    stats = {
+        'services': {service.name: service.status() for service in SERVICES},
+        'profiles': profile_timings.report(),
+        'executor': nlp_executor.stats(),
+        'coalescing': single_flight.stats()
+    }
+    # Report the NLP service without forcing it to load
+    if nlp_service.loaded:
+        service = nlp_service.get()
+        stats['parse_count'] = service.parse_count
+        stats['cache'] = service.result_cache.stats()
+        stats['intents_version'] = service.intents_version
+        stats['intent_paths'] = service.intent_path_stats()
+    if profile_store.loaded:
+        stats['user_profiles'] = profile_store.get().stats()
+    if suggestion_engine.loaded:
+        stats['suggestions'] = suggestion_engine.get().stats()
+    return jsonify(stats)
+
+@nlp_bp.route('/reload-intents', methods=['POST'])
+@admin_required
+def reload_intents():
+    """Reload intents from disk and invalidate cached command results"""
+    if nlp_executor.enabled:
+        # Worker processes load intents at startup, so start fresh ones; the
+        # old workers finish their calls and exit in the background
+        generation = nlp_executor.restart()
+        return jsonify({'status': 'restarting workers', 'generation': generation}), 202
+    
+    service = nlp_service.get()
+    version = service.reload_intents()
+    if version is None:
+        return jsonify({'error': 'NLP service is not available'}), 503
+    return jsonify({'intents_version': version, 'intents': len(service.intent_index)})
+
 @nlp_bp.route('/parse-command', methods=['POST'])
 @jwt_required()
 def parse_command():
@@ -73,5 +242,89 @@ def parse_command():
         return jsonify({'error': 'Command is required'}), 400
     
     command = data['command']
-    result = nlp_service.process(command)
-    return jsonify(result) 
\ No newline at end of file
+    result = _run_nlp(nlp_service, 'process', command)
+    return jsonify(result)
+
+def _run_batch_operation(operation, context):
+    """Run a single batch operation against a parsed command"""
+    if not context.text:
+        # Mirror the single-item endpoints, which skip empty text
+        if operation == 'analyze':
+            return nlp_service.get().analyze_text(context.text)
+        if operation == 'entities':
+            return {'entities': {}}
+        return nlp_service.get().process(context.text)
+    
+    if operation == 'analyze':
+        return context.analysis
+    if operation == 'entities':
+        return {'entities': context.entities}
+    return context.result
+
+@nlp_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def batch():
+    """Run NLP operations over many texts in one pipelined pass"""
+    data = request.get_json()
+    if not data or not isinstance(data.get('texts'), list):
+        return jsonify({'error': 'A list of texts is required'}), 400
+    
+    texts = data['texts']
+    if not all(isinstance(text, str) for text in texts):
+        return jsonify({'error': 'All texts must be strings'}), 400
+    if len(texts) > MAX_BATCH_ITEMS:
+        return jsonify({'error': f'At most {MAX_BATCH_ITEMS} texts are allowed per batch'}), 400
+    
+    operations = data.get('operations', ['parse-command'])
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'A list of operations is required'}), 400
+    unknown = [operation for operation in operations if operation not in BATCH_OPERATIONS]
+    if unknown:
+        return jsonify({'error': f"Unknown operations: {', '.join(map(str, unknown))}"}), 400
+    
+    batch_size = data.get('batch_size', 64)
+    n_process = data.get('n_process', 1)
+    if not validate_integer_range(batch_size, 1, MAX_BATCH_ITEMS):
+        return jsonify({'error': f'batch_size must be between 1 and {MAX_BATCH_ITEMS}'}), 400
+    if not validate_integer_range(n_process, 1, MAX_BATCH_PROCESSES):
+        return jsonify({'error': f'n_process must be between 1 and {MAX_BATCH_PROCESSES}'}), 400
+    
+    if nlp_executor.enabled:
+        # Parsed Docs cannot leave the worker processes, and spaCy is not
+        # loaded in this one
+        return jsonify({'error': 'Batch processing is not available with NLP_WORKERS set'}), 503
+    
+    service = nlp_service.get()
+    if not service.nlp:
+        return jsonify({'error': 'NLP service is not available'}), 503
+    
+    results = []
+    try:
+        # Run only the components the requested operations read
+        profile = widest_profile([OPERATION_PROFILES[operation] for operation in operations])
+        contexts = list(service.pipe_commands(texts, batch_size=int(batch_size),
+                                              n_process=int(n_process), profile=profile))
+        
+        # Sentiment scores the whole batch with one set of matrix products
+        sentiments = None
+        if 'sentiment' in operations:
+            try:
+                sentiments = sentiment_analyzer.get().analyze_docs([context.doc for context in contexts])
+            except Exception as e:
+                sentiments = [{'error': str(e)}] * len(contexts)
+        
+        for index, context in enumerate(contexts):
+            item = {'text': context.text}
+            for operation in operations:
+                if operation == 'sentiment':
+                    item[operation] = sentiments[index]
+                    continue
+                try:
+                    item[operation] = _run_batch_operation(operation, context)
+                except Exception as e:
+                    item[operation] = {'error': str(e)}
+            results.append(item)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({'results': results, 'count': len(results)})
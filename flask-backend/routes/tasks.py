@@ -4,9 +4,33 @@ from werkzeug.exceptions import BadRequest, NotFound, Forbidden
 from sqlalchemy import desc
 from models import Task, db
 from datetime import datetime
+from services.task_suggestions import suggestion_engine
+from services.user_profiles import record_task_category
 
 tasks_bp = Blueprint('tasks', __name__)
 
+def _suggestions():
+    """
+    The suggestion engine if it has been built, else None
+    
+    The engine builds a user's patterns from the tasks table on first use,
+    so until the ML predictor has built it there is nothing to keep current,
+    and task routes never load pandas and numpy themselves.
+    """
+    return suggestion_engine.get() if suggestion_engine.loaded else None
+
+def _after_commit(action, *args):
+    """
+    Run a side effect of a saved task change
+    
+    The change is already committed, so a failure here is logged rather
+    than turned into an error response the client would retry.
+    """
+    try:
+        action(*args)
+    except Exception as e:
+        print(f"Error after saving task: {str(e)}")
+
 @tasks_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_tasks():
@@ -67,6 +91,12 @@ def create_task():
         db.session.add(task)
         db.session.commit()
         
+        # Keep learned suggestion patterns current without a rescan
+        suggestions = _suggestions()
+        if suggestions:
+            _after_commit(suggestions.record_created, task)
+        _after_commit(record_task_category, user_id, task.category)
+        
         return jsonify(task.to_dict()), 201
     except BadRequest as e:
         return jsonify({'error': str(e)}), e.code
@@ -114,6 +144,9 @@ def update_task(task_id):
         if not data:
             raise BadRequest('Request body is required')
         
+        suggestions = _suggestions()
+        before = suggestions.snapshot(task) if suggestions else None
+        
         # Update fields
         if 'title' in data:
             task.title = data['title']
@@ -131,6 +164,10 @@ def update_task(task_id):
             task.reminder = datetime.fromisoformat(data['reminder'].replace('Z', '+00:00')) if data['reminder'] else None
         
         db.session.commit()
+        if suggestions:
+            _after_commit(suggestions.record_updated, task, before)
+        if 'category' in data:
+            _after_commit(record_task_category, user_id, task.category)
         return jsonify(task.to_dict())
     except (BadRequest, NotFound, Forbidden) as e:
         return jsonify({'error': str(e)}), e.code
@@ -153,8 +190,12 @@ def delete_task(task_id):
         if task.userId != user_id:
             raise Forbidden('Not authorized to delete this task')
         
+        suggestions = _suggestions()
+        before = suggestions.snapshot(task) if suggestions else None
         db.session.delete(task)
         db.session.commit()
+        if suggestions:
+            _after_commit(suggestions.record_deleted, user_id, before)
         
         return jsonify({'message': 'Task deleted successfully'})
     except (NotFound, Forbidden) as e:
@@ -1,5 +1,20 @@
-from .nlp_service import NLPService
-from .sentiment_service import SentimentAnalyzer
-from .ml_service import MLPredictor
+import importlib
 
-__all__ = ['NLPService', 'SentimentAnalyzer', 'MLPredictor'] 
\ No newline at end of file
+# Exports are imported on first access, so modules that only need a light
+# service (e.g. the suggestion engine from the task routes) do not import spaCy
+_EXPORTS = {
+    'NLPService': '.nlp_service',
+    'SentimentAnalyzer': '.sentiment_service',
+    'MLPredictor': '.ml_service',
+    'ModelRegistry': '.model_registry',
+    'model_registry': '.model_registry',
+    'get_model': '.model_registry',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
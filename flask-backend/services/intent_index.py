@@ -0,0 +1,79 @@
+import numpy as np
+
+from .vectors import normalize_rows
+
+
+class IntentIndex:
+    """Precomputed pattern vectors for similarity-based intent detection"""
+
+    def __init__(self, nlp, intents):
+        """
+        Build the index from an intents definition
+
+        Every pattern is embedded once with the tokenizer only (static word
+        vectors do not depend on the rest of the pipeline), L2-normalized and
+        stored in one matrix per intent. Because the old scorer averaged
+        cosine similarities over an intent's patterns, and the average of dot
+        products equals the dot product with the averaged rows, each intent
+        is collapsed into a single centroid row of the scoring matrix; the
+        per-pattern rows are not kept.
+
+        Args:
+            nlp (Language): Loaded spaCy pipeline
+            intents (dict): Intents definition with an 'intents' list
+        """
+        self.intents = []
+
+        centroids = []
+        for intent in intents.get('intents', []):
+            patterns = [pattern.lower() for pattern in intent.get('patterns', [])]
+            if not patterns:
+                continue
+
+            vectors = np.asarray([nlp.make_doc(pattern).vector for pattern in patterns], dtype=np.float32)
+            matrix = normalize_rows(vectors)
+
+            self.intents.append(intent)
+            centroids.append(matrix.mean(axis=0))
+
+        width = nlp.vocab.vectors_length
+        self.matrix = np.vstack(centroids) if centroids else np.zeros((0, width), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.intents)
+
+    def scores(self, vector):
+        """
+        Average cosine similarity of a vector against every intent
+
+        Args:
+            vector (ndarray): Document vector of the utterance
+
+        Returns:
+            ndarray: One score per indexed intent
+        """
+        norm = np.linalg.norm(vector)
+        if norm == 0 or not self.intents:
+            # Doc.similarity returns 0.0 when either side has no vector
+            return np.zeros(len(self.intents), dtype=np.float32)
+        return self.matrix @ (np.asarray(vector, dtype=np.float32) / norm)
+
+    def best_match(self, vector):
+        """
+        Find the highest scoring intent for a vector
+
+        Args:
+            vector (ndarray): Document vector of the utterance
+
+        Returns:
+            tuple: (intent dict or None, score)
+        """
+        scores = self.scores(vector)
+        if not len(scores):
+            return None, 0
+
+        # argmax keeps the first intent on ties, like the strict '>' comparison did
+        best = int(np.argmax(scores))
+        if scores[best] <= 0:
+            return None, 0
+        return self.intents[best], float(scores[best])
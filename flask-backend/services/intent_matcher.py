@@ -0,0 +1,80 @@
+class KeywordIntentMatcher:
+    """Token trie over intent patterns for exact trigger-phrase matching"""
+
+    # Trie key holding the intent tags of patterns that end at a node
+    _END = None
+
+    def __init__(self, nlp, intents):
+        """
+        Build the trie from an intents definition
+
+        Patterns are split with the tokenizer alone so they line up with the
+        tokens of parsed utterances.
+
+        Args:
+            nlp (Language): Loaded spaCy pipeline
+            intents (dict): Intents definition with an 'intents' list
+        """
+        self.root = {}
+        self.intents = {}
+        self.pattern_count = 0
+
+        for intent in intents.get('intents', []):
+            self.intents[intent['tag']] = intent
+            for pattern in intent.get('patterns', []):
+                tokens = [token.lower_ for token in nlp.make_doc(pattern)]
+                if not tokens:
+                    continue
+                node = self.root
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                node.setdefault(self._END, set()).add(intent['tag'])
+                self.pattern_count += 1
+
+    def find(self, tokens):
+        """
+        Find every intent with a pattern that starts the token sequence
+
+        Patterns are anchored at the first token, so a trigger phrase inside
+        a task ("call the client about new task board") does not decide the
+        intent. A single-word pattern ("exit", "hello") must also be the
+        whole utterance apart from punctuation, since such words are common
+        in ordinary commands ("exit interview notes").
+
+        Args:
+            tokens (list): Lowercase token texts of the utterance
+
+        Returns:
+            set: Tags of the intents whose patterns start the tokens
+        """
+        tags = set()
+        node = self.root
+        for depth, token in enumerate(tokens, start=1):
+            node = node.get(token)
+            if node is None:
+                break
+            if depth == 1 and not self._only_punctuation(tokens[1:]):
+                continue
+            tags.update(node.get(self._END, ()))
+        return tags
+
+    @staticmethod
+    def _only_punctuation(tokens):
+        return not any(char.isalnum() for token in tokens for char in token)
+
+    def match(self, tokens):
+        """
+        Match an utterance to a single intent when that is unambiguous
+
+        Args:
+            tokens (list): Lowercase token texts of the utterance
+
+        Returns:
+            tuple: (intent dict or None, status) where status is 'keyword'
+                for a unique match, 'ambiguous' when patterns of several
+                intents occur, and 'no_match' when none do
+        """
+        tags = self.find(tokens)
+        if len(tags) == 1:
+            return self.intents[tags.pop()], 'keyword'
+        return None, 'ambiguous' if tags else 'no_match'
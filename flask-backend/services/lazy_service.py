@@ -0,0 +1,44 @@
+import threading
+import time
+
+
+class LazyService:
+    """Build a service on first use instead of at import time"""
+
+    def __init__(self, name, factory):
+        """
+        Initialize the lazy holder
+
+        Args:
+            name (str): Name used in status reports
+            factory (callable): Builds the service when first needed
+        """
+        self.name = name
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+        self.load_seconds = None
+
+    @property
+    def loaded(self):
+        return self._instance is not None
+
+    def get(self):
+        """Return the service, building it on the first call"""
+        if self._instance is not None:
+            return self._instance
+
+        with self._lock:
+            if self._instance is None:
+                start = time.perf_counter()
+                self._instance = self._factory()
+                self.load_seconds = round(time.perf_counter() - start, 3)
+                print(f"Loaded {self.name} service in {self.load_seconds:.2f}s")
+        return self._instance
+
+    def status(self):
+        """Whether the service is loaded and how long loading took"""
+        return {
+            "loaded": self.loaded,
+            "load_seconds": self.load_seconds
+        }
@@ -0,0 +1,144 @@
+"""
+Precomputed word-to-sentiment lookup table
+
+Whether a word matches the sentiment lexicon depends only on its vector, so
+polarity and emotion scores are computed once for every row of the model's
+vector table and saved as a .npy file. Workers memory-map the file
+read-only, so they all share one copy through the OS page cache.
+
+Build or refresh the table offline (from flask-backend/):
+    python -m services.lexicon_table
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from .vectors import normalize_rows
+
+DEFAULT_TABLE_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'lexicon_tables')
+
+# Rows scored per matrix product while building
+_BUILD_CHUNK = 4096
+
+
+class LexiconTable:
+    """Read-only (vector rows x (1 + emotions)) table of lexicon scores"""
+
+    def __init__(self, data, key2row, emotion_names, path=None):
+        """
+        Args:
+            data (ndarray): Column 0 holds polarity (+1, -1 or 0), the other
+                columns the above-threshold similarity to each emotion
+            key2row (dict): Vocabulary key to vector row mapping
+            emotion_names (list): Emotion of each column after the first
+            path (str): File the table was loaded from, if any
+        """
+        self.data = data
+        self.key2row = key2row
+        self.emotion_names = emotion_names
+        self.path = path
+
+    @staticmethod
+    def fingerprint(nlp, lexicon, polarity_threshold, emotion_threshold):
+        """Hash of everything the table depends on: model, vectors, lexicon and thresholds"""
+        vectors = nlp.vocab.vectors
+        source = json.dumps({
+            "model": f"{nlp.meta.get('lang')}_{nlp.meta.get('name')}-{nlp.meta.get('version')}",
+            "vectors": [vectors.name, list(vectors.data.shape)],
+            "lexicon": lexicon,
+            "thresholds": [polarity_threshold, emotion_threshold]
+        }, sort_keys=True)
+        return hashlib.sha1(source.encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def build(vector_data, polarity_matrices, emotion_matrix, polarity_threshold, emotion_threshold):
+        """
+        Score every vector row against the lexicon
+
+        Args:
+            vector_data (ndarray): The model's vector table
+            polarity_matrices (dict): Normalized 'positive'/'negative' word matrices
+            emotion_matrix (ndarray): Normalized (emotions x dims) matrix
+            polarity_threshold (float): Similarity needed for a polarity match
+            emotion_threshold (float): Similarity needed to count an emotion
+
+        Returns:
+            ndarray: float32 table with 1 + emotions columns
+        """
+        rows = vector_data.shape[0]
+        table = np.zeros((rows, 1 + emotion_matrix.shape[0]), dtype=np.float32)
+        for start in range(0, rows, _BUILD_CHUNK):
+            chunk = normalize_rows(np.asarray(vector_data[start:start + _BUILD_CHUNK]))
+            is_positive = (chunk @ polarity_matrices['positive'].T > polarity_threshold).any(axis=1)
+            is_negative = (chunk @ polarity_matrices['negative'].T > polarity_threshold).any(axis=1) & ~is_positive
+            similarities = chunk @ emotion_matrix.T
+
+            end = start + chunk.shape[0]
+            table[start:end, 0] = is_positive.astype(np.float32) - is_negative.astype(np.float32)
+            table[start:end, 1:] = np.where(similarities > emotion_threshold, similarities, 0)
+        return table
+
+    @classmethod
+    def load_or_build(cls, nlp, lexicon, polarity_matrices, emotion_names, emotion_matrix,
+                      polarity_threshold, emotion_threshold, directory=None):
+        """
+        Memory-map the table for this model and lexicon, building it if needed
+
+        The file name carries the fingerprint, so a changed lexicon or model
+        version is picked up as a missing file and rebuilt automatically.
+
+        Returns:
+            LexiconTable: The loaded table
+        """
+        directory = directory or os.environ.get('LEXICON_TABLE_DIR', DEFAULT_TABLE_DIR)
+        fingerprint = cls.fingerprint(nlp, lexicon, polarity_threshold, emotion_threshold)
+        path = os.path.join(directory, f"lexicon-{fingerprint}.npy")
+
+        if not os.path.exists(path):
+            table = cls.build(nlp.vocab.vectors.data, polarity_matrices, emotion_matrix,
+                              polarity_threshold, emotion_threshold)
+            os.makedirs(directory, exist_ok=True)
+            # Write then rename, so concurrent workers never read a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.npy.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as tmp_file:
+                    np.save(tmp_file, table)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            print(f"Built lexicon table {path} ({table.shape[0]} rows)")
+
+        data = np.load(path, mmap_mode='r')
+        return cls(data, nlp.vocab.vectors.key2row, emotion_names, path)
+
+    def lookup(self, tokens):
+        """
+        Table rows for a sequence of tokens
+
+        Tokens without a vector get zeros, matching a zero similarity.
+
+        Args:
+            tokens (list): spaCy tokens
+
+        Returns:
+            ndarray: (len(tokens), 1 + emotions) scores
+        """
+        if not tokens or not self.data.shape[0]:
+            return np.zeros((len(tokens), self.data.shape[1]), dtype=np.float32)
+        rows = np.fromiter((self.key2row.get(token.orth, -1) for token in tokens), dtype=np.int64, count=len(tokens))
+        values = np.array(self.data[np.maximum(rows, 0)], dtype=np.float32)
+        values[rows < 0] = 0
+        return values
+
+
+if __name__ == '__main__':
+    from .sentiment_service import SentimentAnalyzer
+
+    analyzer = SentimentAnalyzer()
+    if analyzer.lexicon_table is not None:
+        print(f"Lexicon table ready: {analyzer.lexicon_table.path}")
@@ -2,13 +2,41 @@ import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import random
-from collections import defaultdict
+import re
+from itertools import product
+
+from .profile_store import ProfileStore
+from .user_profiles import default_profile
 
 class MLPredictor:
     """Service for machine learning-based predictions and suggestions"""
     
-    def __init__(self):
-        """Initialize the ML predictor"""
+    # Values each template placeholder expands to
+    PLACEHOLDER_VALUES = {
+        'document': ['quarterly', 'project', 'annual', 'budget'],
+        'person': ['team', 'manager', 'client', 'colleague'],
+        'project': ['marketing', 'development', 'research', 'design'],
+        'duration': ['30 minute', '1 hour', '15 minute', '45 minute'],
+        'topic': ['Python', 'marketing', 'project management', 'design'],
+        'type': ['dental', 'medical', 'therapy', 'wellness'],
+        'room': ['living room', 'bedroom', 'kitchen', 'office'],
+        'item': ['lamp', 'chair', 'table', 'appliance'],
+        'bill': ['electric', 'water', 'internet', 'phone'],
+        'book': ['business', 'self-help', 'technical', 'novel'],
+        'skill': ['coding', 'writing', 'drawing', 'language']
+    }
+    PLACEHOLDER_PATTERN = re.compile(r'\{(\w+)\}')
+    
+    def __init__(self, profile_store=None, suggestion_engine=None):
+        """
+        Initialize the ML predictor
+        
+        Args:
+            profile_store (ProfileStore): Where user profiles are kept; defaults
+                to an in-memory store
+            suggestion_engine (SuggestionEngine): Patterns learned from the
+                user's task history; without one only templates are suggested
+        """
         try:
             # Task categories
             self.task_categories = {
@@ -152,24 +180,80 @@ class MLPredictor:
                 ]
             }
             
-            # User profiles (would typically be stored in a database)
-            self.user_profiles = defaultdict(lambda: {
-                'preferred_categories': ['work', 'personal', 'health'],
-                'common_tasks': [
-                    "Check emails",
-                    "Team meeting",
-                    "Exercise",
-                    "Read"
-                ]
-            })
+            # Generic productivity tasks
+            self.generic_tasks = [
+                "Check and respond to emails",
+                "Review your calendar",
+                "Update your to-do list",
+                "Take a short break",
+                "Drink water",
+                "Stretch for 5 minutes",
+                "Reflect on your progress",
+                "Set goals for tomorrow",
+                "Organize your workspace",
+                "Review your goals",
+                "Follow up on pending items",
+                "Check in with team members",
+                "Schedule important meetings",
+                "Review project deadlines",
+                "Back up important files"
+            ]
+            
+            self._compile_pools()
+            
+            # User profiles live in the store's LRU; with a database backend
+            # they are loaded once per user and written back in batches
+            self.profile_store = profile_store or ProfileStore(default_factory=default_profile)
+            self.suggestion_engine = suggestion_engine
             
             print("ML Predictor initialized successfully")
         except Exception as e:
             print(f"Error initializing ML Predictor: {str(e)}")
     
-    def _get_time_of_day(self):
-        """Get the current time of day category"""
-        current_hour = datetime.datetime.now().hour
+    def _expand_template(self, template):
+        """Every text a template can produce, one entry per combination of placeholder values"""
+        names = self.PLACEHOLDER_PATTERN.findall(template)
+        if not names:
+            return (template,)
+        
+        names = list(dict.fromkeys(names))
+        parts = self.PLACEHOLDER_PATTERN.split(template)
+        expansions = []
+        for values in product(*(self.PLACEHOLDER_VALUES.get(name, ['{' + name + '}']) for name in names)):
+            chosen = dict(zip(names, values))
+            # split() alternates literal text and placeholder names
+            expansions.append(''.join(chosen[part] if i % 2 else part for i, part in enumerate(parts)))
+        return tuple(expansions)
+    
+    def _compile_pools(self):
+        """
+        Expand every template once into immutable candidate pools per
+        (category, weekday, time of day)
+        
+        Picking a template and then an expansion uniformly is the same draw
+        as replacing each placeholder with a random value, so suggestions
+        keep their distribution while requests only index into tuples.
+        Category templates do not vary by weekday or time of day yet, so
+        every slot of a category shares one tuple of expansions.
+        """
+        expansions = {
+            category: tuple(self._expand_template(template) for template in templates)
+            for category, templates in self.task_categories.items()
+        }
+        self.slot_pools = {}
+        self.category_pools = {}
+        for day, time_of_day in product(self.day_specific_tasks, self.time_specific_tasks):
+            self.slot_pools[(day, time_of_day)] = (
+                tuple(self.day_specific_tasks[day]),
+                tuple(self.time_specific_tasks[time_of_day])
+            )
+            for category, pool in expansions.items():
+                self.category_pools[(category, day, time_of_day)] = pool
+        self.generic_pool = tuple(self.generic_tasks)
+    
+    def _get_time_of_day(self, now=None):
+        """Get the time of day category of now (default: the current time)"""
+        current_hour = (now or datetime.now()).hour
         if 5 <= current_hour < 12:
             return 'morning'
         elif 12 <= current_hour < 18:
@@ -178,13 +262,10 @@ class MLPredictor:
             return 'evening'
     
     def _get_user_profile(self, user_id):
-        """
-        Get user profile based on user_id
-        In a real implementation, this would fetch from database
-        """
-        return self.user_profiles[user_id]
+        """Get user profile based on user_id, from memory for active users"""
+        return self.profile_store.get(user_id)
     
-    def suggest_tasks(self, user_id, context=None, count=5):
+    def suggest_tasks(self, user_id, context=None, count=5, seed=None):
         """
         Suggest tasks based on user history, current context, and time patterns
         
@@ -192,36 +273,38 @@ class MLPredictor:
             user_id (str): User identifier
             context (dict): Additional context (location, current activity, etc.)
             count (int): Number of suggestions to return
+            seed (int): Makes the random picks reproducible for the same user,
+                context and time of day
             
         Returns:
             list: Suggested tasks
         """
+        rng = random.Random(seed) if seed is not None else random
         try:
             # Get user profile
             user_profile = self._get_user_profile(user_id)
             
-            # Get current day and time
-            current_day = datetime.datetime.now().strftime('%A')
-            time_of_day = self._get_time_of_day()
+            # Get current day and time, from one reading of the clock so they
+            # agree around midnight
+            now = datetime.now()
+            current_day = now.strftime('%A')
+            time_of_day = self._get_time_of_day(now)
             
-            # Generate suggestions
-            suggestions = []
+            # Generate suggestions, starting with what the user usually does now
+            suggestions = self._get_learned_tasks(user_id, now, rng)
             
-            # Add day-specific tasks
-            day_tasks = self._get_day_specific_tasks(current_day)
+            # Add day-specific and time-specific tasks
+            day_tasks, time_tasks = self._get_slot_tasks(current_day, time_of_day, rng)
             suggestions.extend(day_tasks[:2])  # Add up to 2 day-specific tasks
-            
-            # Add time-specific tasks
-            time_tasks = self._get_time_specific_tasks(time_of_day)
             suggestions.extend(time_tasks[:2])  # Add up to 2 time-specific tasks
             
             # Add category-specific tasks
-            category_tasks = self._get_category_specific_tasks(user_profile)
+            category_tasks = self._get_category_specific_tasks(user_profile, current_day, time_of_day, rng)
             suggestions.extend(category_tasks[:3])  # Add up to 3 category-specific tasks
             
             # Add context-specific tasks if context is provided
             if context:
-                context_tasks = self._get_context_specific_tasks(context)
+                context_tasks = self._get_context_specific_tasks(context, rng)
                 suggestions.extend(context_tasks[:2])  # Add up to 2 context-specific tasks
             
             # Ensure we have unique tasks
@@ -229,7 +312,7 @@ class MLPredictor:
             
             # If we don't have enough unique suggestions, add some generic tasks
             if len(unique_suggestions) < count:
-                generic_tasks = self._get_generic_tasks()
+                generic_tasks = self._get_generic_tasks(rng)
                 unique_suggestions.extend([task for task in generic_tasks if task not in unique_suggestions])
             
             # Return the requested number of suggestions
@@ -238,66 +321,51 @@ class MLPredictor:
             print(f"Error suggesting tasks: {str(e)}")
             return ["Check email", "Review calendar", "Work on current project"]
     
-    def _get_day_specific_tasks(self, day):
-        """Get tasks specific to the given day"""
-        if day in self.day_specific_tasks:
-            return random.sample(self.day_specific_tasks[day], 
-                                min(2, len(self.day_specific_tasks[day])))
-        return []
+    def _get_learned_tasks(self, user_id, now, rng=random):
+        """Get the user's usual tasks for now's weekday and time, best ranked first"""
+        if self.suggestion_engine is None:
+            return []
+        
+        try:
+            # Local time, like the day and time-of-day suggestions
+            ranked = self.suggestion_engine.suggest(user_id, now, limit=3)
+        except Exception as e:
+            print(f"Error ranking learned tasks: {str(e)}")
+            return []
+        
+        tasks = []
+        for entry in ranked:
+            if entry['titles']:
+                tasks.extend(entry['titles'])
+            else:
+                # A category seen without reusable titles falls back to its templates
+                tasks.extend(self._get_category_specific_tasks(
+                    {'preferred_categories': [entry['category'].lower()]},
+                    now.strftime('%A'), self._get_time_of_day(now), rng))
+        return tasks
     
-    def _get_time_specific_tasks(self, time_of_day):
-        """Get tasks specific to the time of day"""
-        if time_of_day in self.time_specific_tasks:
-            return random.sample(self.time_specific_tasks[time_of_day], 
-                                min(2, len(self.time_specific_tasks[time_of_day])))
-        return []
+    def _get_slot_tasks(self, day, time_of_day, rng=random):
+        """Get tasks specific to the given day and to the time of day"""
+        day_pool, time_pool = self.slot_pools.get((day, time_of_day), ((), ()))
+        return (rng.sample(day_pool, min(2, len(day_pool))),
+                rng.sample(time_pool, min(2, len(time_pool))))
     
-    def _get_category_specific_tasks(self, user_profile):
-        """Get tasks from user's preferred categories"""
+    def _get_category_specific_tasks(self, user_profile, day, time_of_day, rng=random):
+        """Get tasks from user's preferred categories for the given day and time of day"""
         preferred_categories = user_profile.get('preferred_categories', ['work', 'personal'])
         tasks = []
         
         for category in preferred_categories:
-            if category in self.task_categories:
-                # Select 1-2 random tasks from each preferred category
-                category_tasks = random.sample(self.task_categories[category], 
-                                             min(2, len(self.task_categories[category])))
-                
-                # Format task templates with placeholders
-                formatted_tasks = []
-                for task in category_tasks:
-                    if '{' in task:
-                        # Simple placeholder replacement
-                        if '{document}' in task:
-                            task = task.replace('{document}', random.choice(['quarterly', 'project', 'annual', 'budget']))
-                        if '{person}' in task:
-                            task = task.replace('{person}', random.choice(['team', 'manager', 'client', 'colleague']))
-                        if '{project}' in task:
-                            task = task.replace('{project}', random.choice(['marketing', 'development', 'research', 'design']))
-                        if '{duration}' in task:
-                            task = task.replace('{duration}', random.choice(['30 minute', '1 hour', '15 minute', '45 minute']))
-                        if '{topic}' in task:
-                            task = task.replace('{topic}', random.choice(['Python', 'marketing', 'project management', 'design']))
-                        if '{type}' in task:
-                            task = task.replace('{type}', random.choice(['dental', 'medical', 'therapy', 'wellness']))
-                        if '{room}' in task:
-                            task = task.replace('{room}', random.choice(['living room', 'bedroom', 'kitchen', 'office']))
-                        if '{item}' in task:
-                            task = task.replace('{item}', random.choice(['lamp', 'chair', 'table', 'appliance']))
-                        if '{bill}' in task:
-                            task = task.replace('{bill}', random.choice(['electric', 'water', 'internet', 'phone']))
-                        if '{book}' in task:
-                            task = task.replace('{book}', random.choice(['business', 'self-help', 'technical', 'novel']))
-                        if '{skill}' in task:
-                            task = task.replace('{skill}', random.choice(['coding', 'writing', 'drawing', 'language']))
-                    
-                    formatted_tasks.append(task)
-                
-                tasks.extend(formatted_tasks)
+            pool = self.category_pools.get((category, day, time_of_day))
+            if pool:
+                # Select 1-2 random templates from each preferred category,
+                # then one of each template's precomputed expansions
+                for expansions in rng.sample(pool, min(2, len(pool))):
+                    tasks.append(expansions[rng.randrange(len(expansions))])
         
         return tasks
     
-    def _get_context_specific_tasks(self, context):
+    def _get_context_specific_tasks(self, context, rng=random):
         """Get tasks specific to user context"""
         context_tasks = []
         
@@ -341,26 +409,8 @@ class MLPredictor:
                     "Schedule follow-up meeting if needed"
                 ])
         
-        return random.sample(context_tasks, min(len(context_tasks), 2)) if context_tasks else []
+        return rng.sample(context_tasks, min(len(context_tasks), 2)) if context_tasks else []
     
-    def _get_generic_tasks(self):
+    def _get_generic_tasks(self, rng=random):
         """Get generic productivity tasks"""
-        generic_tasks = [
-            "Check and respond to emails",
-            "Review your calendar",
-            "Update your to-do list",
-            "Take a short break",
-            "Drink water",
-            "Stretch for 5 minutes",
-            "Reflect on your progress",
-            "Set goals for tomorrow",
-            "Organize your workspace",
-            "Review your goals",
-            "Follow up on pending items",
-            "Check in with team members",
-            "Schedule important meetings",
-            "Review project deadlines",
-            "Back up important files"
-        ]
-        
-        return random.sample(generic_tasks, 5) 
\ No newline at end of file
+        return rng.sample(self.generic_pool, 5)
@@ -0,0 +1,118 @@
+import os
+import threading
+import time
+
+DEFAULT_MODEL = "en_core_web_md"
+
+
+def _current_rss():
+    """Resident set size of this process in bytes, or None if unavailable"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # ru_maxrss is the peak, in KiB on Linux and bytes on macOS
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if os.uname().sysname == 'Darwin' else usage * 1024
+    except (ImportError, OSError):
+        return None
+
+
+class ModelRegistry:
+    """Process-wide registry that loads each spaCy model configuration once"""
+
+    def __init__(self):
+        self._models = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, disable, exclude):
+        return (name, tuple(sorted(disable or ())), tuple(sorted(exclude or ())))
+
+    def get(self, name=DEFAULT_MODEL, disable=None, exclude=None):
+        """
+        Get a loaded spaCy model, loading it on first request
+
+        Args:
+            name (str): Model package name or path
+            disable (list): Components loaded but disabled by default
+            exclude (list): Components not loaded at all
+
+        Returns:
+            Language: The shared pipeline for this configuration
+        """
+        key = self._key(name, disable, exclude)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            # Another thread may have finished loading while we waited
+            if key in self._models:
+                return self._models[key]
+
+            # Imported here so processes that never load a model, such as the
+            # web process when NLP runs on workers, do not pay for spaCy
+            import spacy
+
+            rss_before = _current_rss()
+            start = time.perf_counter()
+            model = spacy.load(name, disable=list(key[1]), exclude=list(key[2]))
+            load_seconds = time.perf_counter() - start
+            rss_after = _current_rss()
+
+            self._models[key] = model
+            self._stats[key] = {
+                "load_seconds": round(load_seconds, 3),
+                "rss_bytes": rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+            }
+            print(f"Loaded spaCy model {name} in {load_seconds:.2f}s")
+            return model
+
+    def loaded(self):
+        """Number of distinct model configurations currently loaded"""
+        return len(self._models)
+
+    def memory_report(self):
+        """
+        Report memory held by every loaded model
+
+        Returns:
+            dict: Process RSS and one entry per loaded model configuration
+        """
+        models = []
+        for key, model in list(self._models.items()):
+            name, disable, exclude = key
+            vectors = model.vocab.vectors
+            models.append({
+                "name": name,
+                "disable": list(disable),
+                "exclude": list(exclude),
+                "pipeline": model.pipe_names,
+                "vectors_bytes": int(vectors.data.nbytes) if vectors.data is not None else 0,
+                "vocab_size": len(model.vocab),
+                **self._stats.get(key, {}),
+            })
+        return {
+            "process_rss_bytes": _current_rss(),
+            "models": models,
+        }
+
+    def clear(self):
+        """Drop every loaded model so the next request loads it again"""
+        with self._lock:
+            self._models.clear()
+            self._stats.clear()
+
+
+# Shared by every service in the process
+model_registry = ModelRegistry()
+
+
+def get_model(name=DEFAULT_MODEL, disable=None, exclude=None):
+    """Get a shared spaCy model from the process-wide registry"""
+    return model_registry.get(name, disable=disable, exclude=exclude)
@@ -0,0 +1,252 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Services built once per worker process by _init_worker
+_worker_services = {}
+
+
+def _init_worker():
+    """Load the NLP services in a freshly started worker process"""
+    from .nlp_service import NLPService
+    from .sentiment_service import SentimentAnalyzer
+
+    _worker_services['nlp'] = NLPService()
+    _worker_services['sentiment'] = SentimentAnalyzer()
+
+
+def _run(service_name, method, args, submitted_at):
+    """Run a service method inside a worker, reporting how long it queued"""
+    queued_seconds = time.time() - submitted_at
+    result = getattr(_worker_services[service_name], method)(*args)
+    return result, queued_seconds
+
+
+def _ping():
+    return os.getpid()
+
+
+class QueueFullError(Exception):
+    """Raised when the executor queue has no room for another request"""
+
+    def __init__(self, retry_after):
+        super().__init__("NLP executor queue is full")
+        self.retry_after = retry_after
+
+
+class WorkersUnavailableError(Exception):
+    """Raised when the worker pool broke or was replaced and could not take the call"""
+
+    def __init__(self, retry_after):
+        super().__init__("NLP workers are restarting")
+        self.retry_after = retry_after
+
+
+class NLPExecutor:
+    """Runs NLP service calls on a pool of worker processes with a bounded queue"""
+
+    def __init__(self, workers=0, max_queue=32, timeout=30, retry_after=1):
+        """
+        Initialize the executor
+
+        Args:
+            workers (int): Worker processes; 0 runs calls in the calling thread
+            max_queue (int): Calls allowed to wait once every worker is busy
+            timeout (float): Seconds a caller waits for its result
+            retry_after (int): Seconds suggested to rejected callers
+        """
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        # Bumped whenever the workers are replaced, so results computed by
+        # older workers are not mistaken for current ones
+        self.generation = 0
+        self._slots = threading.BoundedSemaphore(workers + max_queue) if workers > 0 else None
+        self._stats_lock = threading.Lock()
+        self._in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @classmethod
+    def from_env(cls):
+        """Build an executor from NLP_WORKERS / NLP_QUEUE_DEPTH / NLP_TIMEOUT"""
+        return cls(
+            workers=int(os.environ.get('NLP_WORKERS', 0)),
+            max_queue=int(os.environ.get('NLP_QUEUE_DEPTH', 32)),
+            timeout=float(os.environ.get('NLP_TIMEOUT', 30)),
+            retry_after=int(os.environ.get('NLP_RETRY_AFTER', 1))
+        )
+
+    @property
+    def enabled(self):
+        return self.workers > 0
+
+    def _new_pool(self):
+        # spawn, not fork: the web process may hold threads and locks
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker
+        )
+
+    def _get_pool(self):
+        pool = self._pool
+        if pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = self._new_pool()
+                pool = self._pool
+        return pool
+
+    def _discard_pool(self, pool):
+        """Drop a broken pool so the next call starts fresh workers"""
+        with self._pool_lock:
+            # Already replaced by restart() or by another caller
+            if self._pool is not pool:
+                return
+            self._pool = None
+            self.generation += 1
+        pool.shutdown(wait=False)
+
+    def _submit(self, service_name, method, args):
+        """
+        Submit a call, retrying once on a fresh pool
+
+        A pool refuses work once a worker has died (BrokenProcessPool) or
+        after restart() shut it down between _get_pool() and submit(); both
+        are RuntimeErrors.
+        """
+        pool = self._get_pool()
+        try:
+            return pool, pool.submit(_run, service_name, method, args, time.time())
+        except RuntimeError as e:
+            print(f"NLP worker pool unavailable, starting a new one: {str(e)}")
+            self._discard_pool(pool)
+
+        pool = self._get_pool()
+        try:
+            return pool, pool.submit(_run, service_name, method, args, time.time())
+        except RuntimeError:
+            self._discard_pool(pool)
+            raise WorkersUnavailableError(self.retry_after)
+
+    def start(self):
+        """
+        Start every worker and wait until each has loaded its models
+
+        Returns:
+            list: Process ids of the started workers
+        """
+        if not self.enabled:
+            return []
+        pool = self._get_pool()
+        futures = [pool.submit(_ping) for _ in range(self.workers)]
+        return sorted({future.result() for future in futures})
+
+    def call(self, service_name, method, *args):
+        """
+        Run a service method on a worker process
+
+        Args:
+            service_name (str): 'nlp' or 'sentiment'
+            method (str): Name of the service method to call
+            *args: Picklable method arguments
+
+        Returns:
+            The method's return value
+
+        Raises:
+            QueueFullError: When every worker is busy and the queue is full
+            WorkersUnavailableError: When the workers died or were replaced
+                and a fresh pool could not take the call either, or a worker
+                died while running it
+            concurrent.futures.TimeoutError: When the result takes too long
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self.rejected += 1
+            raise QueueFullError(self.retry_after)
+
+        with self._stats_lock:
+            self._in_flight += 1
+        try:
+            pool, future = self._submit(service_name, method, args)
+        except Exception:
+            self._release()
+            with self._stats_lock:
+                self.failed += 1
+            raise
+        # A call that times out keeps its slot until the worker is done with it
+        future.add_done_callback(self._release)
+        try:
+            result, queued_seconds = future.result(timeout=self.timeout)
+        except BrokenProcessPool:
+            with self._stats_lock:
+                self.failed += 1
+            # A worker died while running the call
+            self._discard_pool(pool)
+            raise WorkersUnavailableError(self.retry_after)
+        except Exception:
+            with self._stats_lock:
+                self.failed += 1
+            raise
+
+        with self._stats_lock:
+            self.completed += 1
+            self._total_wait += queued_seconds
+            self._max_wait = max(self._max_wait, queued_seconds)
+        return result
+
+    def _release(self, future=None):
+        with self._stats_lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def stats(self):
+        """Queue depth, rejections and queue wait time"""
+        with self._stats_lock:
+            return {
+                "workers": self.workers,
+                "generation": self.generation,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queue_depth": max(0, self._in_flight - self.workers),
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "mean_wait_ms": round(self._total_wait * 1000 / self.completed, 3) if self.completed else 0,
+                "max_wait_ms": round(self._max_wait * 1000, 3)
+            }
+
+    def shutdown(self, wait=True):
+        """Stop the worker processes"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def restart(self):
+        """
+        Replace the workers so they reload models and intents on next use
+
+        Returns without waiting: calls already submitted finish on the old
+        workers, which then exit.
+
+        Returns:
+            int: The new worker generation
+        """
+        if self.enabled:
+            with self._pool_lock:
+                self.generation += 1
+            self.shutdown(wait=False)
+        return self.generation
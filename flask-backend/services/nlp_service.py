@@ -1,19 +1,81 @@
-import spacy
 import os
 import json
+import hashlib
+import random
+import time
+import numpy as np
 from datetime import datetime, timedelta
 
+from .intent_index import IntentIndex
+from .intent_matcher import KeywordIntentMatcher
+from .model_registry import get_model
+from .pipeline_profiles import disabled_components, profile_timings
+from .result_cache import ResultCache
+from .text_normalization import normalize_text
+
+# Name of the entity ruler that tags PRIORITY, CATEGORY and DURATION
+ENTITY_RULER_NAME = 'productivity_ruler'
+
+class CommandContext:
+    """A command parsed once and shared by every processing stage"""
+    
+    def __init__(self, service, text, doc):
+        self.service = service
+        self.text = text
+        self.doc = doc
+        self._intent = None
+        self._entities = None
+    
+    @property
+    def intent(self):
+        """Intent detected from the shared Doc"""
+        if self._intent is None:
+            self._intent = self.service._intent_from_doc(self.doc)
+        return self._intent
+    
+    @property
+    def entities(self):
+        """Entities extracted from the shared Doc"""
+        if self._entities is None:
+            self._entities = self.service._entities_from_doc(self.doc)
+        return self._entities
+    
+    @property
+    def analysis(self):
+        """Token and entity analysis of the shared Doc"""
+        return self.service._analysis_from_doc(self.doc)
+    
+    @property
+    def result(self):
+        """Full command processing result for the shared Doc"""
+        return self.service._process_context(self)
+
 class NLPService:
     """Service for natural language processing tasks"""
     
     def __init__(self):
         """Initialize the NLP service with spaCy model"""
+        # Cache for process/extract_entities results, keyed by text, intents and date
+        self.result_cache = ResultCache(
+            max_size=int(os.environ.get('NLP_CACHE_SIZE', 1024)),
+            ttl_seconds=float(os.environ.get('NLP_CACHE_TTL', 3600))
+        )
+        self.intents_version = None
+        # Times intents were reloaded after the first load
+        self.intents_reloads = 0
+        
+        # How many intent detections took the keyword or the vector path
+        self.intent_path_counts = {'keyword': 0, 'ambiguous': 0, 'no_match': 0}
+        
         try:
-            # Load spaCy model
-            self.nlp = spacy.load("en_core_web_md")
+            # Load spaCy model (shared with the other services in this process)
+            self.nlp = get_model("en_core_web_md")
             
-            # Load intents data
-            self.intents = self._load_intents()
+            # Number of full pipeline runs, so callers can check for re-parsing
+            self.parse_count = 0
+            
+            # Load intents data and precompute their pattern vectors
+            self._set_intents(self._load_intents())
             
             # Entity extraction configuration
             self.productivity_entities = {
@@ -35,8 +97,11 @@ class NLPService:
             categories = ["work", "personal", "health", "finance", "education", "family", "project", "meeting", "call"]
             self.category_patterns = [{"label": "CATEGORY", "pattern": category} for category in categories]
             
-            # Add custom entity matcher
-            self.matcher = spacy.matcher.PhraseMatcher(self.nlp.vocab)
+            # Add custom entity recognition for durations
+            durations = ["minute", "hour", "day", "week", "month", "year"]
+            self.duration_patterns = [{"label": "DURATION", "pattern": duration} for duration in durations]
+            
+            # Recognize custom entities inside the pipeline, alongside NER
             self._add_custom_patterns()
             
             print("NLP Service initialized successfully")
@@ -45,6 +110,9 @@ class NLPService:
             # Fallback to empty model
             self.nlp = None
             self.intents = {}
+            self.intent_index = None
+            self.keyword_matcher = None
+            self.parse_count = 0
     
     def _load_intents(self):
         """Load intents from JSON file"""
@@ -83,22 +151,133 @@ class NLPService:
             print(f"Error loading intents: {str(e)}")
             return {"intents": []}
     
+    def _set_intents(self, intents):
+        """Install an intents definition, rebuilding everything derived from it"""
+        self.intents = intents
+        self.intent_index = IntentIndex(self.nlp, intents)
+        self.keyword_matcher = KeywordIntentMatcher(self.nlp, intents)
+        self.intents_version = hashlib.sha1(json.dumps(intents, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+        # Cached results were computed against the previous intents
+        self.result_cache.clear()
+    
+    def reload_intents(self):
+        """
+        Reload intents from disk and invalidate cached results
+        
+        Returns:
+            str: Version hash of the loaded intents
+        """
+        if not self.nlp:
+            return None
+        self._set_intents(self._load_intents())
+        self.intents_reloads += 1
+        return self.intents_version
+    
+    @staticmethod
+    def _normalize_text(text):
+        """Collapse whitespace so equivalent commands share a cache entry"""
+        return normalize_text(text)
+    
+    def _cache_key(self, operation, text):
+        """
+        Cache key for a result
+        
+        The local date is part of the key because "today" and "tomorrow"
+        resolve to calendar dates, so results expire at midnight.
+        """
+        return (operation, text, self.intents_version, datetime.now().date().isoformat())
+    
+    def intent_path_stats(self):
+        """Share of intent detections answered by the keyword matcher"""
+        counts = dict(self.intent_path_counts)
+        total = sum(counts.values())
+        return {
+            "counts": counts,
+            "keyword_share": round(counts['keyword'] / total, 4) if total else 0,
+            "vector_share": round((total - counts['keyword']) / total, 4) if total else 0
+        }
+    
     def _add_custom_patterns(self):
-        """Add custom patterns to the matcher"""
+        """
+        Add custom patterns to a pipeline-native entity ruler
+        
+        The ruler runs right after NER in the same pass, so overlaps with
+        NER entities are resolved in doc.ents (NER wins) instead of being
+        appended as duplicates afterwards. Patterns are split with the
+        tokenizer only, so no pipeline runs at startup.
+        """
         if not self.nlp:
             return
+        
+        # The model is shared, so another instance may have added the ruler already
+        if ENTITY_RULER_NAME in self.nlp.pipe_names:
+            return
+        
+        patterns = [
+            {
+                "label": pattern["label"],
+                "pattern": [{"ORTH": token.text} for token in self.nlp.make_doc(pattern["pattern"])]
+            }
+            for pattern in self.priority_patterns + self.category_patterns + self.duration_patterns
+        ]
+        
+        if 'ner' in self.nlp.pipe_names:
+            ruler = self.nlp.add_pipe("entity_ruler", name=ENTITY_RULER_NAME, after='ner')
+        else:
+            ruler = self.nlp.add_pipe("entity_ruler", name=ENTITY_RULER_NAME)
+        ruler.add_patterns(patterns)
+    
+    def _parse(self, text, profile='full'):
+        """
+        Run the spaCy pipeline on text, counting and timing every run
+        
+        Args:
+            text (str): Text to parse
+            profile (str): Pipeline profile selecting the components to run
             
-        # Add priority patterns
-        priority_patterns = [self.nlp(text) for text in ["high", "medium", "low", "urgent", "critical", "normal"]]
-        self.matcher.add("PRIORITY", None, *priority_patterns)
+        Returns:
+            Doc: Parsed text
+        """
+        self.parse_count += 1
+        start = time.perf_counter()
+        doc = self.nlp(text, disable=disabled_components(self.nlp, profile))
+        profile_timings.record(profile, time.perf_counter() - start)
+        return doc
+    
+    def parse_command(self, text, profile='ner-only'):
+        """
+        Parse a command once for use by every processing stage
         
-        # Add category patterns
-        category_patterns = [self.nlp(text) for text in ["work", "personal", "health", "finance", "education", "family", "project", "meeting", "call"]]
-        self.matcher.add("CATEGORY", None, *category_patterns)
+        Args:
+            text (str): User command or query text
+            profile (str): Pipeline profile; intent and entities need 'ner-only'
+            
+        Returns:
+            CommandContext: Context wrapping the single parsed Doc
+        """
+        return CommandContext(self, text, self._parse(text, profile))
+    
+    def pipe_commands(self, texts, batch_size=64, n_process=1, profile='full'):
+        """
+        Parse many texts in one pipelined pass with nlp.pipe
         
-        # Add duration patterns
-        duration_patterns = [self.nlp(text) for text in ["minute", "hour", "day", "week", "month", "year"]]
-        self.matcher.add("DURATION", None, *duration_patterns)
+        Args:
+            texts (list): Texts to parse
+            batch_size (int): Number of texts buffered per pipeline batch
+            n_process (int): Number of worker processes used by spaCy
+            profile (str): Pipeline profile selecting the components to run
+            
+        Yields:
+            CommandContext: One context per text, in input order
+        """
+        docs = iter(self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process,
+                                  disable=disabled_components(self.nlp, profile)))
+        for text in texts:
+            start = time.perf_counter()
+            doc = next(docs)
+            profile_timings.record(profile, time.perf_counter() - start)
+            self.parse_count += 1
+            yield CommandContext(self, text, doc)
     
     def analyze_text(self, text):
         """
@@ -114,52 +293,42 @@ class NLPService:
             return {"tokens": [], "entities": [], "sentiment": "neutral"}
         
         try:
-            # Process text with spaCy
-            doc = self.nlp(text)
-            
-            # Extract tokens
-            tokens = [{"text": token.text, "lemma": token.lemma_, "pos": token.pos_, "is_stop": token.is_stop} for token in doc]
-            
-            # Extract entities
-            entities = []
-            for ent in doc.ents:
-                entities.append({
-                    "text": ent.text,
-                    "type": ent.label_,
-                    "start": ent.start_char,
-                    "end": ent.end_char
-                })
-            
-            # Add custom entities from matcher
-            matches = self.matcher(doc)
-            for match_id, start, end in matches:
-                match_type = self.nlp.vocab.strings[match_id]
-                span = doc[start:end]
-                entities.append({
-                    "text": span.text,
-                    "type": match_type,
-                    "start": span.start_char,
-                    "end": span.end_char
-                })
-            
-            # Basic sentiment analysis
-            sentiment = "neutral"
-            if doc._.has_sentiment:
-                sentiment_score = doc._.sentiment
-                if sentiment_score > 0.3:
-                    sentiment = "positive"
-                elif sentiment_score < -0.3:
-                    sentiment = "negative"
-            
-            return {
-                "tokens": tokens,
-                "entities": entities,
-                "sentiment": sentiment
-            }
+            # Token analysis reports POS tags and lemmas, so it needs every component
+            return self._analysis_from_doc(self._parse(text, 'full'))
         except Exception as e:
             print(f"Error analyzing text: {str(e)}")
             return {"tokens": [], "entities": [], "sentiment": "neutral", "error": str(e)}
     
+    def _analysis_from_doc(self, doc):
+        """Analyze an already parsed Doc"""
+        # Extract tokens
+        tokens = [{"text": token.text, "lemma": token.lemma_, "pos": token.pos_, "is_stop": token.is_stop} for token in doc]
+        
+        # Extract entities (NER and the custom entity ruler)
+        entities = []
+        for ent in doc.ents:
+            entities.append({
+                "text": ent.text,
+                "type": ent.label_,
+                "start": ent.start_char,
+                "end": ent.end_char
+            })
+        
+        # Basic sentiment analysis
+        sentiment = "neutral"
+        if doc.has_extension('has_sentiment') and doc._.has_sentiment:
+            sentiment_score = doc._.sentiment
+            if sentiment_score > 0.3:
+                sentiment = "positive"
+            elif sentiment_score < -0.3:
+                sentiment = "negative"
+        
+        return {
+            "tokens": tokens,
+            "entities": entities,
+            "sentiment": sentiment
+        }
+    
     def extract_entities(self, text):
         """
         Extract entities from text
@@ -173,44 +342,45 @@ class NLPService:
         if not self.nlp or not text:
             return {}
         
+        text = self._normalize_text(text)
+        key = self._cache_key('entities', text)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            return cached
+        
         try:
-            # Process text with spaCy
-            doc = self.nlp(text)
-            
-            # Extract entities
-            entities = {}
-            for ent in doc.ents:
-                entity_type = self.productivity_entities.get(ent.label_, ent.label_.lower())
-                if entity_type not in entities:
-                    entities[entity_type] = []
-                entities[entity_type].append(ent.text)
-            
-            # Add custom entities from matcher
-            matches = self.matcher(doc)
-            for match_id, start, end in matches:
-                match_type = self.nlp.vocab.strings[match_id]
-                entity_type = self.productivity_entities.get(match_type, match_type.lower())
-                if entity_type not in entities:
-                    entities[entity_type] = []
-                entities[entity_type].append(doc[start:end].text)
-            
-            # Process dates and times
-            if 'date' in entities:
-                try:
-                    # Attempt to parse relative dates like "tomorrow", "next week", etc.
-                    for i, date_text in enumerate(entities['date']):
-                        if date_text.lower() == 'tomorrow':
-                            tomorrow = datetime.now() + timedelta(days=1)
-                            entities['date'][i] = tomorrow.strftime('%Y-%m-%d')
-                        elif date_text.lower() == 'today':
-                            entities['date'][i] = datetime.now().strftime('%Y-%m-%d')
-                except Exception as e:
-                    print(f"Error processing dates: {str(e)}")
-            
-            return entities
+            entities = self._entities_from_doc(self._parse(text, 'ner-only'))
         except Exception as e:
             print(f"Error extracting entities: {str(e)}")
             return {}
+        
+        self.result_cache.set(key, entities)
+        return entities
+    
+    def _entities_from_doc(self, doc):
+        """Extract entities from an already parsed Doc"""
+        # Extract entities (NER and the custom entity ruler)
+        entities = {}
+        for ent in doc.ents:
+            entity_type = self.productivity_entities.get(ent.label_, ent.label_.lower())
+            if entity_type not in entities:
+                entities[entity_type] = []
+            entities[entity_type].append(ent.text)
+        
+        # Process dates and times
+        if 'date' in entities:
+            try:
+                # Attempt to parse relative dates like "tomorrow", "next week", etc.
+                for i, date_text in enumerate(entities['date']):
+                    if date_text.lower() == 'tomorrow':
+                        tomorrow = datetime.now() + timedelta(days=1)
+                        entities['date'][i] = tomorrow.strftime('%Y-%m-%d')
+                    elif date_text.lower() == 'today':
+                        entities['date'][i] = datetime.now().strftime('%Y-%m-%d')
+            except Exception as e:
+                print(f"Error processing dates: {str(e)}")
+        
+        return entities
     
     def detect_intent(self, text):
         """
@@ -226,53 +396,61 @@ class NLPService:
             return {"tag": "unknown", "confidence": 0, "response": "I'm not sure what you want to do."}
         
         try:
-            # Process text with spaCy
-            doc = self.nlp(text.lower())
-            
-            # Calculate similarity scores for each intent
-            max_score = 0
-            best_intent = None
-            
-            for intent in self.intents['intents']:
-                score = 0
-                count = 0
-                
-                for pattern in intent['patterns']:
-                    pattern_doc = self.nlp(pattern.lower())
-                    pattern_score = doc.similarity(pattern_doc)
-                    score += pattern_score
-                    count += 1
-                
-                if count > 0:
-                    avg_score = score / count
-                    if avg_score > max_score:
-                        max_score = avg_score
-                        best_intent = intent
-            
-            # Return the best intent if the confidence is above threshold
-            if best_intent and max_score > 0.60:
-                import random
-                return {
-                    "tag": best_intent['tag'],
-                    "confidence": max_score,
-                    "response": random.choice(best_intent['responses'])
-                }
-            else:
-                return {
-                    "tag": "unknown",
-                    "confidence": max_score,
-                    "response": "I'm not sure what you want to do."
-                }
+            return self._intent_from_doc(self._parse(text, 'vectors-only'))
         except Exception as e:
             print(f"Error detecting intent: {str(e)}")
             return {"tag": "unknown", "confidence": 0, "response": "I'm not sure what you want to do."}
     
-    def extract_task(self, text):
+    def _intent_vector(self, doc):
+        """
+        Average lowercase word vector of a Doc
+        
+        Matches the vector of the lowercased text without parsing it again,
+        so the same Doc can serve intent detection and cased NER.
+        """
+        if not len(doc):
+            return np.zeros(self.nlp.vocab.vectors_length, dtype=np.float32)
+        return np.mean([self.nlp.vocab.get_vector(token.lower_) for token in doc], axis=0)
+    
+    def _intent_from_doc(self, doc):
+        """Detect intent from an already parsed Doc"""
+        if 'intents' not in self.intents:
+            return {"tag": "unknown", "confidence": 0, "response": "I'm not sure what you want to do."}
+        
+        # Unambiguous trigger phrases ("add task", "track habit") skip vector scoring
+        keyword_intent, path = self.keyword_matcher.match([token.lower_ for token in doc])
+        self.intent_path_counts[path] += 1
+        if keyword_intent is not None:
+            return {
+                "tag": keyword_intent['tag'],
+                "confidence": 1.0,
+                "response": random.choice(keyword_intent['responses'])
+            }
+        
+        # Otherwise score the utterance against every intent in one matrix product
+        best_intent, max_score = self.intent_index.best_match(self._intent_vector(doc))
+        
+        # Return the best intent if the confidence is above threshold
+        if best_intent and max_score > 0.60:
+            return {
+                "tag": best_intent['tag'],
+                "confidence": max_score,
+                "response": random.choice(best_intent['responses'])
+            }
+        else:
+            return {
+                "tag": "unknown",
+                "confidence": max_score,
+                "response": "I'm not sure what you want to do."
+            }
+    
+    def extract_task(self, text, entities=None):
         """
         Extract task information from text
         
         Args:
             text (str): Text to extract task from
+            entities (dict): Entities already extracted from text, if any
             
         Returns:
             dict: Task information with title, priority, date, etc.
@@ -281,8 +459,9 @@ class NLPService:
             return {"title": text}
         
         try:
-            # Process text with spaCy
-            entities = self.extract_entities(text)
+            # Reuse entities from the caller's parse when available
+            if entities is None:
+                entities = self.extract_entities(text)
             
             # Extract task details
             task = {"title": text}
@@ -340,62 +519,15 @@ class NLPService:
                 "data": {}
             }
         
-        try:
-            # Detect intent
-            intent = self.detect_intent(text)
-            
-            # Extract entities
-            entities = self.extract_entities(text)
-            
-            # Determine action based on intent
-            action = "none"
-            data = {}
-            response = intent.get("response", "I'm not sure what you want to do.")
-            
-            if intent["tag"] == "add_task":
-                action = "create_task"
-                data = self.extract_task(text)
-                response = f"Adding task: {data['title']}"
-            
-            elif intent["tag"] == "list_tasks":
-                action = "list_tasks"
-                if 'date' in entities:
-                    data['date'] = entities['date'][0]
-                if 'category' in entities:
-                    data['category'] = entities['category'][0]
-                response = "Here are your tasks"
-            
-            elif intent["tag"] == "create_habit":
-                action = "create_habit"
-                # Extract habit details
-                habit = {"name": text}
-                
-                # Remove entities from name
-                for entity_type, entity_values in entities.items():
-                    for entity in entity_values:
-                        habit["name"] = habit["name"].replace(entity, "").strip()
-                
-                # Add entities to habit
-                if 'category' in entities and entities['category']:
-                    habit['category'] = entities['category'][0].lower()
-                
-                # Clean up name
-                for phrase in ["track habit", "new habit", "create habit", "add habit", "start tracking"]:
-                    habit["name"] = habit["name"].replace(phrase, "").strip()
-                
-                data = habit
-                response = f"Creating habit: {data['name']}"
-            
-            # Return the response
-            return {
-                "intent": intent["tag"],
-                "confidence": intent["confidence"],
-                "action": action,
-                "response": response,
-                "entities": entities,
-                "data": data
-            }
+        text = self._normalize_text(text)
+        key = self._cache_key('process', text)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            return cached
         
+        try:
+            # Parse once; intent, entities and task extraction share the Doc
+            result = self._process_context(self.parse_command(text))
         except Exception as e:
             print(f"Error processing command: {str(e)}")
             return {
@@ -404,4 +536,61 @@ class NLPService:
                 "response": "I encountered an error processing your request.",
                 "error": str(e),
                 "data": {}
-            } 
\ No newline at end of file
+            }
+        
+        self.result_cache.set(key, result)
+        return result
+    
+    def _process_context(self, context):
+        """Determine the action for an already parsed command"""
+        intent = context.intent
+        entities = context.entities
+        
+        # Determine action based on intent
+        action = "none"
+        data = {}
+        response = intent.get("response", "I'm not sure what you want to do.")
+        
+        if intent["tag"] == "add_task":
+            action = "create_task"
+            data = self.extract_task(context.text, entities)
+            response = f"Adding task: {data['title']}"
+        
+        elif intent["tag"] == "list_tasks":
+            action = "list_tasks"
+            if 'date' in entities:
+                data['date'] = entities['date'][0]
+            if 'category' in entities:
+                data['category'] = entities['category'][0]
+            response = "Here are your tasks"
+        
+        elif intent["tag"] == "create_habit":
+            action = "create_habit"
+            # Extract habit details
+            habit = {"name": context.text}
+            
+            # Remove entities from name
+            for entity_type, entity_values in entities.items():
+                for entity in entity_values:
+                    habit["name"] = habit["name"].replace(entity, "").strip()
+            
+            # Add entities to habit
+            if 'category' in entities and entities['category']:
+                habit['category'] = entities['category'][0].lower()
+            
+            # Clean up name
+            for phrase in ["track habit", "new habit", "create habit", "add habit", "start tracking"]:
+                habit["name"] = habit["name"].replace(phrase, "").strip()
+            
+            data = habit
+            response = f"Creating habit: {data['name']}"
+        
+        # Return the response
+        return {
+            "intent": intent["tag"],
+            "confidence": intent["confidence"],
+            "action": action,
+            "response": response,
+            "entities": entities,
+            "data": data
+        }
@@ -0,0 +1,90 @@
+import threading
+
+# Components each execution profile needs. None means the whole pipeline.
+# Static word vectors, stop-word and punctuation flags come from the
+# vocabulary, so 'vectors-only' runs nothing but the tokenizer.
+# 'productivity_ruler' is the entity ruler NLPService adds after NER.
+PIPELINE_PROFILES = {
+    'full': None,
+    'ner-only': ('ner', 'productivity_ruler'),
+    'vectors-only': (),
+}
+
+# Profiles ordered from cheapest to most complete
+PROFILE_ORDER = ('vectors-only', 'ner-only', 'full')
+
+_disabled_cache = {}
+
+
+def disabled_components(nlp, profile):
+    """
+    Components to disable on a pipeline for a given profile
+
+    Components that listen to a shared tok2vec keep it enabled, so a profile
+    stays valid whichever way the loaded model wires its embeddings.
+
+    Args:
+        nlp (Language): Loaded spaCy pipeline
+        profile (str): Name of a profile in PIPELINE_PROFILES
+
+    Returns:
+        list: Component names to pass as `disable`
+    """
+    if profile not in PIPELINE_PROFILES:
+        raise ValueError(f"Unknown pipeline profile: {profile}")
+
+    key = (id(nlp), tuple(nlp.pipe_names), profile)
+    if key in _disabled_cache:
+        return _disabled_cache[key]
+
+    wanted = PIPELINE_PROFILES[profile]
+    if wanted is None:
+        disabled = []
+    else:
+        enabled = {name for name in wanted if name in nlp.pipe_names}
+        for name, component in nlp.pipeline:
+            listeners = getattr(component, 'listening_components', None) or []
+            if enabled.intersection(listeners):
+                enabled.add(name)
+        disabled = [name for name in nlp.pipe_names if name not in enabled]
+
+    _disabled_cache[key] = disabled
+    return disabled
+
+
+def widest_profile(profiles):
+    """Smallest profile that covers every profile in the list"""
+    ranks = [PROFILE_ORDER.index(profile) for profile in profiles]
+    return PROFILE_ORDER[max(ranks)] if ranks else 'full'
+
+
+class ProfileTimings:
+    """Running latency totals per pipeline profile"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+
+    def record(self, profile, seconds, docs=1):
+        """Record the time spent parsing docs under a profile"""
+        with self._lock:
+            calls, count, total = self._totals.get(profile, (0, 0, 0.0))
+            self._totals[profile] = (calls + 1, count + docs, total + seconds)
+
+    def report(self):
+        """Docs parsed and mean per-doc latency for each profile"""
+        with self._lock:
+            totals = dict(self._totals)
+        return {
+            profile: {
+                "calls": calls,
+                "docs": docs,
+                "total_ms": round(total * 1000, 3),
+                "mean_ms_per_doc": round(total * 1000 / docs, 3) if docs else 0,
+            }
+            for profile, (calls, docs, total) in totals.items()
+        }
+
+
+# Shared by every service in the process
+profile_timings = ProfileTimings()
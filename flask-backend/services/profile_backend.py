@@ -0,0 +1,45 @@
+from contextlib import nullcontext
+
+from flask import has_app_context
+
+from models.db import db
+from models.user_profile import UserProfile
+
+
+class SQLAlchemyProfileBackend:
+    """Reads and writes profiles in the user_profiles table"""
+
+    def __init__(self, app):
+        """
+        Args:
+            app (Flask): Application whose database holds the profiles
+        """
+        self.app = app
+
+    def _app_context(self):
+        # Request threads already have a context; pushing a second one would
+        # remove the request's session when it is popped
+        return nullcontext() if has_app_context() else self.app.app_context()
+
+    def load(self, user_id):
+        """Stored profile of a user, or None"""
+        with self._app_context():
+            row = UserProfile.query.filter_by(userId=user_id).first()
+            return row.profile if row else None
+
+    def save_many(self, profiles):
+        """Upsert a batch of profiles in a single transaction"""
+        with self._app_context():
+            try:
+                rows = UserProfile.query.filter(UserProfile.userId.in_(list(profiles))).all()
+                existing = {row.userId: row for row in rows}
+                for user_id, profile in profiles.items():
+                    row = existing.get(user_id)
+                    if row is None:
+                        db.session.add(UserProfile(userId=user_id, profile=profile))
+                    else:
+                        row.profile = profile
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
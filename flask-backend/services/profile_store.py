@@ -0,0 +1,225 @@
+# Kept identical in flask-backend and python-ai-service; each service has
+# its own backend in profile_backend.py
+import atexit
+import copy
+import itertools
+import os
+import threading
+from collections import OrderedDict
+
+
+class ProfileStore:
+    """Bounded LRU of user profiles in front of a database table, with write-behind"""
+
+    def __init__(self, backend=None, default_factory=dict, max_size=1000, flush_interval=5.0, flush_batch=100):
+        """
+        Initialize the store
+
+        Profiles are read from the backend once, on a cache miss, and then
+        served from memory. Changes are written to the cache immediately and
+        to the backend by a background thread, batched every flush_interval
+        seconds or as soon as flush_batch profiles are pending.
+
+        Args:
+            backend: Object with load(user_id) and save_many(profiles); None
+                keeps profiles in memory only
+            default_factory (callable): Builds the profile of an unknown user
+            max_size (int): Profiles kept in memory
+            flush_interval (float): Seconds between background flushes
+            flush_batch (int): Pending profiles that trigger an early flush
+        """
+        self.backend = backend
+        self.default_factory = default_factory
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+
+        self._cache = OrderedDict()
+        # user_id -> (write number, profile) until the backend has it
+        self._dirty = {}
+        self._writes = itertools.count(1)
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_errors = 0
+        self.flushes = 0
+        self.flushed = 0
+        self.flush_errors = 0
+
+    @classmethod
+    def from_env(cls, backend=None, default_factory=dict):
+        """Build a store from PROFILE_CACHE_SIZE / PROFILE_FLUSH_INTERVAL / PROFILE_FLUSH_BATCH"""
+        return cls(
+            backend=backend,
+            default_factory=default_factory,
+            max_size=int(os.environ.get('PROFILE_CACHE_SIZE', 1000)),
+            flush_interval=float(os.environ.get('PROFILE_FLUSH_INTERVAL', 5)),
+            flush_batch=int(os.environ.get('PROFILE_FLUSH_BATCH', 100))
+        )
+
+    def get(self, user_id, strict=False):
+        """
+        Return a user's profile, loading it from the backend on a miss
+
+        The returned dict is shared with the cache and must not be changed
+        in place; use update() so changes are persisted.
+
+        Args:
+            user_id: The user
+            strict (bool): Re-raise a backend load error instead of
+                returning the default profile
+        """
+        with self._lock:
+            profile = self._cache.get(user_id)
+            if profile is not None:
+                self._cache.move_to_end(user_id)
+                self.hits += 1
+                return profile
+            self.misses += 1
+            # An evicted profile may still be waiting to be written
+            pending = self._dirty.get(user_id)
+            profile = pending[1] if pending else None
+
+        if profile is None:
+            try:
+                profile = self.backend.load(user_id) if self.backend else None
+            except Exception as e:
+                with self._lock:
+                    self.load_errors += 1
+                print(f"Error loading profile for user {user_id}: {str(e)}")
+                if strict:
+                    raise
+                # Not cached, so the next request retries the database
+                return self.default_factory()
+            if profile is None:
+                profile = self.default_factory()
+
+        with self._lock:
+            # Another thread may have loaded or updated it meanwhile
+            profile = self._cache.setdefault(user_id, profile)
+            self._cache.move_to_end(user_id)
+            self._evict()
+        return profile
+
+    def put(self, user_id, profile):
+        """Replace a user's profile and schedule it to be written"""
+        with self._lock:
+            self._cache[user_id] = profile
+            self._cache.move_to_end(user_id)
+            self._evict()
+            if self.backend is None:
+                return
+            self._dirty[user_id] = (next(self._writes), profile)
+            pending = len(self._dirty)
+
+        self._ensure_thread()
+        if pending >= self.flush_batch:
+            self._wake.set()
+
+    def update(self, user_id, change):
+        """
+        Apply change(profile) to a copy of a user's profile and put() the copy
+
+        Updates are serialized, so concurrent changes to one profile are not
+        lost; readers keep seeing the previous profile until the put. The
+        profile is loaded strictly: a default built after a load error would
+        overwrite the stored profile on the next flush.
+
+        Returns:
+            dict: The updated profile
+
+        Raises:
+            Exception: The backend's load error; nothing is written
+        """
+        with self._update_lock:
+            profile = copy.deepcopy(self.get(user_id, strict=True))
+            change(profile)
+            self.put(user_id, profile)
+        return profile
+
+    def flush(self):
+        """
+        Write every pending profile to the backend in one batch
+
+        Profiles stay pending, and so readable after an eviction, until the
+        backend has committed them.
+
+        Returns:
+            int: Profiles written
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch = dict(self._dirty)
+            if not batch:
+                return 0
+
+            try:
+                self.backend.save_many({user_id: profile for user_id, (_, profile) in batch.items()})
+            except Exception as e:
+                with self._lock:
+                    self.flush_errors += 1
+                print(f"Error flushing {len(batch)} user profiles: {str(e)}")
+                return 0
+
+            with self._lock:
+                for user_id, (write, _) in batch.items():
+                    # A newer put() during the save is written next time
+                    if self._dirty.get(user_id, (None,))[0] == write:
+                        del self._dirty[user_id]
+                self.flushes += 1
+                self.flushed += len(batch)
+            return len(batch)
+
+    def close(self):
+        """Stop the background thread and write what is pending"""
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+        if self.backend is not None:
+            self.flush()
+
+    def stats(self):
+        """Cache and write-behind counters"""
+        with self._lock:
+            return {
+                "size": len(self._cache),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "load_errors": self.load_errors,
+                "pending_writes": len(self._dirty),
+                "flushes": self.flushes,
+                "flushed": self.flushed,
+                "flush_errors": self.flush_errors
+            }
+
+    def _evict(self):
+        # Pending writes live in _dirty, so eviction never loses a change
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._flush_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._flush_loop, name='profile-flush', daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _flush_loop(self):
+        while not self._stopped:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if not self._stopped:
+                self.flush()
@@ -1,16 +1,24 @@
-import spacy
 import os
+import time
 import numpy as np
-from collections import defaultdict
+
+from .model_registry import get_model
+from .lexicon_table import LexiconTable
+from .pipeline_profiles import disabled_components, profile_timings
+from .vectors import normalize_rows, token_matrix
 
 class SentimentAnalyzer:
     """Service for sentiment and emotion analysis"""
     
+    # Similarity a token needs to match a polarity word / count toward an emotion
+    POLARITY_THRESHOLD = 0.7
+    EMOTION_THRESHOLD = 0.5
+    
     def __init__(self):
         """Initialize the sentiment analyzer"""
         try:
-            # Load spaCy model
-            self.nlp = spacy.load("en_core_web_md")
+            # Load spaCy model (shared with the other services in this process)
+            self.nlp = get_model("en_core_web_md")
             
             # Emotion lexicon (simplified)
             self.emotion_lexicon = {
@@ -40,18 +48,42 @@ class SentimentAnalyzer:
                 'relieved': ['relieved', 'unburdened', 'destressed', 'unwound', 'relaxed', 'released']
             }
             
-            # Build lexicon vectors
-            self.emotion_vectors = {}
-            for emotion, words in self.emotion_lexicon.items():
-                vectors = [self.nlp(word).vector for word in words]
-                self.emotion_vectors[emotion] = np.mean(vectors, axis=0) if vectors else None
+            # Build lexicon vectors: the mean word vector of every emotion,
+            # normalized, as one (emotions x dims) matrix
+            self.emotion_names = [emotion for emotion, words in self.emotion_lexicon.items() if words]
+            self.emotion_matrix = normalize_rows([
+                np.mean([self.nlp.make_doc(word).vector for word in self.emotion_lexicon[emotion]], axis=0)
+                for emotion in self.emotion_names
+            ])
+            
+            # Normalized word vectors of the polarity lexicons, one row per word,
+            # so scoring a text is a single token-by-lexicon matrix product
+            self.polarity_matrices = {
+                polarity: normalize_rows([self.nlp.make_doc(word).vector for word in self.emotion_lexicon[polarity]])
+                for polarity in ('positive', 'negative')
+            }
+            
+            # Per-word scores precomputed for the whole vector table, shared
+            # read-only between workers; fall back to the matrices above
+            try:
+                self.lexicon_table = LexiconTable.load_or_build(
+                    self.nlp, self.emotion_lexicon, self.polarity_matrices,
+                    self.emotion_names, self.emotion_matrix,
+                    self.POLARITY_THRESHOLD, self.EMOTION_THRESHOLD
+                )
+            except Exception as e:
+                print(f"Lexicon table unavailable, scoring with vectors: {str(e)}")
+                self.lexicon_table = None
             
             print("Sentiment Analyzer initialized successfully")
         except Exception as e:
             print(f"Error initializing Sentiment Analyzer: {str(e)}")
             # Fallback to empty model
             self.nlp = None
-            self.emotion_vectors = {}
+            self.emotion_names = []
+            self.emotion_matrix = None
+            self.polarity_matrices = {}
+            self.lexicon_table = None
     
     def analyze_sentiment(self, text):
         """
@@ -76,108 +108,11 @@ class SentimentAnalyzer:
             }
         
         try:
-            # Process text with spaCy
-            doc = self.nlp(text)
-            
-            # Extract tokens and filter stop words and punctuation
-            tokens = [token for token in doc if not token.is_stop and not token.is_punct]
-            
-            # If no significant tokens, return neutral
-            if not tokens:
-                return {
-                    "sentiment": "neutral",
-                    "score": 0,
-                    "emotions": {},
-                    "productivity_mood": {
-                        "motivation": "neutral",
-                        "productivity": "neutral",
-                        "stress": "neutral"
-                    }
-                }
-            
-            # Calculate sentiment using positive/negative lexicon
-            sentiment_score = 0
-            positive_count = 0
-            negative_count = 0
-            
-            for token in tokens:
-                if any(token.similarity(self.nlp(word)) > 0.7 for word in self.emotion_lexicon['positive']):
-                    sentiment_score += 1
-                    positive_count += 1
-                elif any(token.similarity(self.nlp(word)) > 0.7 for word in self.emotion_lexicon['negative']):
-                    sentiment_score -= 1
-                    negative_count += 1
-            
-            # Normalize score between -1 and 1
-            if positive_count + negative_count > 0:
-                sentiment_score = sentiment_score / (positive_count + negative_count)
-            
-            # Determine sentiment label
-            sentiment = "neutral"
-            if sentiment_score > 0.2:
-                sentiment = "positive"
-            elif sentiment_score < -0.2:
-                sentiment = "negative"
-            
-            # Calculate emotion scores
-            emotions = defaultdict(float)
-            for token in tokens:
-                token_vector = token.vector
-                
-                for emotion, emotion_vector in self.emotion_vectors.items():
-                    if emotion_vector is not None:
-                        # Calculate cosine similarity
-                        similarity = np.dot(token_vector, emotion_vector) / (np.linalg.norm(token_vector) * np.linalg.norm(emotion_vector))
-                        
-                        if similarity > 0.5:  # Threshold for emotion detection
-                            emotions[emotion] += similarity
-            
-            # Normalize emotion scores and filter out low scores
-            all_scores = list(emotions.values())
-            if all_scores:
-                max_score = max(all_scores)
-                if max_score > 0:
-                    for emotion in list(emotions.keys()):
-                        emotions[emotion] = emotions[emotion] / max_score
-                        
-                        # Filter out emotions with low scores
-                        if emotions[emotion] < 0.3:
-                            del emotions[emotion]
-            
-            # Calculate productivity-specific metrics
-            productivity_mood = {
-                "motivation": "neutral",
-                "productivity": "neutral",
-                "stress": "neutral"
-            }
-            
-            # Determine motivation level
-            motivation_score = emotions.get('motivated', 0) - emotions.get('unmotivated', 0)
-            if motivation_score > 0.3:
-                productivity_mood["motivation"] = "high"
-            elif motivation_score < -0.3:
-                productivity_mood["motivation"] = "low"
-                
-            # Determine productivity level
-            productivity_score = emotions.get('productive', 0) - emotions.get('unproductive', 0)
-            if productivity_score > 0.3:
-                productivity_mood["productivity"] = "high"
-            elif productivity_score < -0.3:
-                productivity_mood["productivity"] = "low"
-                
-            # Determine stress level
-            stress_score = emotions.get('stressed', 0) - emotions.get('relieved', 0)
-            if stress_score > 0.3:
-                productivity_mood["stress"] = "high"
-            elif stress_score < -0.3:
-                productivity_mood["stress"] = "low"
-            
-            return {
-                "sentiment": sentiment,
-                "score": sentiment_score,
-                "emotions": dict(emotions),
-                "productivity_mood": productivity_mood
-            }
+            # Lexicon scoring reads only vectors and stop-word flags
+            start = time.perf_counter()
+            doc = self.nlp(text, disable=disabled_components(self.nlp, 'vectors-only'))
+            profile_timings.record('vectors-only', time.perf_counter() - start)
+            return self.analyze_doc(doc)
         except Exception as e:
             print(f"Error analyzing sentiment: {str(e)}")
             return {
@@ -192,6 +127,157 @@ class SentimentAnalyzer:
                 "error": str(e)
             }
     
+    def analyze_doc(self, doc):
+        """
+        Analyze sentiment and emotions in an already parsed Doc
+        
+        Args:
+            doc (Doc): Parsed text
+            
+        Returns:
+            dict: Sentiment and emotion analysis results
+        """
+        return self.analyze_docs([doc])[0]
+    
+    def analyze_docs(self, docs):
+        """
+        Analyze sentiment and emotions in a batch of parsed Docs
+        
+        The significant tokens of every Doc are gathered into one array and
+        scored with one lexicon table lookup, or without a table with one
+        matrix product per lexicon and one for all emotion categories.
+        
+        Args:
+            docs (list): Parsed texts
+            
+        Returns:
+            list: Sentiment and emotion analysis results, one per Doc
+        """
+        # Extract tokens and filter stop words and punctuation
+        token_lists = [[token for token in doc if not token.is_stop and not token.is_punct] for doc in docs]
+        tokens = [token for doc_tokens in token_lists for token in doc_tokens]
+        
+        if self.lexicon_table is not None:
+            # Column 0 is the polarity, the rest the thresholded emotion scores
+            scores = self.lexicon_table.lookup(tokens)
+            is_positive = scores[:, 0] > 0
+            is_negative = scores[:, 0] < 0
+            emotion_hits = scores[:, 1:]
+        else:
+            vectors = token_matrix(tokens, self.nlp.vocab.vectors_length)
+            
+            # Positive/negative lexicon matches per token: a token counts as
+            # positive if it is close to any positive word, else as negative if
+            # it is close to any negative word
+            positive_similarities = vectors @ self.polarity_matrices['positive'].T
+            negative_similarities = vectors @ self.polarity_matrices['negative'].T
+            is_positive = (positive_similarities > self.POLARITY_THRESHOLD).any(axis=1)
+            is_negative = (negative_similarities > self.POLARITY_THRESHOLD).any(axis=1) & ~is_positive
+            
+            # Cosine similarity of every token with every emotion, keeping only
+            # similarities above the emotion detection threshold
+            similarities = vectors @ self.emotion_matrix.T
+            emotion_hits = np.where(similarities > self.EMOTION_THRESHOLD, similarities, 0)
+        
+        results = []
+        start = 0
+        for doc_tokens in token_lists:
+            end = start + len(doc_tokens)
+            if doc_tokens:
+                emotion_sums = emotion_hits[start:end].sum(axis=0)
+                results.append(self._build_result(
+                    int(is_positive[start:end].sum()),
+                    int(is_negative[start:end].sum()),
+                    {emotion: float(score) for emotion, score in zip(self.emotion_names, emotion_sums) if score > 0}
+                ))
+            else:
+                # If no significant tokens, return neutral
+                results.append({
+                    "sentiment": "neutral",
+                    "score": 0,
+                    "emotions": {},
+                    "productivity_mood": {
+                        "motivation": "neutral",
+                        "productivity": "neutral",
+                        "stress": "neutral"
+                    }
+                })
+            start = end
+        
+        return results
+    
+    def _build_result(self, positive_count, negative_count, emotions):
+        """
+        Turn lexicon counts and raw emotion scores into an analysis result
+        
+        Args:
+            positive_count (int): Tokens matching the positive lexicon
+            negative_count (int): Tokens matching the negative lexicon
+            emotions (dict): Summed similarity per detected emotion
+            
+        Returns:
+            dict: Sentiment and emotion analysis results
+        """
+        sentiment_score = positive_count - negative_count
+        
+        # Normalize score between -1 and 1
+        if positive_count + negative_count > 0:
+            sentiment_score = sentiment_score / (positive_count + negative_count)
+        
+        # Determine sentiment label
+        sentiment = "neutral"
+        if sentiment_score > 0.2:
+            sentiment = "positive"
+        elif sentiment_score < -0.2:
+            sentiment = "negative"
+        
+        # Normalize emotion scores and filter out low scores
+        all_scores = list(emotions.values())
+        if all_scores:
+            max_score = max(all_scores)
+            if max_score > 0:
+                for emotion in list(emotions.keys()):
+                    emotions[emotion] = emotions[emotion] / max_score
+                    
+                    # Filter out emotions with low scores
+                    if emotions[emotion] < 0.3:
+                        del emotions[emotion]
+        
+        # Calculate productivity-specific metrics
+        productivity_mood = {
+            "motivation": "neutral",
+            "productivity": "neutral",
+            "stress": "neutral"
+        }
+        
+        # Determine motivation level
+        motivation_score = emotions.get('motivated', 0) - emotions.get('unmotivated', 0)
+        if motivation_score > 0.3:
+            productivity_mood["motivation"] = "high"
+        elif motivation_score < -0.3:
+            productivity_mood["motivation"] = "low"
+            
+        # Determine productivity level
+        productivity_score = emotions.get('productive', 0) - emotions.get('unproductive', 0)
+        if productivity_score > 0.3:
+            productivity_mood["productivity"] = "high"
+        elif productivity_score < -0.3:
+            productivity_mood["productivity"] = "low"
+            
+        # Determine stress level
+        stress_score = emotions.get('stressed', 0) - emotions.get('relieved', 0)
+        if stress_score > 0.3:
+            productivity_mood["stress"] = "high"
+        elif stress_score < -0.3:
+            productivity_mood["stress"] = "low"
+        
+        return {
+            "sentiment": sentiment,
+            "score": sentiment_score,
+            "emotions": dict(emotions),
+            "productivity_mood": productivity_mood
+        }
+    
     def get_productive_insights(self, text):
         """
         Get productivity insights from text
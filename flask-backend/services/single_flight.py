@@ -0,0 +1,88 @@
+import copy
+import threading
+from collections import Counter
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Lets concurrent identical requests share one computation"""
+
+    def __init__(self):
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.requests = Counter()
+        self.executions = Counter()
+
+    def claim(self, endpoint, key):
+        """
+        Join the computation for a key, starting it if none is running
+
+        The caller that gets leader=True must finish the future with
+        resolve() or fail(); everyone else waits on it.
+
+        Args:
+            endpoint (str): Endpoint name, reported in stats()
+            key (tuple): Everything the result depends on
+
+        Returns:
+            tuple: (concurrent.futures.Future, leader)
+        """
+        key = (endpoint,) + tuple(key)
+        with self._lock:
+            self.requests[endpoint] += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._in_flight[key] = future
+            self.executions[endpoint] += 1
+            return future, True
+
+    def resolve(self, endpoint, key, future, result):
+        """Hand the leader's result to every waiting caller"""
+        self._finish(endpoint, key)
+        future.set_result(result)
+
+    def fail(self, endpoint, key, future, error):
+        """Raise the leader's error in every waiting caller"""
+        self._finish(endpoint, key)
+        future.set_exception(error)
+
+    def do(self, endpoint, key, fn, *args):
+        """
+        Return fn(*args), sharing one call with concurrent callers of the same key
+
+        Waiting callers get a copy of the result, so no two requests hold
+        the same object.
+        """
+        future, leader = self.claim(endpoint, key)
+        if not leader:
+            return copy.deepcopy(future.result())
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            self.fail(endpoint, key, future, e)
+            raise
+        self.resolve(endpoint, key, future, result)
+        return result
+
+    def stats(self):
+        """Requests, model runs and coalesced requests per endpoint"""
+        with self._lock:
+            return {
+                endpoint: {
+                    "requests": self.requests[endpoint],
+                    "executions": self.executions[endpoint],
+                    "coalesced": self.requests[endpoint] - self.executions[endpoint],
+                }
+                for endpoint in self.requests
+            }
+
+    def _finish(self, endpoint, key):
+        # Later requests for the key start a new computation
+        with self._lock:
+            self._in_flight.pop((endpoint,) + tuple(key), None)
+
+
+# Shared by every request thread in the process
+single_flight = SingleFlight()
@@ -0,0 +1,296 @@
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import timezone
+
+from dateutil.tz import tzlocal
+
+import numpy as np
+import pandas as pd
+
+from models.task import Task
+
+WEEKDAYS = 7
+
+# Same boundaries as MLPredictor._get_time_of_day
+HOUR_BUCKETS = ('morning', 'afternoon', 'evening')
+_BUCKET_OF_HOUR = np.array([2] * 5 + [0] * 7 + [1] * 6 + [2] * 6)
+
+# Tasks without a category are counted under this name
+UNCATEGORIZED = 'general'
+
+# Weight of the same weekday (any time) and the same time (any weekday)
+# when scoring a slot, so sparse histories still rank sensibly
+BACKOFF_WEIGHT = 0.25
+
+HISTORY_COLUMNS = ['title', 'category', 'completed', 'createdAt', 'dueDate']
+
+
+def local_time(when):
+    """A stored timestamp (naive UTC) in the server's local time, as MLPredictor reads the clock"""
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when.astimezone(tzlocal())
+
+
+def task_slot(task):
+    """Local weekday and hour bucket a task belongs to: its due date, else its creation time"""
+    when = task.dueDate or task.createdAt
+    if when is None:
+        return None
+    when = local_time(when)
+    return when.weekday(), int(_BUCKET_OF_HOUR[when.hour])
+
+
+def task_state(task):
+    """Snapshot of the task fields the engine counts, taken before an update"""
+    return {
+        'slot': task_slot(task),
+        'category': task.category or UNCATEGORIZED,
+        'title': task.title,
+        'completed': bool(task.completed)
+    }
+
+
+def load_task_history(user_id):
+    """All of a user's tasks as a DataFrame with HISTORY_COLUMNS"""
+    rows = Task.query.with_entities(
+        Task.title, Task.category, Task.completed, Task.createdAt, Task.dueDate
+    ).filter_by(userId=user_id).all()
+    return pd.DataFrame.from_records(rows, columns=HISTORY_COLUMNS)
+
+
+class TaskPatterns:
+    """Per-user (weekday x hour bucket x category) task and completion counts"""
+
+    def __init__(self, categories, counts=None, completed=None, titles=None):
+        """
+        Args:
+            categories (list): Category of each position on the last axis
+            counts (ndarray): Tasks per (weekday, bucket, category)
+            completed (ndarray): Completed tasks per (weekday, bucket, category)
+            titles (dict): Category to Counter of task titles
+        """
+        shape = (WEEKDAYS, len(HOUR_BUCKETS), len(categories))
+        self.categories = list(categories)
+        self.index = {category: i for i, category in enumerate(self.categories)}
+        self.counts = counts if counts is not None else np.zeros(shape)
+        self.completed = completed if completed is not None else np.zeros(shape)
+        self.titles = titles or {}
+        self.built_at = time.time()
+
+    @classmethod
+    def from_frame(cls, frame):
+        """
+        Build the tensors from a task history in one vectorized pass
+
+        Args:
+            frame (DataFrame): Tasks with HISTORY_COLUMNS
+
+        Returns:
+            TaskPatterns: Counts for every slot and category
+        """
+        if frame.empty:
+            return cls([])
+
+        when = pd.to_datetime(frame['dueDate']).fillna(pd.to_datetime(frame['createdAt']))
+        # Stored in UTC; bucketed in local time like task_slot
+        when = when.dt.tz_localize('UTC').dt.tz_convert(tzlocal())
+        frame = frame.assign(when=when).dropna(subset=['when'])
+        if frame.empty:
+            return cls([])
+
+        category = frame['category'].fillna(UNCATEGORIZED)
+        codes, categories = pd.factorize(category)
+        weekday = frame['when'].dt.weekday.to_numpy()
+        bucket = _BUCKET_OF_HOUR[frame['when'].dt.hour.to_numpy()]
+
+        shape = (WEEKDAYS, len(HOUR_BUCKETS), len(categories))
+        flat = np.ravel_multi_index((weekday, bucket, codes), shape)
+        size = int(np.prod(shape))
+        counts = np.bincount(flat, minlength=size).reshape(shape).astype(float)
+        completed = np.bincount(
+            flat, weights=frame['completed'].fillna(False).astype(float).to_numpy(), minlength=size
+        ).reshape(shape)
+
+        titles = {}
+        grouped = frame.assign(category=category).groupby(['category', 'title']).size()
+        for (name, title), total in grouped.items():
+            titles.setdefault(name, Counter())[title] = int(total)
+
+        return cls(list(categories), counts, completed, titles)
+
+    def _category_index(self, category):
+        if category not in self.index:
+            self.index[category] = len(self.categories)
+            self.categories.append(category)
+            pad = np.zeros(self.counts.shape[:2] + (1,))
+            self.counts = np.concatenate([self.counts, pad], axis=2)
+            self.completed = np.concatenate([self.completed, pad], axis=2)
+        return self.index[category]
+
+    def apply(self, state, sign=1):
+        """
+        Add (sign=1) or remove (sign=-1) one task's contribution
+
+        Args:
+            state (dict): Output of task_state
+            sign (int): 1 to count the task, -1 to uncount it
+        """
+        if state['slot'] is None:
+            return
+        weekday, bucket = state['slot']
+        position = (weekday, bucket, self._category_index(state['category']))
+        self.counts[position] = max(0.0, self.counts[position] + sign)
+        if state['completed']:
+            self.completed[position] = max(0.0, self.completed[position] + sign)
+
+        titles = self.titles.setdefault(state['category'], Counter())
+        titles[state['title']] += sign
+        if titles[state['title']] <= 0:
+            del titles[state['title']]
+
+    def rank(self, weekday, bucket):
+        """
+        Categories ranked for a slot by frequency and completion rate
+
+        Returns:
+            list: (category, score, completion_rate) for categories seen near the slot
+        """
+        if not self.categories:
+            return []
+
+        def around(tensor):
+            return tensor[weekday, bucket] + BACKOFF_WEIGHT * (tensor[weekday].sum(axis=0) + tensor[:, bucket].sum(axis=0))
+
+        frequency = around(self.counts)
+        # Laplace smoothing keeps one completed task from scoring a perfect rate
+        rate = (around(self.completed) + 1) / (frequency + 2)
+        scores = np.log1p(frequency) * rate
+
+        order = np.argsort(-scores, kind='stable')
+        return [
+            (self.categories[i], float(scores[i]), float(rate[i]))
+            for i in order if frequency[i] > 0
+        ]
+
+    def top_titles(self, category, limit):
+        """A category's most frequent task titles"""
+        return [title for title, _ in self.titles.get(category, Counter()).most_common(limit)]
+
+
+class SuggestionEngine:
+    """Learned task patterns per user, built from the tasks table and kept up to date"""
+
+    def __init__(self, loader=load_task_history, max_users=1000, max_age=900):
+        """
+        Initialize the engine
+
+        A user's patterns are built from their full history on first use and
+        then updated in place as tasks are created, changed or deleted. Other
+        worker processes only see those changes once their copy is rebuilt,
+        which happens after max_age seconds.
+
+        Args:
+            loader (callable): Returns a user's task history as a DataFrame
+            max_users (int): Users whose patterns are kept in memory
+            max_age (float): Seconds before a user's patterns are rebuilt
+        """
+        self.loader = loader
+        self.max_users = max_users
+        self.max_age = max_age
+        self._patterns = OrderedDict()
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.updates = 0
+
+    @classmethod
+    def from_env(cls):
+        """Build an engine from SUGGESTION_CACHE_SIZE / SUGGESTION_MAX_AGE"""
+        return cls(
+            max_users=int(os.environ.get('SUGGESTION_CACHE_SIZE', 1000)),
+            max_age=float(os.environ.get('SUGGESTION_MAX_AGE', 900))
+        )
+
+    def patterns(self, user_id):
+        """A user's patterns, built from the database when missing or stale"""
+        with self._lock:
+            patterns = self._patterns.get(user_id)
+            if patterns is not None and time.time() - patterns.built_at < self.max_age:
+                self._patterns.move_to_end(user_id)
+                return patterns
+
+        patterns = TaskPatterns.from_frame(self.loader(user_id))
+        with self._lock:
+            self.builds += 1
+            self._patterns[user_id] = patterns
+            self._patterns.move_to_end(user_id)
+            while len(self._patterns) > self.max_users:
+                self._patterns.popitem(last=False)
+        return patterns
+
+    def _update(self, user_id, before=None, after=None):
+        with self._lock:
+            patterns = self._patterns.get(user_id)
+            # Users not in memory pick the change up when their patterns are built
+            if patterns is None:
+                return
+            if before is not None:
+                patterns.apply(before, -1)
+            if after is not None:
+                patterns.apply(after, 1)
+            self.updates += 1
+
+    def snapshot(self, task):
+        """A task's counted state before an update or delete (see task_state)"""
+        return task_state(task)
+
+    def record_created(self, task):
+        """Count a newly created task"""
+        self._update(task.userId, after=task_state(task))
+
+    def record_updated(self, task, before):
+        """Move an updated task from its previous state (see task_state) to its current one"""
+        self._update(task.userId, before=before, after=task_state(task))
+
+    def record_deleted(self, user_id, before):
+        """Uncount a deleted task"""
+        self._update(user_id, before=before)
+
+    def suggest(self, user_id, when, limit=5, titles_per_category=2):
+        """
+        Ranked categories and the user's usual tasks for a moment in time
+
+        Args:
+            user_id: User identifier
+            when (datetime): Moment to suggest for, in local time
+            limit (int): Categories to return
+            titles_per_category (int): Past task titles returned per category
+
+        Returns:
+            list: Dicts with category, score, completion_rate and titles
+        """
+        patterns = self.patterns(user_id)
+        bucket = int(_BUCKET_OF_HOUR[when.hour])
+        with self._lock:
+            ranked = patterns.rank(when.weekday(), bucket)[:limit]
+            return [
+                {
+                    'category': category,
+                    'score': round(score, 4),
+                    'completion_rate': round(rate, 4),
+                    'titles': patterns.top_titles(category, titles_per_category)
+                }
+                for category, score, rate in ranked
+            ]
+
+    def stats(self):
+        """Cached users, full builds and incremental updates"""
+        with self._lock:
+            return {
+                "users": len(self._patterns),
+                "max_users": self.max_users,
+                "builds": self.builds,
+                "updates": self.updates
+            }
@@ -0,0 +1,13 @@
+from .lazy_service import LazyService
+
+
+def _create_suggestion_engine():
+    """Suggestion engine; importing it loads pandas and numpy"""
+    from .suggestion_engine import SuggestionEngine
+    return SuggestionEngine.from_env()
+
+
+# Built by the ML predictor on first use. The task routes only report
+# changes once it is loaded: until then there are no patterns to keep
+# current, since they are built from the tasks table on first use.
+suggestion_engine = LazyService('suggestions', _create_suggestion_engine)
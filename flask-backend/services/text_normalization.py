@@ -0,0 +1,3 @@
+def normalize_text(text):
+    """Collapse whitespace so equivalent commands share a cache entry"""
+    return ' '.join(text.split())
@@ -0,0 +1,45 @@
+from flask import current_app
+
+from .lazy_service import LazyService
+from .profile_backend import SQLAlchemyProfileBackend
+from .profile_store import ProfileStore
+
+# Categories kept in a profile, most recently used first
+MAX_PREFERRED_CATEGORIES = 5
+
+
+def default_profile():
+    """Profile of a user with no stored preferences"""
+    return {
+        'preferred_categories': ['work', 'personal', 'health'],
+        'common_tasks': [
+            "Check emails",
+            "Team meeting",
+            "Exercise",
+            "Read"
+        ]
+    }
+
+
+def _create_profile_store():
+    """Profile store backed by the app's user_profiles table"""
+    backend = SQLAlchemyProfileBackend(current_app._get_current_object())
+    return ProfileStore.from_env(backend, default_profile)
+
+
+# Shared by the ML predictor, which reads profiles, and the task routes,
+# which keep them current. Building it loads no NLP models.
+profile_store = LazyService('profiles', _create_profile_store)
+
+
+def record_task_category(user_id, category):
+    """Move the category of a task the user just saved to the front of their preferred categories"""
+    if not category:
+        return
+    category = category.lower()
+
+    def prefer(profile):
+        others = [name for name in profile.get('preferred_categories', []) if name != category]
+        profile['preferred_categories'] = [category] + others[:MAX_PREFERRED_CATEGORIES - 1]
+
+    profile_store.get().update(user_id, prefer)
@@ -0,0 +1,36 @@
+import numpy as np
+
+
+def normalize_rows(vectors):
+    """
+    Scale each row of a matrix to unit length
+
+    Rows without a vector (all zeros) stay zero, so their cosine similarity
+    with anything is 0, as with spaCy's similarity methods.
+
+    Args:
+        vectors (ndarray): Matrix with one vector per row
+
+    Returns:
+        ndarray: float32 matrix of unit-length (or zero) rows
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def token_matrix(tokens, width):
+    """
+    Normalized vectors of a sequence of tokens, one row per token
+
+    Args:
+        tokens (list): spaCy tokens
+        width (int): Vector width, used when there are no tokens
+
+    Returns:
+        ndarray: (len(tokens), width) float32 matrix
+    """
+    if not tokens:
+        return np.zeros((0, width), dtype=np.float32)
+    return normalize_rows([token.vector for token in tokens])
@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+import pytest
+
+from services.intent_matcher import KeywordIntentMatcher
+
+# The default intents of NLPService._load_intents
+INTENTS = {
+    "intents": [
+        {"tag": "greeting", "patterns": ["hi", "hello", "hey", "good morning", "good evening", "hi there"]},
+        {"tag": "goodbye", "patterns": ["bye", "see you", "goodbye", "exit", "quit"]},
+        {"tag": "add_task", "patterns": ["add task", "create task", "new task", "add a task",
+                                         "create a new task", "remind me to"]},
+        {"tag": "create_habit", "patterns": ["track habit", "new habit", "create habit", "add habit",
+                                             "start tracking"]},
+    ]
+}
+
+
+class WhitespaceTokenizer:
+    """Stands in for a spaCy pipeline: the matcher only needs make_doc"""
+
+    def make_doc(self, text):
+        return [SimpleNamespace(lower_=token) for token in text.lower().split()]
+
+
+@pytest.fixture
+def matcher():
+    return KeywordIntentMatcher(WhitespaceTokenizer(), INTENTS)
+
+
+def tag(matcher, text):
+    intent, status = matcher.match(text.lower().split())
+    return (intent["tag"] if intent else None), status
+
+
+@pytest.mark.parametrize("text", [
+    "i want to quit smoking",
+    "prepare exit interview notes",
+    "book a good morning meeting",
+    "call the client about new task board",
+])
+def test_trigger_words_inside_a_command_do_not_match(matcher, text):
+    assert tag(matcher, text) == (None, 'no_match')
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("remind me to say hello to mom", "add_task"),
+    ("add task buy milk", "add_task"),
+    ("create a new task review budget", "add_task"),
+    ("good morning", "greeting"),
+    ("hi there", "greeting"),
+    ("hello !", "greeting"),
+    ("quit", "goodbye"),
+    ("see you", "goodbye"),
+    ("track habit running", "create_habit"),
+])
+def test_leading_trigger_phrase_matches(matcher, text, expected):
+    assert tag(matcher, text) == (expected, 'keyword')
+
+
+def test_single_word_pattern_needs_the_whole_utterance(matcher):
+    assert tag(matcher, "exit interview prep") == (None, 'no_match')
+    assert tag(matcher, "hey add task buy milk") == (None, 'no_match')
@@ -0,0 +1,143 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from services import nlp_executor as executor_module
+from services.nlp_executor import NLPExecutor, QueueFullError, WorkersUnavailableError
+
+
+class BlockingService:
+    """Stands in for a worker's service: each call waits until released"""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def process(self, text):
+        self.release.wait(5)
+        return text
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = BlockingService()
+    monkeypatch.setitem(executor_module._worker_services, 'nlp', service)
+    yield service
+    service.release.set()
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    # Threads instead of worker processes, so the fake service is shared
+    executor = NLPExecutor(workers=1, max_queue=0, timeout=0.05)
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(executor, '_get_pool', lambda: pool)
+    yield executor
+    pool.shutdown(wait=True)
+
+
+def wait_idle(executor):
+    # Slots are released by a done-callback, which may run just after result()
+    deadline = time.monotonic() + 5
+    while executor.stats()['in_flight'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert executor.stats()['in_flight'] == 0
+
+
+def test_timed_out_call_keeps_its_slot_until_the_worker_finishes(service, executor):
+    with pytest.raises(FutureTimeoutError):
+        executor.call('nlp', 'process', 'first')
+
+    # The worker is still busy with the first call
+    assert executor.stats()['in_flight'] == 1
+    with pytest.raises(QueueFullError):
+        executor.call('nlp', 'process', 'second')
+
+    service.release.set()
+    wait_idle(executor)
+    executor.timeout = 5
+    assert executor.call('nlp', 'process', 'third') == 'third'
+    wait_idle(executor)
+
+
+def test_restart_bumps_the_generation():
+    executor = NLPExecutor(workers=1)
+    assert executor.generation == 0
+    assert executor.restart() == 1
+    assert executor.stats()['generation'] == 1
+
+
+def test_restart_without_workers_keeps_the_generation():
+    executor = NLPExecutor(workers=0)
+    assert executor.restart() == 0
+
+
+class RefusingPool:
+    """A pool that refuses work, as a broken or shut-down pool does"""
+
+    def __init__(self, error, before=None):
+        self.error = error
+        self.before = before
+        self.shut_down = False
+
+    def submit(self, *args):
+        if self.before:
+            self.before()
+        raise self.error
+
+    def shutdown(self, wait=True):
+        self.shut_down = True
+
+
+@pytest.fixture
+def fresh_pools(monkeypatch):
+    # New pools run in threads, so the fake service is shared
+    pools = []
+
+    def new_pool():
+        pools.append(ThreadPoolExecutor(max_workers=1))
+        return pools[-1]
+
+    yield new_pool
+    for pool in pools:
+        pool.shutdown(wait=True)
+
+
+def test_broken_pool_is_replaced(service, fresh_pools, monkeypatch):
+    executor = NLPExecutor(workers=1, timeout=5)
+    broken = RefusingPool(BrokenProcessPool('a worker died'))
+    executor._pool = broken
+    monkeypatch.setattr(executor, '_new_pool', fresh_pools)
+    service.release.set()
+
+    assert executor.call('nlp', 'process', 'text') == 'text'
+    assert broken.shut_down
+    assert executor.generation == 1
+    wait_idle(executor)
+
+
+def test_pool_shut_down_by_a_concurrent_restart_is_replaced(service, fresh_pools, monkeypatch):
+    executor = NLPExecutor(workers=1, timeout=5)
+    # restart() runs after this call fetched the pool, before it submits
+    executor._pool = RefusingPool(RuntimeError('cannot schedule new futures after shutdown'),
+                                  before=executor.restart)
+    monkeypatch.setattr(executor, '_new_pool', fresh_pools)
+    service.release.set()
+
+    assert executor.call('nlp', 'process', 'text') == 'text'
+    # Only the restart replaced the workers
+    assert executor.generation == 1
+    wait_idle(executor)
+
+
+def test_pool_that_keeps_refusing_work_is_unavailable(monkeypatch):
+    executor = NLPExecutor(workers=1)
+    monkeypatch.setattr(executor, '_new_pool', lambda: RefusingPool(BrokenProcessPool('a worker died')))
+
+    with pytest.raises(WorkersUnavailableError):
+        executor.call('nlp', 'process', 'text')
+    assert executor.stats()['in_flight'] == 0
+    assert executor.stats()['failed'] == 1
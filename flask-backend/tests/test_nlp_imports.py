@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), '..')
+
+
+def imports_spacy(module):
+    """Whether importing module in a fresh interpreter imports spaCy"""
+    script = f"import sys, {module}; print('spacy' in sys.modules)"
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True,
+                            cwd=BACKEND_DIR)
+    return result.stdout.strip() == 'True'
+
+
+def test_model_registry_imports_spacy_on_first_load():
+    assert not imports_spacy('services.model_registry')
+
+
+def test_nlp_routes_do_not_import_spacy():
+    for dependency in ('flask', 'flask_jwt_extended', 'flask_sqlalchemy', 'pandas'):
+        pytest.importorskip(dependency)
+    assert not imports_spacy('routes.nlp')
@@ -0,0 +1,56 @@
+import pytest
+
+spacy = pytest.importorskip("spacy")
+pytest.importorskip("numpy")
+
+from services import nlp_service as nlp_module
+
+
+@pytest.fixture
+def service(monkeypatch):
+    # A blank pipeline keeps the test independent of the installed models
+    monkeypatch.setattr(nlp_module, "get_model", lambda name: spacy.blank("en"))
+    service = nlp_module.NLPService()
+    assert service.nlp is not None
+    return service
+
+
+def test_process_parses_once(service):
+    before = service.parse_count
+    result = service.process("add task buy milk tomorrow high priority")
+
+    assert result["action"] == "create_task"
+    assert service.parse_count - before == 1
+
+
+def test_cached_process_does_not_parse(service):
+    service.process("add task buy milk")
+    before = service.parse_count
+    service.process("  add task   buy milk ")
+
+    assert service.parse_count == before
+
+
+def test_command_context_stages_share_one_parse(service):
+    context = service.parse_command("remind me to call mom")
+    before = service.parse_count
+    context.intent
+    context.entities
+    context.result
+
+    assert service.parse_count == before
+
+
+def test_pipe_commands_parses_each_text_once(service):
+    texts = ["add task buy milk", "new habit read daily", "hello"]
+    before = service.parse_count
+    results = [context.result for context in service.pipe_commands(texts)]
+
+    assert len(results) == len(texts)
+    assert service.parse_count - before == len(texts)
+
+
+def test_reload_counts_reloads_not_the_first_load(service):
+    assert service.intents_reloads == 0
+    service.reload_intents()
+    assert service.intents_reloads == 1
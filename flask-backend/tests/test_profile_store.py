@@ -0,0 +1,128 @@
+import os
+import threading
+
+import pytest
+
+from services.profile_store import ProfileStore
+
+
+class MemoryBackend:
+    """Stands in for the database; save_many can be held to simulate a slow commit"""
+
+    def __init__(self):
+        self.rows = {}
+        self.fail = False
+        self.fail_load = False
+        self.saving = threading.Event()
+        self.proceed = threading.Event()
+        self.proceed.set()
+
+    def load(self, user_id):
+        if self.fail_load:
+            raise RuntimeError("database unavailable")
+        return self.rows.get(user_id)
+
+    def save_many(self, profiles):
+        self.saving.set()
+        self.proceed.wait(5)
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.rows.update(profiles)
+
+
+@pytest.fixture
+def backend():
+    return MemoryBackend()
+
+
+@pytest.fixture
+def store(backend):
+    store = ProfileStore(backend, default_factory=lambda: {'categories': []}, max_size=1, flush_interval=60)
+    yield store
+    backend.proceed.set()
+    store.close()
+
+
+def test_evicted_profile_is_read_back_before_it_is_written(store, backend):
+    store.put(1, {'categories': ['work']})
+    store.get(2)  # evicts user 1
+
+    assert store.get(1) == {'categories': ['work']}
+    assert backend.rows == {}
+
+
+def test_evicted_profile_stays_readable_while_the_flush_commits(store, backend):
+    backend.rows[1] = {'categories': ['stale']}
+    store.put(1, {'categories': ['work']})
+    store.get(2)
+
+    backend.proceed.clear()
+    flusher = threading.Thread(target=store.flush)
+    flusher.start()
+    assert backend.saving.wait(5)
+    try:
+        assert store.get(1) == {'categories': ['work']}
+    finally:
+        backend.proceed.set()
+        flusher.join(5)
+    assert backend.rows[1] == {'categories': ['work']}
+    assert store.stats()['pending_writes'] == 0
+
+
+def test_failed_flush_keeps_profiles_pending(store, backend):
+    backend.fail = True
+    store.put(1, {'categories': ['work']})
+
+    assert store.flush() == 0
+    assert store.stats()['pending_writes'] == 1
+
+    backend.fail = False
+    assert store.flush() == 1
+    assert backend.rows[1] == {'categories': ['work']}
+
+
+def test_put_during_flush_is_written_next_time(store, backend):
+    store.put(1, {'categories': ['work']})
+
+    backend.proceed.clear()
+    flusher = threading.Thread(target=store.flush)
+    flusher.start()
+    assert backend.saving.wait(5)
+    store.put(1, {'categories': ['health']})
+    backend.proceed.set()
+    flusher.join(5)
+
+    assert store.stats()['pending_writes'] == 1
+    store.flush()
+    assert backend.rows[1] == {'categories': ['health']}
+
+
+def test_update_changes_a_copy(store):
+    before = store.get(1)
+    after = store.update(1, lambda profile: profile['categories'].append('work'))
+
+    assert before == {'categories': []}
+    assert after == {'categories': ['work']}
+    assert store.get(1) is after
+
+
+def test_update_after_a_load_error_writes_nothing(store, backend):
+    backend.rows[1] = {'categories': ['work', 'health']}
+    backend.fail_load = True
+
+    assert store.get(1) == {'categories': []}
+    with pytest.raises(RuntimeError):
+        store.update(1, lambda profile: profile['categories'].append('errands'))
+
+    assert store.stats()['pending_writes'] == 0
+    assert store.flush() == 0
+    assert backend.rows[1] == {'categories': ['work', 'health']}
+
+
+def test_same_store_as_the_ai_service():
+    here = os.path.join(os.path.dirname(__file__), '..', 'services', 'profile_store.py')
+    sibling = os.path.join(os.path.dirname(__file__), '..', '..', 'python-ai-service', 'services', 'profile_store.py')
+    if not os.path.exists(sibling):
+        pytest.skip("python-ai-service is not checked out alongside")
+    with open(here) as ours, open(sibling) as theirs:
+        assert ours.read() == theirs.read(), "copy services/profile_store.py to the other service"
@@ -0,0 +1,41 @@
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+pytest.importorskip("flask_sqlalchemy")
+
+from services.suggestion_engine import HOUR_BUCKETS, TaskPatterns, task_slot
+
+
+@pytest.fixture
+def new_york(monkeypatch):
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_task_slot_uses_local_time(new_york):
+    # Monday 02:00 UTC is Sunday 21:00 in New York
+    task = SimpleNamespace(dueDate=None, createdAt=datetime(2024, 1, 1, 2, 0))
+
+    assert task_slot(task) == (6, HOUR_BUCKETS.index('evening'))
+
+
+def test_history_is_bucketed_like_task_slot(new_york):
+    import pandas as pd
+
+    created = datetime(2024, 1, 1, 2, 0)
+    frame = pd.DataFrame.from_records(
+        [("Call mom", "family", False, created, None)],
+        columns=['title', 'category', 'completed', 'createdAt', 'dueDate']
+    )
+    patterns = TaskPatterns.from_frame(frame)
+    weekday, bucket = task_slot(SimpleNamespace(dueDate=None, createdAt=created))
+
+    assert patterns.rank(weekday, bucket)[0][0] == "family"
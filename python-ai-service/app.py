@@ -1,26 +1,83 @@
 import os
 import json
-from flask import Flask, request, jsonify
+import time
+
+# Cold start is measured from here, so it includes imports
+BOOT_STARTED = time.time()
+
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 
+# Load environment variables before any service reads them
+load_dotenv()
+
+# With MODEL_DIR set, models load only from it: switch the Hugging Face
+# libraries to offline mode before they are imported
+from services.model_artifacts import configure_offline
+configure_offline()
+
 # Import our AI service modules
-from services.nlp_service import NLPService
+from services.nlp_service import COMPLETION_MODEL, SPACY_MODEL, NLPService
 from services.sentiment_service import SentimentAnalyzer
 from services.ml_service import MLPredictor
-
-# Load environment variables
-load_dotenv()
+from services.model_manager import model_manager
+from services.readiness import Readiness
+from services.single_flight import single_flight
 
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
-# Initialize services
+# Initialize services. Their models load on first use through the model
+# manager, so a replica only holds the models its traffic needs.
 nlp_service = NLPService()
 sentiment_analyzer = SentimentAnalyzer()
 ml_predictor = MLPredictor()
 
+def warm_up_steps():
+    """
+    Warm-up of the models named in WARM_UP_MODELS (empty: none)
+    
+    Unset, every model is warmed up, unless MODEL_MEMORY_BUDGET_MB is set:
+    which models fit is only known once they are loaded, so under a budget
+    models keep loading on first use.
+    """
+    steps = {**nlp_service.warm_up_steps(), **sentiment_analyzer.warm_up_steps()}
+    names = os.environ.get('WARM_UP_MODELS')
+    if names is None:
+        return {} if model_manager.memory_budget_bytes else steps
+    return {name: steps[name] for name in (n.strip() for n in names.split(',')) if name in steps}
+
+# Models are loaded and run once before the replica reports ready
+readiness = Readiness(BOOT_STARTED, model_manager)
+readiness.start(warm_up_steps())
+
+def coalesce_key(endpoint, text, *extra):
+    """
+    Single-flight key of a request: the models behind the endpoint and the text
+    
+    Texts are compared exactly: responses carry character offsets or echo
+    the text, so requests differing only in whitespace cannot share one.
+    Returns None when the request cannot be coalesced.
+    """
+    if not isinstance(text, str):
+        return None
+    versions = {
+        "analyze-text": SPACY_MODEL,
+        "extract-entities": SPACY_MODEL,
+        "sentiment-analysis": sentiment_analyzer.model_version,
+        "predict-completion": COMPLETION_MODEL
+    }
+    return (versions[endpoint], text) + tuple(str(value) for value in extra)
+
+def _coalesced(endpoint, fn, text, *extra, **kwargs):
+    """Run fn(text, **kwargs) once for concurrent identical requests"""
+    key = coalesce_key(endpoint, text, *extra)
+    if key is None:
+        return fn(text, **kwargs)
+    return single_flight.do(endpoint, key, lambda value: fn(value, **kwargs), text)
+
 @app.route('/')
 def home():
     return jsonify({
@@ -31,7 +88,11 @@ def home():
             "/api/sentiment-analysis",
             "/api/predict-completion",
             "/api/suggest-tasks",
-            "/api/extract-entities"
+            "/api/extract-entities",
+            "/api/task-titles",
+            "/api/models",
+            "/api/stats",
+            "/api/ready"
         ]
     })
 
@@ -41,7 +102,7 @@ def analyze_text():
     if not data or 'text' not in data:
         return jsonify({"error": "No text provided"}), 400
     
-    analysis = nlp_service.analyze(data['text'])
+    analysis = _coalesced("analyze-text", nlp_service.analyze, data['text'])
     return jsonify(analysis)
 
 @app.route('/api/sentiment-analysis', methods=['POST'])
@@ -50,7 +111,7 @@ def analyze_sentiment():
     if not data or 'text' not in data:
         return jsonify({"error": "No text provided"}), 400
     
-    sentiment = sentiment_analyzer.analyze(data['text'])
+    sentiment = _coalesced("sentiment-analysis", sentiment_analyzer.analyze, data['text'])
     return jsonify(sentiment)
 
 @app.route('/api/predict-completion', methods=['POST'])
@@ -59,8 +120,60 @@ def predict_completion():
     if not data or 'text' not in data:
         return jsonify({"error": "No text provided"}), 400
     
-    completion = nlp_service.predict_completion(data['text'])
-    return jsonify({"completion": completion})
+    user_id = data.get('user_id')
+    if data.get('stream'):
+        return _stream_completion(data, user_id)
+    
+    try:
+        k = int(data.get('k', 5))
+    except (TypeError, ValueError):
+        return jsonify({"error": "k must be an integer"}), 400
+    if not 1 <= k <= MAX_COMPLETIONS:
+        return jsonify({"error": f"k must be between 1 and {MAX_COMPLETIONS}"}), 400
+    
+    return jsonify(_coalesced("predict-completion", nlp_service.complete_command, data['text'], user_id, k,
+                              user_id=user_id, k=k))
+
+# Most completions returned by the completion index
+MAX_COMPLETIONS = 10
+
+# Streaming completion limits
+MAX_NEW_TOKENS = 200
+MAX_DEADLINE_MS = 30000
+
+def _stream_completion(data, user_id=None):
+    """Stream a completion as NDJSON: one {"token"} line per piece, then a {"done"} line"""
+    try:
+        max_new_tokens = int(data.get('max_new_tokens', 20))
+        deadline_ms = int(data.get('deadline_ms', 2000))
+    except (TypeError, ValueError):
+        return jsonify({"error": "max_new_tokens and deadline_ms must be integers"}), 400
+    if not 1 <= max_new_tokens <= MAX_NEW_TOKENS:
+        return jsonify({"error": f"max_new_tokens must be between 1 and {MAX_NEW_TOKENS}"}), 400
+    if not 1 <= deadline_ms <= MAX_DEADLINE_MS:
+        return jsonify({"error": f"deadline_ms must be between 1 and {MAX_DEADLINE_MS}"}), 400
+    
+    events = nlp_service.stream_completion(
+        data['text'],
+        user_id=user_id,
+        max_new_tokens=max_new_tokens,
+        deadline_seconds=deadline_ms / 1000,
+        stop_at_sentence_end=data.get('stop_at_sentence_end', True)
+    )
+    lines = (json.dumps(event) + "\n" for event in events)
+    # Disable proxy buffering so each line reaches the client as it is written
+    return Response(stream_with_context(lines), mimetype='application/x-ndjson',
+                    headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'})
+
+@app.route('/api/task-titles', methods=['POST'])
+def record_task_title():
+    """Add a newly created task title to the user's command completions"""
+    data = request.json
+    if not data or 'user_id' not in data or not data.get('title'):
+        return jsonify({"error": "user_id and title are required"}), 400
+    
+    nlp_service.record_task_title(data['user_id'], data['title'])
+    return jsonify({"status": "recorded"})
 
 @app.route('/api/suggest-tasks', methods=['POST'])
 def suggest_tasks():
@@ -80,9 +193,29 @@ def extract_entities():
     if not data or 'text' not in data:
         return jsonify({"error": "No text provided"}), 400
     
-    entities = nlp_service.extract_entities(data['text'])
+    entities = _coalesced("extract-entities", nlp_service.extract_entities, data['text'])
     return jsonify({"entities": entities})
 
+@app.route('/api/models', methods=['GET'])
+def model_status():
+    """Loaded models, their memory, hit counts and recent load/evict events"""
+    return jsonify(model_manager.status())
+
+@app.route('/api/ready', methods=['GET'])
+def ready():
+    """200 once every model is loaded and warmed up, 503 before that or if warm-up failed"""
+    status = readiness.status()
+    return jsonify(status), 200 if status["ready"] else 503
+
+@app.route('/api/stats', methods=['GET'])
+def service_stats():
+    """Requests coalesced per endpoint, sentiment batching and the completion index"""
+    return jsonify({
+        "coalescing": single_flight.stats(),
+        "batching": sentiment_analyzer.batching_stats(),
+        "completion_index": nlp_service.completion_index.stats()
+    })
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5001))
     app.run(host='0.0.0.0', port=port, debug=os.environ.get('FLASK_DEBUG', 'False') == 'True') 
\ No newline at end of file
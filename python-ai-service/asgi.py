@@ -0,0 +1,296 @@
+"""
+Async serving mode for the Python AI service
+
+Serves the same endpoints and JSON as app.py, but HTTP I/O runs on an event
+loop: a slow client costs a coroutine, not a worker thread. Model work is
+handed to a dedicated thread pool, and each endpoint has its own limit on
+how many of its requests may use the models at once, so one busy endpoint
+cannot take every model thread. Requests over the limit wait on the loop.
+
+Run with:
+    uvicorn asgi:app --host 0.0.0.0 --port 5001
+or:
+    python asgi.py
+"""
+import asyncio
+import copy
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+# The Flask app module owns the service instances and request limits
+from app import (MAX_COMPLETIONS, MAX_DEADLINE_MS, MAX_NEW_TOKENS, coalesce_key, ml_predictor, model_manager,
+                 nlp_service, readiness, sentiment_analyzer, single_flight)
+
+# Concurrent model calls per endpoint. GPT-2 and spaCy parses are CPU bound;
+# sentiment requests are batched, so more of them in flight fill the batches.
+DEFAULT_ENDPOINT_CONCURRENCY = {
+    "analyze-text": 4,
+    "sentiment-analysis": 16,
+    "predict-completion": 2,
+    "suggest-tasks": 4,
+    "extract-entities": 4,
+    "task-titles": 4,
+}
+
+
+def endpoint_concurrency():
+    """Per-endpoint limits, with overrides from ENDPOINT_CONCURRENCY ("predict-completion=4,...")"""
+    limits = dict(DEFAULT_ENDPOINT_CONCURRENCY)
+    for item in os.environ.get('ENDPOINT_CONCURRENCY', '').split(','):
+        if '=' in item:
+            name, value = item.split('=', 1)
+            limits[name.strip()] = max(1, int(value))
+    return limits
+
+
+# Model work never runs on the event loop
+executor = ThreadPoolExecutor(max_workers=int(os.environ.get('MODEL_WORKERS', os.cpu_count() or 4)),
+                              thread_name_prefix='model')
+limits = endpoint_concurrency()
+# Created on first use so they belong to the server's event loop
+_semaphores = {}
+
+
+def _semaphore(endpoint):
+    if endpoint not in _semaphores:
+        _semaphores[endpoint] = asyncio.Semaphore(limits[endpoint])
+    return _semaphores[endpoint]
+
+
+async def run_model(endpoint, fn, *args, **kwargs):
+    """Run fn on the model executor, within the endpoint's concurrency limit"""
+    loop = asyncio.get_running_loop()
+    async with _semaphore(endpoint):
+        return await loop.run_in_executor(executor, lambda: fn(*args, **kwargs))
+
+
+async def _lead(endpoint, key, future, fn, args, kwargs):
+    try:
+        result = await run_model(endpoint, fn, *args, **kwargs)
+    except BaseException as e:
+        single_flight.fail(endpoint, key, future, e)
+        if not isinstance(e, Exception):
+            raise
+    else:
+        single_flight.resolve(endpoint, key, future, result)
+
+
+# Leader computations still running, kept referenced until they finish
+_leaders = set()
+
+
+async def run_coalesced(endpoint, key, fn, *args, **kwargs):
+    """
+    Like run_model, but concurrent requests with the same key share one call
+
+    The shared call runs as its own task, so a leader whose client
+    disconnects does not cancel the result the other requests wait for.
+    """
+    if key is None:
+        return await run_model(endpoint, fn, *args, **kwargs)
+    future, leader = single_flight.claim(endpoint, key)
+    if leader:
+        task = asyncio.ensure_future(_lead(endpoint, key, future, fn, args, kwargs))
+        _leaders.add(task)
+        task.add_done_callback(_leaders.discard)
+    result = await asyncio.shield(asyncio.wrap_future(future))
+    # Waiting requests get their own copy of the result
+    return result if leader else copy.deepcopy(result)
+
+
+async def _json(request):
+    """Request body as a dict, or None when it is missing or not JSON"""
+    try:
+        data = await request.json()
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _error(message, status=400):
+    return JSONResponse({"error": message}, status_code=status)
+
+
+async def home(request):
+    return JSONResponse({
+        "status": "online",
+        "service": "Personal Productivity Assistant - Python AI Service",
+        "endpoints": [
+            "/api/analyze-text",
+            "/api/sentiment-analysis",
+            "/api/predict-completion",
+            "/api/suggest-tasks",
+            "/api/extract-entities",
+            "/api/task-titles",
+            "/api/models",
+            "/api/stats",
+            "/api/ready"
+        ]
+    })
+
+
+async def analyze_text(request):
+    data = await _json(request)
+    if not data or 'text' not in data:
+        return _error("No text provided")
+
+    text = data['text']
+    return JSONResponse(await run_coalesced("analyze-text", coalesce_key("analyze-text", text),
+                                            nlp_service.analyze, text))
+
+
+async def analyze_sentiment(request):
+    data = await _json(request)
+    if not data or 'text' not in data:
+        return _error("No text provided")
+
+    text = data['text']
+    return JSONResponse(await run_coalesced("sentiment-analysis", coalesce_key("sentiment-analysis", text),
+                                            sentiment_analyzer.analyze, text))
+
+
+async def predict_completion(request):
+    data = await _json(request)
+    if not data or 'text' not in data:
+        return _error("No text provided")
+
+    user_id = data.get('user_id')
+    if data.get('stream'):
+        return await _stream_completion(data, user_id)
+
+    try:
+        k = int(data.get('k', 5))
+    except (TypeError, ValueError):
+        return _error("k must be an integer")
+    if not 1 <= k <= MAX_COMPLETIONS:
+        return _error(f"k must be between 1 and {MAX_COMPLETIONS}")
+
+    text = data['text']
+    key = coalesce_key("predict-completion", text, user_id, k)
+    return JSONResponse(await run_coalesced("predict-completion", key, nlp_service.complete_command,
+                                            text, user_id=user_id, k=k))
+
+
+async def _stream_completion(data, user_id=None):
+    """Stream a completion as NDJSON, holding one predict-completion slot until it ends"""
+    try:
+        max_new_tokens = int(data.get('max_new_tokens', 20))
+        deadline_ms = int(data.get('deadline_ms', 2000))
+    except (TypeError, ValueError):
+        return _error("max_new_tokens and deadline_ms must be integers")
+    if not 1 <= max_new_tokens <= MAX_NEW_TOKENS:
+        return _error(f"max_new_tokens must be between 1 and {MAX_NEW_TOKENS}")
+    if not 1 <= deadline_ms <= MAX_DEADLINE_MS:
+        return _error(f"deadline_ms must be between 1 and {MAX_DEADLINE_MS}")
+
+    async def lines():
+        loop = asyncio.get_running_loop()
+        async with _semaphore("predict-completion"):
+            events = nlp_service.stream_completion(
+                data['text'],
+                user_id=user_id,
+                max_new_tokens=max_new_tokens,
+                deadline_seconds=deadline_ms / 1000,
+                stop_at_sentence_end=data.get('stop_at_sentence_end', True)
+            )
+            try:
+                while True:
+                    # Each step blocks until GPT-2 produces the next piece
+                    event = await loop.run_in_executor(executor, next, events, None)
+                    if event is None:
+                        break
+                    yield json.dumps(event) + "\n"
+            finally:
+                # Also reached when the client disconnects: stops generation
+                try:
+                    await loop.run_in_executor(executor, events.close)
+                except ValueError:
+                    # A step is still running; generation ends at its deadline
+                    pass
+
+    return StreamingResponse(lines(), media_type='application/x-ndjson',
+                             headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'})
+
+
+async def record_task_title(request):
+    data = await _json(request)
+    if not data or 'user_id' not in data or not data.get('title'):
+        return _error("user_id and title are required")
+
+    await run_model("task-titles", nlp_service.record_task_title, data['user_id'], data['title'])
+    return JSONResponse({"status": "recorded"})
+
+
+async def suggest_tasks(request):
+    data = await _json(request)
+    if not data or 'user_id' not in data:
+        return _error("No user ID provided")
+
+    # Optional context can be provided
+    context = data.get('context', {})
+
+    suggestions = await run_model("suggest-tasks", ml_predictor.suggest_tasks, data['user_id'], context)
+    return JSONResponse({"suggestions": suggestions})
+
+
+async def extract_entities(request):
+    data = await _json(request)
+    if not data or 'text' not in data:
+        return _error("No text provided")
+
+    text = data['text']
+    entities = await run_coalesced("extract-entities", coalesce_key("extract-entities", text),
+                                   nlp_service.extract_entities, text)
+    return JSONResponse({"entities": entities})
+
+
+async def model_status(request):
+    """Loaded models, their memory, hit counts and recent load/evict events"""
+    return JSONResponse(model_manager.status())
+
+
+async def ready(request):
+    """200 once every model is loaded and warmed up, 503 before that or if warm-up failed"""
+    status = readiness.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+async def service_stats(request):
+    """Requests coalesced per endpoint, sentiment batching and the completion index"""
+    return JSONResponse({
+        "coalescing": single_flight.stats(),
+        "batching": sentiment_analyzer.batching_stats(),
+        "completion_index": nlp_service.completion_index.stats()
+    })
+
+
+app = Starlette(
+    routes=[
+        Route('/', home),
+        Route('/api/analyze-text', analyze_text, methods=['POST']),
+        Route('/api/sentiment-analysis', analyze_sentiment, methods=['POST']),
+        Route('/api/predict-completion', predict_completion, methods=['POST']),
+        Route('/api/task-titles', record_task_title, methods=['POST']),
+        Route('/api/suggest-tasks', suggest_tasks, methods=['POST']),
+        Route('/api/extract-entities', extract_entities, methods=['POST']),
+        Route('/api/models', model_status, methods=['GET']),
+        Route('/api/stats', service_stats, methods=['GET']),
+        Route('/api/ready', ready, methods=['GET']),
+    ],
+    # Same as CORS(app) in app.py: every origin allowed
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    on_shutdown=[lambda: executor.shutdown(wait=False)]
+)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    port = int(os.environ.get('PORT', 5001))
+    uvicorn.run(app, host='0.0.0.0', port=port)
@@ -0,0 +1,70 @@
+"""
+Benchmark command completion from the completion index against GPT-2
+
+Indexes the command catalogue and a synthetic history of task titles for
+one user, then times top-5 completions of short prefixes through the index
+and, for comparison, one GPT-2 completion per prefix.
+
+Usage (from python-ai-service/):
+    python -m benchmarks.completion_index [titles]
+"""
+import statistics
+import sys
+import time
+
+from services.completion_index import CompletionIndex
+
+PREFIXES = ["add ta", "add task wr", "show m", "remind me to c", "start f", "wri", "check my", "what sh"]
+VERBS = ["write", "call", "review", "email", "prepare", "plan", "book", "pay"]
+OBJECTS = ["report", "mom", "budget", "client", "slides", "trip", "dentist", "invoice", "team", "notes"]
+REPEATS = 1000
+
+
+def build_index(titles):
+    index = CompletionIndex()
+    for i in range(titles):
+        index.add_title(1, f"{VERBS[i % len(VERBS)]} {OBJECTS[(i // len(VERBS)) % len(OBJECTS)]} {i % 50}")
+    return index
+
+
+def time_index(index):
+    latencies = []
+    for _ in range(REPEATS):
+        for prefix in PREFIXES:
+            start = time.perf_counter()
+            index.complete(prefix, user_id=1, k=5)
+            latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return statistics.median(latencies) * 1000, latencies[int(len(latencies) * 0.99) - 1] * 1000
+
+
+def time_gpt2():
+    from transformers import pipeline
+
+    generator = pipeline("text-generation", model="gpt2")
+    generator(PREFIXES[0], max_length=50, num_return_sequences=1)
+    latencies = []
+    for prefix in PREFIXES:
+        start = time.perf_counter()
+        generator(prefix, max_length=50, num_return_sequences=1)
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000
+
+
+def main():
+    titles = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    index = build_index(titles)
+    print(f"{index.stats()['commands']} commands, {titles} task titles")
+    for prefix in PREFIXES:
+        print(f"{prefix!r:>18} -> {[c['text'] for c in index.complete(prefix, user_id=1, k=3)]}")
+
+    p50, p99 = time_index(index)
+    print(f"index: p50 {p50:.4f} ms, p99 {p99:.4f} ms")
+    try:
+        print(f"gpt2:  p50 {time_gpt2():.1f} ms")
+    except Exception as e:
+        print(f"gpt2 not available: {e}")
+
+
+if __name__ == '__main__':
+    main()
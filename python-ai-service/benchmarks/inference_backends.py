@@ -0,0 +1,86 @@
+"""
+Compare the PyTorch, ONNX Runtime and int8 ONNX sentiment backends
+
+Runs every backend over the fixed evaluation set in benchmarks/data and
+reports, per backend:
+- sentiment accuracy against the labels
+- how often the top emotion matches the PyTorch backend, and the largest
+  emotion score difference
+- mean and p95 latency of one sentiment + emotion call
+
+ONNX exports are written to ONNX_MODEL_DIR on the first run.
+
+Usage (from python-ai-service/):
+    python -m benchmarks.inference_backends [backend ...]
+"""
+import json
+import os
+import sys
+import time
+
+from services.inference_backends import BACKENDS, create_pipelines
+
+EVAL_SET = os.path.join(os.path.dirname(__file__), 'data', 'sentiment_eval.json')
+
+
+def run_backend(backend, items):
+    sentiment_pipe, emotion_pipe = create_pipelines(backend)
+
+    # Warm up so one-time session setup is not timed
+    sentiment_pipe(items[0]['text'])
+    emotion_pipe(items[0]['text'])
+
+    latencies = []
+    outputs = []
+    for item in items:
+        start = time.perf_counter()
+        sentiment = sentiment_pipe(item['text'])[0]
+        emotions = sorted(emotion_pipe(item['text'])[0], key=lambda x: x['score'], reverse=True)
+        latencies.append(time.perf_counter() - start)
+        outputs.append({'sentiment': sentiment, 'emotions': emotions})
+
+    latencies.sort()
+    return outputs, {
+        'mean_ms': sum(latencies) * 1000 / len(latencies),
+        'p95_ms': latencies[max(0, int(len(latencies) * 0.95) - 1)] * 1000
+    }
+
+
+def compare(outputs, reference, items):
+    correct = sum(out['sentiment']['label'] == item['sentiment'] for out, item in zip(outputs, items))
+    top_match = sum(out['emotions'][0]['label'] == ref['emotions'][0]['label']
+                    for out, ref in zip(outputs, reference))
+    max_diff = 0.0
+    for out, ref in zip(outputs, reference):
+        ref_scores = {emotion['label']: emotion['score'] for emotion in ref['emotions']}
+        for emotion in out['emotions']:
+            max_diff = max(max_diff, abs(emotion['score'] - ref_scores[emotion['label']]))
+    return {
+        'accuracy': correct / len(items),
+        'emotion_agreement': top_match / len(items),
+        'max_emotion_diff': max_diff
+    }
+
+
+def main():
+    # PyTorch always runs first: it is the reference for the other backends
+    requested = sys.argv[1:] or list(BACKENDS)
+    backends = ['torch'] + [backend for backend in requested if backend != 'torch']
+    with open(EVAL_SET) as f:
+        items = json.load(f)
+
+    reference = None
+
+    print(f"{len(items)} evaluation texts")
+    print(f"{'backend':>10} {'accuracy':>9} {'emo agree':>10} {'max diff':>9} {'mean ms':>8} {'p95 ms':>8}")
+    for backend in backends:
+        outputs, timing = run_backend(backend, items)
+        if backend == 'torch':
+            reference = outputs
+        quality = compare(outputs, reference, items)
+        print(f"{backend:>10} {quality['accuracy']:>9.3f} {quality['emotion_agreement']:>10.3f} "
+              f"{quality['max_emotion_diff']:>9.4f} {timing['mean_ms']:>8.2f} {timing['p95_ms']:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
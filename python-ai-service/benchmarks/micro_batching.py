@@ -0,0 +1,94 @@
+"""
+Benchmark micro-batching of the sentiment and emotion pipelines
+
+Runs the same requests from a growing number of concurrent callers, once
+with one text per forward pass and once through a MicroBatcher, and reports
+throughput and per-request latency for each.
+
+Usage (from python-ai-service/):
+    python -m benchmarks.micro_batching [max_batch_size] [max_wait_ms]
+"""
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from services.micro_batcher import MicroBatcher
+from services.sentiment_service import SentimentAnalyzer
+
+TEXTS = [
+    "I finished the quarterly report and feel great about it",
+    "The deadline is tomorrow and I am completely overwhelmed",
+    "Schedule a meeting with the design team next week",
+    "I can't focus today, everything is distracting me",
+    "Excited to start the new project with the client",
+    "Too many emails, I am exhausted and behind on everything",
+]
+CONCURRENCY = (1, 4, 8, 16, 32)
+REQUESTS_PER_LEVEL = 96
+
+
+def run_level(call, concurrency):
+    """Send REQUESTS_PER_LEVEL calls from `concurrency` threads"""
+    latencies = []
+
+    def one(index):
+        start = time.perf_counter()
+        call(TEXTS[index % len(TEXTS)])
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(REQUESTS_PER_LEVEL)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "throughput": REQUESTS_PER_LEVEL / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def main():
+    max_batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    max_wait_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    analyzer = SentimentAnalyzer()
+    if analyzer.sentiment_analyzer is None or analyzer.emotion_detector is None:
+        print("Sentiment models are not available")
+        return
+
+    def unbatched(text):
+        analyzer.sentiment_analyzer(text)
+        analyzer.emotion_detector(text)
+
+    sentiment = MicroBatcher(lambda texts: analyzer.sentiment_analyzer(texts, batch_size=len(texts)),
+                             max_batch_size, max_wait_ms, "sentiment")
+    emotion = MicroBatcher(lambda texts: analyzer.emotion_detector(texts, batch_size=len(texts)),
+                           max_batch_size, max_wait_ms, "emotion")
+
+    def batched(text):
+        sentiment.submit(text)
+        emotion.submit(text)
+
+    # Load weights and warm caches before timing
+    unbatched(TEXTS[0])
+    batched(TEXTS[0])
+
+    print(f"max_batch_size={max_batch_size} max_wait_ms={max_wait_ms}, {REQUESTS_PER_LEVEL} requests per level")
+    print(f"{'callers':>7} {'mode':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for concurrency in CONCURRENCY:
+        for mode, call in (('single', unbatched), ('batched', batched)):
+            result = run_level(call, concurrency)
+            print(f"{concurrency:>7} {mode:>9} {result['throughput']:>8.1f} "
+                  f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f}")
+
+    for batcher in (sentiment, emotion):
+        stats = batcher.stats()
+        print(f"{stats['name']}: {stats['batches']} batches, mean size {stats['mean_batch_size']}, "
+              f"largest {stats['largest_batch']}")
+
+
+if __name__ == '__main__':
+    main()
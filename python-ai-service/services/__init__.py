@@ -1,6 +1,19 @@
 # Services package initialization
-from .nlp_service import NLPService
-from .sentiment_service import SentimentAnalyzer
-from .ml_service import MLPredictor
+import importlib
 
-__all__ = ['NLPService', 'SentimentAnalyzer', 'MLPredictor'] 
\ No newline at end of file
+# Exports are imported on first access, so light modules (e.g. the model
+# artifact settings, which must be applied before transformers is imported)
+# can be used without loading the NLP stack
+_EXPORTS = {
+    'NLPService': '.nlp_service',
+    'SentimentAnalyzer': '.sentiment_service',
+    'MLPredictor': '.ml_service',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
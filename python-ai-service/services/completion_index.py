@@ -0,0 +1,409 @@
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+# The command catalogue understood by the Node NLP manager, one list of
+# patterns per intent. server/services/nlp.js trains on the same file.
+# %slot% marks free text such as a task title.
+DEFAULT_COMMANDS_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'server', 'data', 'commands.json')
+
+# Slots whose text is a task or habit title, completed from the user's titles
+TITLE_SLOTS = ('task', 'habit')
+
+SLOT_PATTERN = re.compile(r'%(\w+)%')
+
+# Past task titles rank above catalogue commands seen the same number of times
+TITLE_WEIGHT = 2
+
+
+def normalize(text):
+    """Lower-case and collapse whitespace, keeping one trailing space if there was one"""
+    normalized = " ".join(text.lower().split())
+    if normalized and text[-1:].isspace():
+        normalized += " "
+    return normalized
+
+
+class _Node:
+    __slots__ = ('children', 'top')
+
+    def __init__(self):
+        self.children = {}
+        # (score, phrase) of the best phrases below this node, best first
+        self.top = []
+
+
+class CompletionTrie:
+    """
+    Character trie of phrases; every node caches its highest-scoring phrases
+
+    Alongside the phrases it counts word bigrams, so a word can be
+    predicted from the one before it when no whole phrase matches.
+    """
+
+    def __init__(self, cache_size=10):
+        self.cache_size = cache_size
+        self.root = _Node()
+        self.scores = {}
+        self._display = {}
+        # word -> {next word: weighted count}
+        self.bigrams = {}
+
+    def __len__(self):
+        return len(self.scores)
+
+    def add(self, phrase, weight=1):
+        """
+        Count one more occurrence of a phrase
+
+        Scores only grow, so a phrase dropped from a node's cache can only
+        come back through its own add(), which walks that node again.
+        """
+        key = normalize(phrase).strip()
+        if not key:
+            return
+        self._display.setdefault(key, " ".join(phrase.split()))
+        score = self.scores.get(key, 0) + weight
+        self.scores[key] = score
+
+        words = key.split()
+        for word, following in zip(words, words[1:]):
+            counts = self.bigrams.setdefault(word, {})
+            counts[following] = counts.get(following, 0) + weight
+
+        node = self.root
+        self._promote(node, key, score)
+        for char in key:
+            node = node.children.setdefault(char, _Node())
+            self._promote(node, key, score)
+
+    def complete(self, prefix, k=5):
+        """
+        Best phrases starting with prefix, excluding the prefix itself
+
+        Returns:
+            list: (score, phrase) tuples, best first
+        """
+        key = normalize(prefix)
+        node = self.root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        stripped = key.strip()
+        return [(score, self._display[phrase]) for score, phrase in node.top
+                if phrase != stripped][:k]
+
+    def next_words(self, word, partial="", k=5):
+        """
+        Words seen after word that start with partial, most frequent first
+
+        Returns:
+            list: (count, word) tuples, best first
+        """
+        counts = self.bigrams.get(word)
+        if not counts:
+            return []
+        # items() is copied in one step, so a concurrent add() cannot break the loop
+        ranked = sorted(((count, following) for following, count in list(counts.items())
+                         if following.startswith(partial)), key=lambda entry: -entry[0])
+        return ranked[:k]
+
+    def _promote(self, node, key, score):
+        top = [entry for entry in node.top if entry[1] != key]
+        if len(top) == len(node.top) and len(top) >= self.cache_size and score <= top[-1][0]:
+            return
+        top.append((score, key))
+        top.sort(key=lambda entry: -entry[0])
+        # Replaced rather than edited, so concurrent readers see a whole list
+        node.top = top[:self.cache_size]
+
+
+class CompletionIndex:
+    """Completes commands from the command catalogue, intent patterns and each user's task titles"""
+
+    def __init__(self, title_source=None, intent_patterns=(), max_users=1000, cache_size=10, commands=None):
+        """
+        Initialize the index
+
+        Catalogue commands and intent patterns are shared by every user. A
+        user's task titles are read from title_source the first time that
+        user asks for a completion, then kept up to date with add_title().
+
+        Args:
+            title_source: Object with load(user_id) returning {title: count};
+                None starts every user with no titles
+            intent_patterns (iterable): Extra command phrases
+            max_users (int): Users whose titles are kept in memory
+            cache_size (int): Completions cached per trie node (most k served)
+            commands (iterable): Command patterns; defaults to the catalogue
+                in DEFAULT_COMMANDS_PATH
+        """
+        self.title_source = title_source
+        self.max_users = max_users
+        self.cache_size = cache_size
+
+        self.commands = CompletionTrie(cache_size)
+        # Command text before a title slot, e.g. "add task " or "remind me to "
+        self.title_heads = set()
+        if commands is None:
+            commands = load_command_patterns(DEFAULT_COMMANDS_PATH)
+        for pattern in list(commands) + list(intent_patterns):
+            self.add_command(pattern)
+
+        self._users = OrderedDict()
+        # Titles added for users not loaded yet, merged when they load
+        self._pending = OrderedDict()
+        self._lock = threading.Lock()
+        self.load_errors = 0
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build an index from DATABASE_URL / COMMANDS_PATH / INTENTS_PATH / COMPLETION_MAX_USERS
+
+        Without DATABASE_URL users start with no titles; without INTENTS_PATH
+        only the command catalogue is indexed.
+        """
+        database_url = os.environ.get('DATABASE_URL')
+        source = None
+        if database_url:
+            try:
+                source = SQLTaskTitleSource(database_url)
+            except Exception as e:
+                print(f"Warning: Task titles unavailable for completion, using commands only: {e}")
+        return cls(
+            title_source=source,
+            intent_patterns=load_intent_patterns(os.environ.get('INTENTS_PATH')),
+            max_users=int(os.environ.get('COMPLETION_MAX_USERS', 1000)),
+            commands=load_command_patterns(os.environ.get('COMMANDS_PATH') or DEFAULT_COMMANDS_PATH)
+        )
+
+    def add_command(self, pattern):
+        """Index a command; text after a %slot% is left for the user to type"""
+        match = SLOT_PATTERN.search(pattern)
+        if match is None:
+            self.commands.add(pattern)
+            return
+        head = pattern[:match.start()]
+        if head.strip():
+            self.commands.add(head)
+        if match.group(1) in TITLE_SLOTS:
+            self.title_heads.add(normalize(head))
+
+    def add_title(self, user_id, title):
+        """
+        Record a newly created task title for a user
+
+        With a title source, a title for a user not loaded yet is kept
+        pending and merged when their history loads, in case that load
+        cannot see the new task yet (a replica, or another connection
+        before the commit).
+        """
+        user_id = str(user_id)
+        with self._lock:
+            titles = self._users.get(user_id)
+            if titles is not None:
+                titles.add(title, TITLE_WEIGHT)
+                return
+            if self.title_source is not None:
+                self._pending.setdefault(user_id, []).append(title)
+                self._pending.move_to_end(user_id)
+                while len(self._pending) > self.max_users:
+                    self._pending.popitem(last=False)
+                return
+        titles = self._titles(user_id)
+        with self._lock:
+            titles.add(title, TITLE_WEIGHT)
+
+    def complete(self, text, user_id=None, k=5):
+        """
+        Top-k completions of a typed prefix
+
+        Catalogue commands and the user's titles are matched against the whole
+        prefix. When the prefix starts with a command that takes a title
+        ("add task wri", or just "add task"), the rest is also matched
+        against the user's titles and the command is kept in front ("add
+        task write report"). Phrases rank by how often they were used.
+
+        When that leaves slots free, the last word is completed from word
+        bigram counts of the titles and commands: "email the boss about
+        rep" becomes "email the boss about report" if "about report" was
+        frequent, though no phrase starts with the whole prefix.
+
+        Returns:
+            list: {"text", "score", "source", "suffix"} dicts, best first;
+                source is 'command', 'task' or 'ngram', and suffix is what
+                follows the typed text, to be appended to it as typed
+        """
+        if not normalize(text).strip():
+            return []
+        # Every phrase starts with the normalized prefix, whatever was typed
+        typed = len(normalize(text))
+        k = min(k, self.cache_size)
+        titles = self._titles(str(user_id)) if user_id is not None else None
+
+        candidates = [(score, phrase, 'command') for score, phrase in self.commands.complete(text, k)]
+        if titles is not None:
+            candidates += [(score, phrase, 'task') for score, phrase in titles.complete(text, k)]
+            head, rest = self._split_title_head(text)
+            if head is not None:
+                candidates += [(score, head + phrase, 'task') for score, phrase in titles.complete(rest, k)]
+
+        completions = []
+        # The prefix itself is not a completion
+        seen = {normalize(text).strip()}
+        for score, phrase, source in sorted(candidates, key=lambda c: -c[0]):
+            key = normalize(phrase).strip()
+            if key in seen:
+                continue
+            seen.add(key)
+            completions.append({"text": phrase, "score": score, "source": source, "suffix": phrase[typed:]})
+            if len(completions) == k:
+                return completions
+
+        # Whole-phrase matches always rank above next-word guesses, and a
+        # guess that only starts one of them adds nothing
+        for score, phrase in self._complete_word(text, titles, k):
+            key = normalize(phrase).strip()
+            if key in seen or any(other.startswith(key + " ") for other in seen):
+                continue
+            seen.add(key)
+            completions.append({"text": phrase, "score": score, "source": 'ngram', "suffix": phrase[typed:]})
+            if len(completions) == k:
+                break
+        return completions
+
+    def stats(self):
+        """Indexed commands and users held in memory"""
+        with self._lock:
+            return {
+                "commands": len(self.commands),
+                "users": len(self._users),
+                "titles": sum(len(trie) for trie in self._users.values()),
+                "pending_titles": sum(len(titles) for titles in self._pending.values()),
+                "max_users": self.max_users,
+                "load_errors": self.load_errors
+            }
+
+    def _split_title_head(self, text):
+        """
+        Split "add task wri" into ("add task ", "wri"), or (None, None) without a title command
+
+        A prefix that is exactly a command ("add task") splits into the
+        command and an empty title, so every title can follow it.
+        """
+        key = normalize(text)
+        best = None
+        for head in self.title_heads:
+            if (key.startswith(head) or key == head.rstrip()) and (best is None or len(head) > len(best)):
+                best = head
+        if best is None:
+            return None, None
+        return best, key[len(best):]
+
+    def _complete_word(self, text, titles, k):
+        """Complete the word being typed from the bigram counts of titles and commands"""
+        key = normalize(text)
+        words = key.split()
+        if key.endswith(" "):
+            previous, partial, stem = words[-1], "", key
+        elif len(words) >= 2:
+            previous, partial = words[-2], words[-1]
+            stem = key[:len(key) - len(partial)]
+        else:
+            return []
+
+        counts = {}
+        for trie in (self.commands, titles):
+            if trie is None:
+                continue
+            for count, word in trie.next_words(previous, partial, k):
+                counts[word] = counts.get(word, 0) + count
+        ranked = sorted(counts.items(), key=lambda entry: -entry[1])[:k]
+        return [(count, stem + word) for word, count in ranked]
+
+    def _titles(self, user_id):
+        """The user's title trie, loaded from the title source on first use"""
+        with self._lock:
+            trie = self._users.get(user_id)
+            if trie is not None:
+                self._users.move_to_end(user_id)
+                return trie
+
+        trie = CompletionTrie(self.cache_size)
+        if self.title_source is not None:
+            try:
+                for title, count in self.title_source.load(user_id).items():
+                    trie.add(title, TITLE_WEIGHT * count)
+            except Exception as e:
+                print(f"Error loading task titles for user {user_id}: {e}")
+                with self._lock:
+                    self.load_errors += 1
+
+        with self._lock:
+            if user_id not in self._users:
+                # A title the load already saw is not counted twice
+                loaded = set(trie.scores)
+                for title in self._pending.pop(user_id, ()):
+                    if normalize(title).strip() not in loaded:
+                        trie.add(title, TITLE_WEIGHT)
+            # Another request may have loaded the same user meanwhile
+            trie = self._users.setdefault(user_id, trie)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        return trie
+
+
+def load_command_patterns(path):
+    """Patterns from a command catalogue ({"intent": ["pattern", ...]}), or none if it is missing"""
+    if not path or not os.path.exists(path):
+        print(f"Warning: Command catalogue not found at {path}, completing from titles and intents only")
+        return []
+    with open(path) as f:
+        catalogue = json.load(f)
+    return [pattern for patterns in catalogue.values() for pattern in patterns]
+
+
+def load_intent_patterns(path):
+    """Patterns from an intents JSON file ({"intents": [{"patterns": [...]}]}), or none"""
+    if not path or not os.path.exists(path):
+        return []
+    with open(path) as f:
+        intents = json.load(f)
+    return [pattern for intent in intents.get('intents', []) for pattern in intent.get('patterns', [])]
+
+
+class SQLTaskTitleSource:
+    """Reads users' past task titles from the tasks table shared with the backend"""
+
+    def __init__(self, database_url):
+        from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String
+
+        self.engine = create_engine(database_url, pool_pre_ping=True)
+        # Only the columns read here; the table belongs to the backend schema
+        self.table = Table(
+            'tasks', MetaData(),
+            Column('id', Integer, primary_key=True),
+            Column('title', String(255)),
+            Column('userId', Integer)
+        )
+
+    def load(self, user_id):
+        """How many times the user used each task title"""
+        from sqlalchemy import func, select
+
+        try:
+            key = int(user_id)
+        except (TypeError, ValueError):
+            return {}
+        with self.engine.connect() as connection:
+            rows = connection.execute(
+                select(self.table.c.title, func.count())
+                .where(self.table.c.userId == key)
+                .group_by(self.table.c.title)
+            ).all()
+        return {title: count for title, count in rows if title}
@@ -0,0 +1,100 @@
+import os
+import platform
+
+from transformers import AutoTokenizer, pipeline
+
+# Explicit ids so every backend serves, and exports, the same weights
+from .model_artifacts import EMOTION_MODEL, SENTIMENT_MODEL, hf_path
+
+BACKENDS = ('torch', 'onnx', 'onnx-int8')
+
+DEFAULT_ONNX_DIR = os.path.join(os.path.dirname(__file__), '..', 'models', 'onnx')
+
+
+def _onnx_dir():
+    return os.environ.get('ONNX_MODEL_DIR', DEFAULT_ONNX_DIR)
+
+
+def _export_dir(model_id, quantized):
+    name = model_id.replace('/', '--')
+    return os.path.join(_onnx_dir(), name, 'int8' if quantized else 'fp32')
+
+
+def load_onnx_model(model_id, quantized=False):
+    """
+    Load a sequence classifier through ONNX Runtime, exporting it on first use
+
+    The fp32 export is written once; with quantized=True its weights are
+    then converted to int8 with dynamic quantization (activations are
+    quantized at run time, so no calibration data is needed).
+
+    Returns:
+        tuple: (ORTModelForSequenceClassification, tokenizer)
+    """
+    # Optional dependency: only needed when an ONNX backend is selected
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    fp32_dir = _export_dir(model_id, quantized=False)
+    if not os.path.exists(os.path.join(fp32_dir, 'model.onnx')):
+        model = ORTModelForSequenceClassification.from_pretrained(hf_path(model_id), export=True)
+        model.save_pretrained(fp32_dir)
+        AutoTokenizer.from_pretrained(hf_path(model_id)).save_pretrained(fp32_dir)
+        print(f"Exported {model_id} to {fp32_dir}")
+
+    tokenizer = AutoTokenizer.from_pretrained(fp32_dir)
+    if not quantized:
+        return ORTModelForSequenceClassification.from_pretrained(fp32_dir), tokenizer
+
+    int8_dir = _export_dir(model_id, quantized=True)
+    if not os.path.exists(os.path.join(int8_dir, 'model_quantized.onnx')):
+        if platform.machine().lower() in ('arm64', 'aarch64'):
+            config = AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+        else:
+            config = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        quantizer = ORTQuantizer.from_pretrained(fp32_dir)
+        quantizer.quantize(save_dir=int8_dir, quantization_config=config)
+        tokenizer.save_pretrained(int8_dir)
+        print(f"Quantized {model_id} to {int8_dir}")
+
+    model = ORTModelForSequenceClassification.from_pretrained(int8_dir, file_name='model_quantized.onnx')
+    return model, tokenizer
+
+
+def _check_backend(backend):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {backend}")
+
+
+def create_sentiment_pipeline(backend='torch'):
+    """Positive/negative sentiment pipeline on an inference backend"""
+    _check_backend(backend)
+    if backend == 'torch':
+        return pipeline("sentiment-analysis", model=hf_path(SENTIMENT_MODEL))
+    model, tokenizer = load_onnx_model(SENTIMENT_MODEL, quantized=backend == 'onnx-int8')
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+
+
+def create_emotion_pipeline(backend='torch'):
+    """Emotion pipeline returning every label's score, on an inference backend"""
+    _check_backend(backend)
+    if backend == 'torch':
+        return pipeline("text-classification", model=hf_path(EMOTION_MODEL), return_all_scores=True)
+    model, tokenizer = load_onnx_model(EMOTION_MODEL, quantized=backend == 'onnx-int8')
+    return pipeline("text-classification", model=model, tokenizer=tokenizer, return_all_scores=True)
+
+
+def create_pipelines(backend='torch'):
+    """
+    Build the sentiment and emotion pipelines on an inference backend
+
+    Every backend is wrapped in the same transformers pipeline, so
+    post-processing and the output schema do not depend on the backend.
+
+    Args:
+        backend (str): 'torch', 'onnx' (fp32 ONNX Runtime) or 'onnx-int8'
+
+    Returns:
+        tuple: (sentiment pipeline, emotion pipeline)
+    """
+    return create_sentiment_pipeline(backend), create_emotion_pipeline(backend)
@@ -0,0 +1,165 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+
+class MicroBatcher:
+    """Groups concurrent single-item calls into batched calls on one worker thread"""
+
+    def __init__(self, batch_fn, max_batch_size=16, max_wait_ms=5, timeout_ms=30000, name="batcher"):
+        """
+        Initialize the batcher
+
+        The worker takes the first waiting item, then keeps collecting until
+        max_batch_size items are queued or max_wait_ms has passed since that
+        first item, runs batch_fn once and hands each caller its own result.
+
+        Args:
+            batch_fn (callable): Takes a list of items, returns one result per item
+            max_batch_size (int): Most items per batch; 1 calls batch_fn inline
+            max_wait_ms (float): Longest a first item waits for company
+            timeout_ms (float): Inference budget; a caller gives up after
+                max_wait_ms + timeout_ms
+            name (str): Name used for the worker thread and in stats
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000
+        self.timeout = max(0.0, float(timeout_ms)) / 1000
+        self.name = name
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.max_seen = 0
+        self._total_latency = 0.0
+
+    @classmethod
+    def from_env(cls, batch_fn, name="batcher"):
+        """Build a batcher from HF_BATCH_MAX_SIZE / HF_BATCH_MAX_WAIT_MS / HF_BATCH_TIMEOUT_MS"""
+        return cls(
+            batch_fn,
+            max_batch_size=int(os.environ.get('HF_BATCH_MAX_SIZE', 16)),
+            max_wait_ms=float(os.environ.get('HF_BATCH_MAX_WAIT_MS', 5)),
+            timeout_ms=float(os.environ.get('HF_BATCH_TIMEOUT_MS', 30000)),
+            name=name
+        )
+
+    def submit(self, item):
+        """
+        Run batch_fn for one item, batched with any concurrent callers
+
+        Returns:
+            The result batch_fn produced for this item
+
+        Raises:
+            Whatever batch_fn raised for the batch this item was in
+            concurrent.futures.TimeoutError: When no result arrived within
+                max_wait_ms + timeout_ms
+        """
+        start = time.perf_counter()
+        if self.max_batch_size == 1:
+            result = self.batch_fn([item])[0]
+            self._record(1, time.perf_counter() - start)
+            return result
+
+        self._ensure_thread()
+        future = Future()
+        self._queue.put((item, future, start))
+        try:
+            return future.result(timeout=self.max_wait + self.timeout)
+        except FutureTimeoutError:
+            # Not run yet, so the worker skips it
+            future.cancel()
+            raise
+
+    def stats(self):
+        """Batches run, mean batch size and mean caller latency"""
+        with self._stats_lock:
+            return {
+                "name": self.name,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0,
+                "largest_batch": self.max_seen,
+                "mean_latency_ms": round(self._total_latency * 1000 / self.items, 3) if self.items else 0
+            }
+
+    def _record(self, size, total_latency):
+        with self._stats_lock:
+            self.batches += 1
+            self.items += size
+            self.max_seen = max(self.max_seen, size)
+            self._total_latency += total_latency
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        """Block for one item, then gather more until the batch is full or the wait is over"""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        batch = []
+        try:
+            while True:
+                # Callers that timed out have cancelled their items
+                batch = [entry for entry in self._collect() if entry[1].set_running_or_notify_cancel()]
+                if not batch:
+                    continue
+                items = [item for item, _, _ in batch]
+                try:
+                    results = self.batch_fn(items)
+                    if len(results) != len(items):
+                        raise RuntimeError(f"{self.name} returned {len(results)} results for {len(items)} items")
+                except Exception as e:
+                    for _, future, _ in batch:
+                        future.set_exception(e)
+                    continue
+
+                done = time.perf_counter()
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+                self._record(len(batch), sum(done - start for _, _, start in batch))
+        except BaseException as e:
+            # Callers would otherwise wait out their timeout; the next
+            # submit() starts a new worker
+            with self._thread_lock:
+                self._thread = None
+            self._fail_pending(batch, RuntimeError(f"{self.name} worker stopped: {e!r}"))
+            raise
+
+    def _fail_pending(self, batch, error):
+        """Fail the batch being run and every queued item"""
+        pending = list(batch)
+        while True:
+            try:
+                pending.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        for _, future, _ in pending:
+            if future.done():
+                continue
+            if future.running() or future.set_running_or_notify_cancel():
+                future.set_exception(error)
@@ -5,9 +5,18 @@ from sklearn.metrics.pairwise import cosine_similarity
 import datetime
 import os
 
+from .profile_backend import backend_from_env
+from .profile_store import ProfileStore
+
 class MLPredictor:
-    def __init__(self):
-        """Initialize the ML service for task prediction and suggestion"""
+    def __init__(self, profile_store=None):
+        """
+        Initialize the ML service for task prediction and suggestion
+        
+        Args:
+            profile_store (ProfileStore): Where user profiles are kept; defaults
+                to a store configured from DATABASE_URL
+        """
         # This would normally load pre-trained models
         # For now, we'll implement a simpler recommendation approach
         self.task_categories = [
@@ -51,8 +60,12 @@ class MLPredictor:
             ]
         }
         
-        # Initialize user profiles (would be loaded from database)
-        self.user_profiles = {}
+        # User profiles are read once from the ai_user_profiles table and
+        # then served from the store's LRU
+        self.profile_store = profile_store or ProfileStore.from_env(
+            backend_from_env(self._decode_profile),
+            self._default_profile
+        )
     
     def suggest_tasks(self, user_id, context=None):
         """Suggest tasks based on user history, current context, and time patterns"""
@@ -100,12 +113,16 @@ class MLPredictor:
     
     def _get_user_profile(self, user_id):
         """Get or create a user profile with preferences and patterns"""
-        if user_id in self.user_profiles:
-            return self.user_profiles[user_id]
-        
-        # Create a new user profile with defaults
-        profile = {
-            "user_id": user_id,
+        profile = self.profile_store.get(user_id)
+        if "user_id" not in profile:
+            # The cached profile is shared, so it is not changed in place
+            profile = {**profile, "user_id": user_id}
+        return profile
+    
+    @staticmethod
+    def _default_profile():
+        """Create a new user profile with defaults"""
+        return {
             "preferred_categories": ["Email", "Meeting", "Personal"],
             "day_patterns": {
                 0: ["Meeting", "Planning"],  # Monday
@@ -124,8 +141,12 @@ class MLPredictor:
             },
             "task_history": []
         }
-        
-        self.user_profiles[user_id] = profile
+    
+    @staticmethod
+    def _decode_profile(profile):
+        """Restore the integer weekday keys JSON turned into strings"""
+        day_patterns = profile.get("day_patterns", {})
+        profile["day_patterns"] = {int(day): categories for day, categories in day_patterns.items()}
         return profile
     
     def _get_day_specific_tasks(self, day_of_week, user_profile):
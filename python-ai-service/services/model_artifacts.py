@@ -0,0 +1,103 @@
+"""
+Local model artifacts
+
+With MODEL_DIR set, every model is loaded from that directory and the
+Hugging Face libraries are switched to offline mode, so starting the
+service never touches the network. Fill the directory once, e.g. at
+image build time:
+
+    python -m services.model_artifacts [model_dir]
+
+Layout:
+    <MODEL_DIR>/spacy/<spaCy package name>/
+    <MODEL_DIR>/hf/<model id, "/" replaced by "--">/
+"""
+import os
+import sys
+
+# Every model the service loads. The sentiment id is the transformers
+# default for "sentiment-analysis".
+SPACY_MODEL = "en_core_web_md"
+SENTIMENT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+EMOTION_MODEL = "j-hartmann/emotion-english-distilroberta-base"
+COMPLETION_MODEL = "gpt2"
+HF_MODELS = (SENTIMENT_MODEL, EMOTION_MODEL, COMPLETION_MODEL)
+
+
+def model_dir():
+    """The configured artifact directory, or None to use installed packages and the hub cache"""
+    return os.environ.get('MODEL_DIR') or None
+
+
+# Environment variables that keep the Hugging Face libraries off the network
+OFFLINE_VARIABLES = ('HF_HUB_OFFLINE', 'TRANSFORMERS_OFFLINE')
+
+
+def configure_offline():
+    """
+    Forbid network access by the Hugging Face libraries when MODEL_DIR is set
+
+    Must run before transformers is imported: it reads these at import time.
+    Overrides a conflicting value already in the environment, so MODEL_DIR
+    always means offline.
+    """
+    if not model_dir():
+        return
+    for name in OFFLINE_VARIABLES:
+        if os.environ.get(name, '1') != '1':
+            print(f"Warning: {name}={os.environ[name]} ignored, MODEL_DIR is set so models load offline")
+        os.environ[name] = '1'
+
+
+def hf_path(model_id):
+    """Where to load a Hugging Face model from: its MODEL_DIR copy, or the hub id"""
+    root = model_dir()
+    if not root:
+        return model_id
+    return os.path.join(root, 'hf', model_id.replace('/', '--'))
+
+
+def spacy_path(name):
+    """Where to load a spaCy model from: its MODEL_DIR copy, or the installed package name"""
+    root = model_dir()
+    if not root:
+        return name
+    return os.path.join(root, 'spacy', name)
+
+
+def fetch(root):
+    """
+    Download every model into an artifact directory (needs network access)
+
+    With an ONNX INFERENCE_BACKEND the sentiment and emotion exports are
+    built too, from the downloaded copies, so they need not be exported
+    at startup.
+    """
+    import spacy
+    from huggingface_hub import snapshot_download
+
+    target = os.path.join(root, 'spacy', SPACY_MODEL)
+    if not os.path.exists(target):
+        if not spacy.util.is_package(SPACY_MODEL):
+            spacy.cli.download(SPACY_MODEL)
+        spacy.load(SPACY_MODEL).to_disk(target)
+    print(f"spaCy {SPACY_MODEL}: {target}")
+
+    for model_id in HF_MODELS:
+        target = os.path.join(root, 'hf', model_id.replace('/', '--'))
+        snapshot_download(repo_id=model_id, local_dir=target)
+        print(f"{model_id}: {target}")
+
+    backend = os.environ.get('INFERENCE_BACKEND', 'torch')
+    if backend != 'torch':
+        os.environ['MODEL_DIR'] = root
+        from .inference_backends import load_onnx_model
+        for model_id in (SENTIMENT_MODEL, EMOTION_MODEL):
+            load_onnx_model(model_id, quantized=backend == 'onnx-int8')
+
+
+if __name__ == '__main__':
+    root = sys.argv[1] if len(sys.argv) > 1 else model_dir()
+    if not root:
+        sys.exit("Usage: python -m services.model_artifacts <model_dir> (or set MODEL_DIR)")
+    fetch(root)
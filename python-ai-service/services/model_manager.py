@@ -0,0 +1,206 @@
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+def _current_rss():
+    """Resident set size of this process in bytes, or None if unavailable"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _estimate_bytes(model):
+    """Weight bytes of a PyTorch-backed pipeline, or None for other models"""
+    module = getattr(model, 'model', None)
+    parameters = getattr(module, 'parameters', None)
+    if not callable(parameters):
+        return None
+    try:
+        return sum(p.numel() * p.element_size() for p in parameters())
+    except Exception:
+        return None
+
+
+class ModelManager:
+    """Loads models on first use and evicts the least recently used over a memory budget"""
+
+    def __init__(self, memory_budget_bytes=0, retry_seconds=60, max_events=100):
+        """
+        Initialize the manager
+
+        Args:
+            memory_budget_bytes (int): Total size of loaded models to stay
+                under; 0 never evicts
+            retry_seconds (float): How long a failed load is reported without
+                being retried
+            max_events (int): Load/evict events kept for the status report
+        """
+        self.memory_budget_bytes = memory_budget_bytes
+        self.retry_seconds = retry_seconds
+        self._failures = {}
+        self._loaders = {}
+        self._models = OrderedDict()
+        self._sizes = {}
+        self._stats = {}
+        self._events = deque(maxlen=max_events)
+        self._lock = threading.Lock()
+        # One load at a time, so RSS growth is attributed to the right model
+        self._load_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Build a manager from MODEL_MEMORY_BUDGET_MB / MODEL_RETRY_SECONDS"""
+        return cls(
+            memory_budget_bytes=int(float(os.environ.get('MODEL_MEMORY_BUDGET_MB', 0)) * 1024 * 1024),
+            retry_seconds=float(os.environ.get('MODEL_RETRY_SECONDS', 60))
+        )
+
+    def register(self, name, loader):
+        """
+        Declare how to load a model; nothing is loaded yet
+
+        Args:
+            name (str): Model name used by get()
+            loader (callable): Returns the loaded model
+        """
+        with self._lock:
+            self._loaders.setdefault(name, loader)
+            self._stats.setdefault(name, {"hits": 0, "loads": 0, "evictions": 0, "load_seconds": None})
+
+    def get(self, name, record_hit=True):
+        """
+        Return a model, loading it (and evicting others if needed) on a miss
+
+        Args:
+            name (str): Registered model name
+            record_hit (bool): Count this call in the model's hits
+
+        Raises:
+            KeyError: If no loader is registered under this name
+            RuntimeError: If the model failed to load within retry_seconds
+            Whatever the loader raises when the model cannot be loaded
+        """
+        with self._lock:
+            if name in self._models:
+                self._models.move_to_end(name)
+                if record_hit:
+                    self._stats[name]["hits"] += 1
+                return self._models[name]
+            loader = self._loaders[name]
+            failure = self._failures.get(name)
+            if failure and time.time() - failure[0] < self.retry_seconds:
+                raise RuntimeError(f"Model {name} failed to load: {failure[1]}")
+
+        with self._load_lock:
+            # Another thread may have loaded it while we waited
+            with self._lock:
+                if name in self._models:
+                    self._models.move_to_end(name)
+                    if record_hit:
+                        self._stats[name]["hits"] += 1
+                    return self._models[name]
+
+            rss_before = _current_rss()
+            start = time.perf_counter()
+            try:
+                model = loader()
+            except Exception as e:
+                with self._lock:
+                    self._failures[name] = (time.time(), str(e))
+                    self._event("load_failed", name, None, time.perf_counter() - start)
+                raise
+            seconds = time.perf_counter() - start
+            rss_after = _current_rss()
+
+            size = _estimate_bytes(model)
+            if size is None and rss_before is not None and rss_after is not None:
+                size = max(0, rss_after - rss_before)
+
+            with self._lock:
+                self._failures.pop(name, None)
+                self._models[name] = model
+                self._sizes[name] = size or 0
+                stats = self._stats[name]
+                if record_hit:
+                    stats["hits"] += 1
+                stats["loads"] += 1
+                stats["load_seconds"] = round(seconds, 3)
+                self._event("load", name, size, seconds)
+                evicted = self._evict(keep=name)
+            print(f"Loaded model {name} in {seconds:.2f}s")
+
+        if evicted:
+            # Release the evicted weights now rather than at the next GC cycle
+            gc.collect()
+        return model
+
+    def evict(self, name):
+        """Unload a model; it is loaded again on next use"""
+        with self._lock:
+            if name not in self._models:
+                return False
+            self._drop(name)
+        gc.collect()
+        return True
+
+    def loaded(self, name):
+        with self._lock:
+            return name in self._models
+
+    def status(self):
+        """Loaded models, their sizes, hit counts and recent load/evict events"""
+        with self._lock:
+            return {
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "loaded_bytes": sum(self._sizes.values()),
+                "process_rss_bytes": _current_rss(),
+                "models": {
+                    name: {
+                        "loaded": name in self._models,
+                        "size_bytes": self._sizes.get(name),
+                        "last_error": self._failures[name][1] if name in self._failures else None,
+                        **stats
+                    }
+                    for name, stats in self._stats.items()
+                },
+                "lru_order": list(self._models),
+                "events": list(self._events)
+            }
+
+    def _event(self, event, name, size, seconds=None):
+        self._events.append({
+            "event": event,
+            "model": name,
+            "size_bytes": size,
+            "seconds": round(seconds, 3) if seconds is not None else None,
+            "at": time.time()
+        })
+
+    def _drop(self, name):
+        self._models.pop(name)
+        size = self._sizes.pop(name, 0)
+        self._stats[name]["evictions"] += 1
+        self._event("evict", name, size)
+        print(f"Evicted model {name}")
+
+    def _evict(self, keep):
+        """Evict least recently used models until the budget holds; returns how many"""
+        evicted = 0
+        if not self.memory_budget_bytes:
+            return evicted
+        while sum(self._sizes.values()) > self.memory_budget_bytes:
+            candidates = [name for name in self._models if name != keep]
+            if not candidates:
+                break
+            self._drop(candidates[0])
+            evicted += 1
+        return evicted
+
+
+# Shared by every service in the process
+model_manager = ModelManager.from_env()
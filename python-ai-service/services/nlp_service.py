@@ -1,26 +1,72 @@
 import os
+import queue
+import re
+import threading
+import time
 import spacy
-from transformers import pipeline
+from transformers import pipeline, StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+
+from .completion_index import CompletionIndex
+from .model_artifacts import COMPLETION_MODEL, SPACY_MODEL, hf_path, spacy_path
+from .model_manager import model_manager
+
+# A sentence ends at . ! or ? followed by whitespace or the end of the chunk
+SENTENCE_END = re.compile(r'[.!?](?=\s|$)')
+
+class _StopGeneration(StoppingCriteria):
+    """Ends generation at a wall-clock deadline or when the reader stops listening"""
+    
+    def __init__(self, deadline, cancelled):
+        self.deadline = deadline
+        self.cancelled = cancelled
+    
+    def __call__(self, input_ids, scores, **kwargs):
+        return self.cancelled.is_set() or time.monotonic() >= self.deadline
+
+def _load_spacy():
+    """Load the spaCy model from MODEL_DIR or the installed package; never downloads it"""
+    path = spacy_path(SPACY_MODEL)
+    try:
+        return spacy.load(path)
+    except OSError as e:
+        raise RuntimeError(f"spaCy model {SPACY_MODEL} not found at {path}; "
+                           f"run python -m services.model_artifacts to fetch it") from e
 
 class NLPService:
-    def __init__(self):
-        """Initialize the NLP service with spaCy and transformers models"""
-        # Load spaCy model for general NLP tasks
-        try:
-            self.nlp = spacy.load("en_core_web_md")
-        except:
-            # If model not found, download it
-            import subprocess
-            subprocess.call(["python", "-m", "spacy", "download", "en_core_web_md"])
-            self.nlp = spacy.load("en_core_web_md")
-        
-        # Initialize text completion model (for command suggestions)
+    def __init__(self, completion_index=None):
+        """Initialize the NLP service; models load through the model manager on first use"""
+        # Command completions from known commands and past task titles
+        self.completion_index = completion_index or CompletionIndex.from_env()
+        
+        # spaCy model for general NLP tasks
+        model_manager.register("spacy", _load_spacy)
+        
+        # Text completion model, for prefixes the completion index cannot complete
+        model_manager.register("gpt2", lambda: pipeline("text-generation", model=hf_path(COMPLETION_MODEL)))
+    
+    @property
+    def nlp(self):
+        return model_manager.get("spacy")
+    
+    @property
+    def text_generator(self):
+        """The GPT-2 pipeline, or None if it could not be loaded"""
         try:
-            self.text_generator = pipeline("text-generation", model="gpt2")
-        except:
-            # Fallback to a smaller model if GPU memory is limited
-            self.text_generator = None
-            print("Warning: Text generation model could not be loaded.")
+            return model_manager.get("gpt2")
+        except Exception as e:
+            print(f"Warning: Text generation model could not be loaded: {e}")
+            return None
+    
+    def warm_up_steps(self):
+        """Model name -> callable that loads the model and runs one inference through it"""
+        def warm_up_gpt2():
+            generator = model_manager.get("gpt2")
+            generator("Add task", max_new_tokens=1, pad_token_id=generator.tokenizer.eos_token_id)
+        
+        return {
+            "spacy": lambda: self.nlp("Schedule a meeting with the team tomorrow at 10am"),
+            "gpt2": warm_up_gpt2
+        }
     
     def analyze(self, text):
         """Perform comprehensive NLP analysis on the input text"""
@@ -78,18 +124,154 @@ class NLPService:
         
         return entities
     
+    def complete_command(self, text, user_id=None, k=5, max_length=50):
+        """
+        Complete a command from the completion index, or with GPT-2 if it has no match
+        
+        Returns:
+            dict: "completion" (str), "completions" (index matches, best
+                first) and "source" ('index' or 'model')
+        """
+        completions = self.completion_index.complete(text, user_id=user_id, k=k)
+        if completions:
+            return {"completion": completions[0]["text"], "completions": completions, "source": "index"}
+        return {"completion": self.predict_completion(text, max_length), "completions": [], "source": "model"}
+    
+    def record_task_title(self, user_id, title):
+        """Make a newly created task title available to the user's completions"""
+        self.completion_index.add_title(user_id, title)
+    
     def predict_completion(self, text, max_length=50):
-        """Predict text completion for user commands"""
-        if not self.text_generator:
+        """Predict text completion for user commands with GPT-2"""
+        text_generator = self.text_generator
+        if not text_generator:
             return "Text completion not available"
         
         try:
-            completions = self.text_generator(text, max_length=max_length, num_return_sequences=1)
+            completions = text_generator(text, max_length=max_length, num_return_sequences=1)
             return completions[0]['generated_text']
         except Exception as e:
             print(f"Error in text completion: {e}")
             return text
     
+    def stream_completion(self, text, user_id=None, max_new_tokens=20, deadline_seconds=2.0,
+                          stop_at_sentence_end=True):
+        """
+        Generate a completion and yield it piece by piece as tokens arrive
+        
+        A match in the completion index is sent as a single piece without
+        running GPT-2. Otherwise generation runs on a background thread
+        (PyTorch models only; other frameworks send the whole completion as
+        one piece once it is generated). It stops at max_new_tokens,
+        at the deadline, at the first newline after some text, or (when
+        stop_at_sentence_end is set) at the end of the first sentence.
+        
+        Args:
+            text (str): Prompt to complete
+            user_id: Whose task titles the completion index may use
+            max_new_tokens (int): Most tokens to generate
+            deadline_seconds (float): Wall-clock budget for the whole completion
+            stop_at_sentence_end (bool): Stop after . ! or ?
+        
+        Yields:
+            dict: {"token": str} for each piece, then a final
+                {"done": True, "completion": str, "reason": str, "partial": bool}
+                where reason is 'index', 'complete', 'stop', 'deadline',
+                'unavailable' or 'error'
+        """
+        completions = self.completion_index.complete(text, user_id=user_id, k=1)
+        if completions:
+            # The stream carries only the text after the prompt
+            completion = completions[0]["suffix"]
+            yield {"token": completion}
+            yield {"done": True, "completion": completion, "reason": "index", "partial": False}
+            return
+        
+        text_generator = self.text_generator
+        if not text_generator:
+            yield {"done": True, "completion": "", "reason": "unavailable", "partial": False}
+            return
+        
+        deadline = time.monotonic() + deadline_seconds
+        cancelled = threading.Event()
+        completion = ""
+        reason = "complete"
+        try:
+            if text_generator.framework != "pt":
+                # TensorFlow generate() takes no streamer or stopping criteria
+                completion, reason = self._generate_at_once(text_generator, text, max_new_tokens,
+                                                            stop_at_sentence_end)
+                if completion:
+                    yield {"token": completion}
+            else:
+                tokenizer = text_generator.tokenizer
+                streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True,
+                                                timeout=deadline_seconds)
+                inputs = tokenizer(text, return_tensors="pt")
+                worker = threading.Thread(target=text_generator.model.generate, daemon=True, kwargs=dict(
+                    inputs,
+                    streamer=streamer,
+                    max_new_tokens=max_new_tokens,
+                    do_sample=True,
+                    pad_token_id=tokenizer.eos_token_id,
+                    stopping_criteria=StoppingCriteriaList([_StopGeneration(deadline, cancelled)])
+                ))
+                worker.start()
+                
+                for chunk in streamer:
+                    cut, stopped = self._stop_point(completion, chunk, stop_at_sentence_end)
+                    piece = chunk[:cut]
+                    if piece:
+                        completion += piece
+                        yield {"token": piece}
+                    if stopped:
+                        reason = "stop"
+                        break
+                    if time.monotonic() >= deadline:
+                        reason = "deadline"
+                        break
+                else:
+                    # The stopping criteria ends generation quietly at the deadline
+                    if time.monotonic() >= deadline:
+                        reason = "deadline"
+        except queue.Empty:
+            reason = "deadline"
+        except Exception as e:
+            print(f"Error in streaming completion: {e}")
+            reason = "error"
+        finally:
+            # Also reached when the client disconnects and the generator is closed
+            cancelled.set()
+        
+        yield {"done": True, "completion": completion, "reason": reason, "partial": reason in ("deadline", "error")}
+    
+    def _generate_at_once(self, text_generator, text, max_new_tokens, stop_at_sentence_end):
+        """Generate a whole completion without streaming; the deadline is not enforced"""
+        generated = text_generator(text, max_new_tokens=max_new_tokens, num_return_sequences=1,
+                                   return_full_text=False)[0]['generated_text']
+        cut, stopped = self._stop_point("", generated, stop_at_sentence_end)
+        return generated[:cut], "stop" if stopped else "complete"
+    
+    @staticmethod
+    def _stop_point(completion, chunk, stop_at_sentence_end):
+        """How much of a chunk to keep, and whether the completion ends in it"""
+        if not (completion + chunk).strip():
+            # Leading blank lines do not end an empty completion
+            return len(chunk), False
+        
+        cuts = []
+        for newline in re.finditer("\n", chunk):
+            if (completion + chunk[:newline.start()]).strip():
+                cuts.append(newline.start())
+                break
+        if stop_at_sentence_end:
+            match = SENTENCE_END.search(chunk)
+            if match:
+                cuts.append(match.end())
+        if cuts:
+            return min(cuts), True
+        return len(chunk), False
+    
     def _extract_key_phrases(self, doc):
         """Extract key action phrases from the document"""
         phrases = []
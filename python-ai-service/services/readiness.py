@@ -0,0 +1,81 @@
+import threading
+import time
+
+
+class Readiness:
+    """Runs the startup warm-up and reports whether this replica may take traffic"""
+
+    def __init__(self, started_at, model_manager=None):
+        """
+        Args:
+            started_at (float): time.time() when the process started booting,
+                so the cold start includes imports and service setup
+            model_manager (ModelManager): Holds the warmed models; a model it
+                evicted during warm-up fails readiness
+        """
+        self.started_at = started_at
+        self.model_manager = model_manager
+        self.state = "starting"
+        self.cold_start_seconds = None
+        self.models = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    def start(self, steps):
+        """
+        Warm up on a background thread, so the server can answer readiness probes meanwhile
+
+        Args:
+            steps (dict): Model name to a callable that loads the model and
+                runs one inference through it
+        """
+        self._thread = threading.Thread(target=self.run, args=(steps,), name="warm-up", daemon=True)
+        self._thread.start()
+
+    def run(self, steps):
+        """
+        Run every warm-up step; the replica is ready only if all of them succeed
+
+        The warmed models must also still be loaded at the end: a model
+        evicted to make room for a later one means the warm-up set does not
+        fit the memory budget, and the replica would serve cold anyway.
+        """
+        with self._lock:
+            self.state = "warming"
+        for name, step in steps.items():
+            start = time.perf_counter()
+            error = None
+            try:
+                step()
+            except Exception as e:
+                error = str(e)
+                print(f"Warm-up of {name} failed: {e}")
+            with self._lock:
+                self.models[name] = {"seconds": round(time.perf_counter() - start, 3), "error": error}
+
+        with self._lock:
+            if self.model_manager is not None:
+                for name, model in self.models.items():
+                    if not model["error"] and not self.model_manager.loaded(name):
+                        model["error"] = "evicted during warm-up: the warmed models exceed MODEL_MEMORY_BUDGET_MB"
+                        print(f"Warm-up of {name} failed: {model['error']}")
+            failed = [name for name, model in self.models.items() if model["error"]]
+            self.state = "failed" if failed else "ready"
+            self.cold_start_seconds = round(time.time() - self.started_at, 3)
+            report = ", ".join(f"{name} {model['seconds']:.2f}s" for name, model in self.models.items())
+        print(f"Cold start {self.state} in {self.cold_start_seconds:.2f}s (warm-up: {report or 'none'})")
+
+    def status(self):
+        """Readiness state, cold-start time and warm-up time (or error) per model"""
+        with self._lock:
+            return {
+                "ready": self.state == "ready",
+                "state": self.state,
+                "cold_start_seconds": self.cold_start_seconds,
+                "uptime_seconds": round(time.time() - self.started_at, 3),
+                "models": dict(self.models)
+            }
@@ -1,31 +1,110 @@
-from transformers import pipeline
+import os
+
 import numpy as np
 
+from .inference_backends import EMOTION_MODEL, SENTIMENT_MODEL, create_emotion_pipeline, create_sentiment_pipeline
+from .micro_batcher import MicroBatcher
+from .model_manager import model_manager
+
+class AnalysisContext:
+    """Model outputs for one text, each computed at most once per request"""
+    
+    def __init__(self, analyzer, text):
+        self.analyzer = analyzer
+        self.text = text
+        self._sentiment = None
+        self._emotions = None
+    
+    @property
+    def sentiment(self):
+        if self._sentiment is None:
+            self._sentiment = self.analyzer._get_sentiment(self.text)
+        return self._sentiment
+    
+    @property
+    def emotions(self):
+        if self._emotions is None:
+            self._emotions = self.analyzer._get_emotions(self.text)
+        return self._emotions
+
 class SentimentAnalyzer:
-    def __init__(self):
-        """Initialize the sentiment analysis service with a pre-trained model"""
+    def __init__(self, backend=None):
+        """
+        Initialize the sentiment analysis service with pre-trained models
+        
+        Args:
+            backend (str): 'torch', 'onnx' or 'onnx-int8'; defaults to the
+                INFERENCE_BACKEND environment variable, then 'torch'
+        """
+        self.backend = backend or os.environ.get('INFERENCE_BACKEND', 'torch')
+        # Identifies the models behind a result, e.g. for request coalescing
+        self.model_version = f"{self.backend}:{SENTIMENT_MODEL}:{EMOTION_MODEL}"
+        
+        # Models load through the manager on first use and may be evicted
+        # when the memory budget is exceeded
+        model_manager.register("sentiment", lambda: self._load(create_sentiment_pipeline))
+        model_manager.register("emotion", lambda: self._load(create_emotion_pipeline))
+        
+        # Concurrent requests share forward passes: each pipeline gets a
+        # batcher that runs queued texts as one padded batch
+        self.sentiment_batcher = self._make_batcher("sentiment", "sentiment-batcher")
+        self.emotion_batcher = self._make_batcher("emotion", "emotion-batcher")
+    
+    def _load(self, create):
+        """Build a pipeline on the configured backend, falling back to PyTorch"""
         try:
-            # Load the sentiment analysis pipeline from Hugging Face
-            self.sentiment_analyzer = pipeline("sentiment-analysis")
-            
-            # Load a more specific model for emotion detection
-            self.emotion_detector = pipeline(
-                "text-classification", 
-                model="j-hartmann/emotion-english-distilroberta-base", 
-                return_all_scores=True
-            )
+            return create(self.backend)
         except Exception as e:
-            print(f"Error initializing sentiment analysis models: {e}")
-            self.sentiment_analyzer = None
-            self.emotion_detector = None
+            if self.backend == 'torch':
+                raise
+            # ONNX export or runtime unavailable
+            print(f"Error loading {self.backend} backend, falling back to torch: {e}")
+            return create('torch')
+    
+    @staticmethod
+    def _model(name):
+        """A loaded pipeline, or None if it cannot be loaded"""
+        try:
+            return model_manager.get(name)
+        except Exception as e:
+            print(f"Error initializing {name} model: {e}")
+            return None
+    
+    @property
+    def sentiment_analyzer(self):
+        return self._model("sentiment")
+    
+    @property
+    def emotion_detector(self):
+        return self._model("emotion")
+    
+    def _make_batcher(self, model_name, name):
+        """Batcher that runs a Hugging Face pipeline over a list of texts"""
+        def run(texts):
+            # Fetched per batch, so an evicted model is reloaded on demand
+            return model_manager.get(model_name, record_hit=False)(texts, batch_size=len(texts))
+        return MicroBatcher.from_env(run, name=name)
+    
+    def warm_up_steps(self):
+        """Model name -> callable that loads the model and runs one inference through it"""
+        text = "I finished the report and feel great about it"
+        return {
+            "sentiment": lambda: model_manager.get("sentiment")(text),
+            "emotion": lambda: model_manager.get("emotion")(text)
+        }
+    
+    def batching_stats(self):
+        """Batch sizes and latency of each pipeline's batcher"""
+        return [batcher.stats() for batcher in (self.sentiment_batcher, self.emotion_batcher)]
     
     def analyze(self, text):
         """Analyze the sentiment and emotions in the given text"""
+        context = AnalysisContext(self, text)
         result = {
             "text": text,
-            "sentiment": self._get_sentiment(text),
-            "emotions": self._get_emotions(text),
-            "productivity_insights": self._get_productivity_insights(text)
+            "sentiment": context.sentiment,
+            "emotions": context.emotions,
+            "productivity_insights": self._get_productivity_insights(context)
         }
         return result
     
@@ -35,7 +114,7 @@ class SentimentAnalyzer:
             return {"label": "NEUTRAL", "score": 0.5}
         
         try:
-            sentiment = self.sentiment_analyzer(text)[0]
+            sentiment = self.sentiment_batcher.submit(text)
             return sentiment
         except Exception as e:
             print(f"Error in sentiment analysis: {e}")
@@ -47,7 +126,7 @@ class SentimentAnalyzer:
             return [{"label": "unknown", "score": 1.0}]
         
         try:
-            emotions = self.emotion_detector(text)[0]
+            emotions = list(self.emotion_batcher.submit(text))
             # Sort emotions by score
             emotions.sort(key=lambda x: x["score"], reverse=True)
             return emotions
@@ -55,13 +134,14 @@ class SentimentAnalyzer:
             print(f"Error in emotion detection: {e}")
             return [{"label": "unknown", "score": 1.0}]
     
-    def _get_productivity_insights(self, text):
+    def _get_productivity_insights(self, context):
         """Extract productivity-related insights from sentiment analysis"""
         insights = []
+        text = context.text
         
-        # Get primary sentiment and emotion
-        sentiment = self._get_sentiment(text)
-        emotions = self._get_emotions(text)
+        # Reuse the request's sentiment and emotions instead of rerunning the models
+        sentiment = context.sentiment
+        emotions = context.emotions
         primary_emotion = emotions[0]["label"] if emotions else "unknown"
         
         # Check for signs of stress or burnout
@@ -105,4 +185,5 @@ class SentimentAnalyzer:
                 "confidence": 0.7
             })
         
-        return insights 
\ No newline at end of file
+        return insights 
+
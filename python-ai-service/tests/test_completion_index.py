@@ -0,0 +1,97 @@
+import json
+
+from services.completion_index import DEFAULT_COMMANDS_PATH, CompletionIndex, load_command_patterns
+
+
+def texts(completions):
+    return [completion["text"] for completion in completions]
+
+
+def make_index(*titles):
+    index = CompletionIndex()
+    for title in titles:
+        index.add_title(1, title)
+    return index
+
+
+def test_catalogue_is_shared_with_the_node_nlp_manager():
+    with open(DEFAULT_COMMANDS_PATH) as f:
+        catalogue = json.load(f)
+
+    patterns = load_command_patterns(DEFAULT_COMMANDS_PATH)
+    assert "add task %task%" in catalogue["task.create"]
+    assert len(patterns) == sum(len(intent_patterns) for intent_patterns in catalogue.values())
+    assert "show me my tasks" in texts(CompletionIndex().complete("show m", k=10))
+
+
+def test_command_without_trailing_space_completes_with_titles():
+    index = make_index("buy milk", "write report")
+
+    assert texts(index.complete("add task", user_id=1)) == ["add task buy milk", "add task write report"]
+    assert texts(index.complete("add task ", user_id=1)) == ["add task buy milk", "add task write report"]
+
+
+def test_titles_rank_by_how_often_they_were_used():
+    index = make_index("write report", "write tests", "write tests")
+
+    assert texts(index.complete("add task wri", user_id=1)) == ["add task write tests", "add task write report"]
+
+
+def test_suffix_follows_the_text_as_typed():
+    index = make_index("write report")
+
+    for typed in ("add task wri", "  Add  task wri", "add task   wri"):
+        best = index.complete(typed, user_id=1)[0]
+        assert best["text"] == "add task write report"
+        assert best["suffix"] == "te report"
+    assert index.complete("add task ", user_id=1)[0]["suffix"] == "write report"
+    assert index.complete("add task", user_id=1)[0]["suffix"] == " write report"
+
+
+def test_prefix_is_not_its_own_completion():
+    index = make_index("write report")
+
+    assert "write report" not in texts(index.complete("write report", user_id=1))
+
+
+def test_next_word_is_predicted_from_bigram_counts():
+    index = make_index("email boss about report", "call mom about dinner", "call mom about dinner")
+
+    # No phrase starts with the prefix, but "about" is followed by known words
+    completions = index.complete("ask the team about d", user_id=1)
+    assert completions[0] == {
+        "text": "ask the team about dinner", "score": 4, "source": "ngram", "suffix": "inner"}
+    assert texts(index.complete("ask the team about ", user_id=1))[:2] == [
+        "ask the team about dinner", "ask the team about report"]
+
+
+def test_missing_catalogue_leaves_titles(tmp_path):
+    index = CompletionIndex(commands=load_command_patterns(str(tmp_path / "missing.json")))
+    index.add_title(1, "buy milk")
+
+    assert index.stats()["commands"] == 0
+    assert texts(index.complete("bu", user_id=1)) == ["buy milk"]
+
+
+class TitleSource:
+    def __init__(self, titles):
+        self.titles = titles
+
+    def load(self, user_id):
+        return dict(self.titles)
+
+
+def test_title_added_before_the_user_loads_is_kept():
+    # The load does not see the new task yet
+    index = CompletionIndex(title_source=TitleSource({"buy milk": 1}), commands=[])
+    index.add_title(1, "write report")
+
+    assert texts(index.complete("wri", user_id=1)) == ["write report"]
+    assert index.stats()["pending_titles"] == 0
+
+
+def test_pending_title_the_load_already_saw_is_not_counted_twice():
+    index = CompletionIndex(title_source=TitleSource({"write report": 1}), commands=[])
+    index.add_title(1, "write report")
+
+    assert index.complete("wri", user_id=1)[0]["score"] == 2
@@ -0,0 +1,48 @@
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+from services.micro_batcher import MicroBatcher
+
+
+class WorkerKilled(BaseException):
+    pass
+
+
+def test_caller_gives_up_on_a_hung_batch():
+    release = threading.Event()
+    calls = []
+
+    def hang(items):
+        calls.append(items)
+        release.wait(5)
+        return items
+
+    batcher = MicroBatcher(hang, max_batch_size=4, max_wait_ms=1, timeout_ms=50)
+    with pytest.raises(FutureTimeoutError):
+        batcher.submit("first")
+    # Queued behind the hung batch, so it is cancelled before it runs
+    with pytest.raises(FutureTimeoutError):
+        batcher.submit("second")
+
+    release.set()
+    assert batcher.submit("third") == "third"
+    assert calls == [["first"], ["third"]]
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_dead_worker_fails_its_callers_and_is_replaced():
+    def run(items):
+        if "kill" in items:
+            raise WorkerKilled()
+        return items
+
+    batcher = MicroBatcher(run, max_batch_size=4, max_wait_ms=1, timeout_ms=5000, name="doomed")
+    with pytest.raises(RuntimeError, match="worker stopped"):
+        batcher.submit("kill")
+    for thread in threading.enumerate():
+        if thread.name == "doomed":
+            thread.join(5)
+
+    assert batcher.submit("text") == "text"
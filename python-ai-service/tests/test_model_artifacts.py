@@ -0,0 +1,24 @@
+import os
+
+from services.model_artifacts import OFFLINE_VARIABLES, configure_offline
+
+
+def test_model_dir_overrides_online_settings(monkeypatch, tmp_path):
+    monkeypatch.setenv('MODEL_DIR', str(tmp_path))
+    monkeypatch.setenv('HF_HUB_OFFLINE', '0')
+    monkeypatch.setenv('TRANSFORMERS_OFFLINE', '0')
+
+    configure_offline()
+
+    assert [os.environ[name] for name in OFFLINE_VARIABLES] == ['1', '1']
+
+
+def test_without_model_dir_settings_are_left_alone(monkeypatch):
+    monkeypatch.delenv('MODEL_DIR', raising=False)
+    monkeypatch.setenv('HF_HUB_OFFLINE', '0')
+    monkeypatch.delenv('TRANSFORMERS_OFFLINE', raising=False)
+
+    configure_offline()
+
+    assert os.environ['HF_HUB_OFFLINE'] == '0'
+    assert 'TRANSFORMERS_OFFLINE' not in os.environ
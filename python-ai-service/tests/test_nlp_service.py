@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip("spacy")
+pytest.importorskip("transformers")
+
+from services import nlp_service
+from services.completion_index import CompletionIndex
+from services.model_manager import ModelManager
+
+
+class BrokenTokenizer:
+    eos_token_id = 0
+
+    def __call__(self, text, **kwargs):
+        raise RuntimeError("tokenizer failed")
+
+
+class StubGenerator:
+    """Stands in for the text-generation pipeline"""
+
+    def __init__(self, framework, output="", tokenizer=None):
+        self.framework = framework
+        self.output = output
+        self.tokenizer = tokenizer
+        self.model = None
+
+    def __call__(self, text, **kwargs):
+        return [{"generated_text": self.output}]
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(nlp_service, "model_manager", ModelManager())
+    return nlp_service.NLPService(completion_index=CompletionIndex(commands=[]))
+
+
+def use_generator(monkeypatch, generator):
+    monkeypatch.setattr(nlp_service.NLPService, "text_generator", property(lambda self: generator))
+
+
+def test_generation_error_still_ends_the_stream(service, monkeypatch):
+    use_generator(monkeypatch, StubGenerator("pt", tokenizer=BrokenTokenizer()))
+
+    events = list(service.stream_completion("plan my"))
+
+    assert events == [{"done": True, "completion": "", "reason": "error", "partial": True}]
+
+
+def test_tensorflow_model_completes_in_one_piece(service, monkeypatch):
+    use_generator(monkeypatch, StubGenerator("tf", output=" week ahead. Then rest"))
+
+    events = list(service.stream_completion("plan my"))
+
+    assert events == [
+        {"token": " week ahead."},
+        {"done": True, "completion": " week ahead.", "reason": "stop", "partial": False},
+    ]
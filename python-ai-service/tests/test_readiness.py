@@ -0,0 +1,46 @@
+import time
+from types import SimpleNamespace
+
+from services.model_manager import ModelManager
+from services.readiness import Readiness
+
+
+def sized_model(size):
+    """A fake pipeline whose weights the manager measures as size bytes"""
+    weights = SimpleNamespace(numel=lambda: size, element_size=lambda: 1)
+    return SimpleNamespace(model=SimpleNamespace(parameters=lambda: [weights]))
+
+
+def warm_up(manager, names):
+    readiness = Readiness(time.time(), manager)
+    readiness.run({name: (lambda name=name: manager.get(name)) for name in names})
+    return readiness.status()
+
+
+def make_manager(budget):
+    manager = ModelManager(memory_budget_bytes=budget)
+    manager.register("sentiment", lambda: sized_model(80))
+    manager.register("emotion", lambda: sized_model(80))
+    return manager
+
+
+def test_models_that_fit_the_budget_are_ready():
+    status = warm_up(make_manager(budget=100), ["sentiment"])
+
+    assert status["ready"]
+    assert status["models"]["sentiment"]["error"] is None
+
+
+def test_warm_up_over_the_budget_fails_readiness():
+    status = warm_up(make_manager(budget=100), ["sentiment", "emotion"])
+
+    assert not status["ready"]
+    assert status["state"] == "failed"
+    assert "MODEL_MEMORY_BUDGET_MB" in status["models"]["sentiment"]["error"]
+    assert status["models"]["emotion"]["error"] is None
+
+
+def test_without_a_budget_every_model_stays_loaded():
+    status = warm_up(make_manager(budget=0), ["sentiment", "emotion"])
+
+    assert status["ready"]
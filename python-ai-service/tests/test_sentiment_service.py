@@ -0,0 +1,56 @@
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("transformers")
+
+from services import sentiment_service
+from services.model_manager import ModelManager
+
+
+class StubPipeline:
+    """Stands in for a Hugging Face pipeline, counting its forward passes"""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = []
+
+    def __call__(self, texts, batch_size=None):
+        self.calls.append(list(texts))
+        return [self.result for _ in texts]
+
+
+@pytest.fixture
+def pipelines(monkeypatch):
+    stubs = {
+        "sentiment": StubPipeline({"label": "POSITIVE", "score": 0.9}),
+        "emotion": StubPipeline([{"label": "joy", "score": 0.2}, {"label": "fear", "score": 0.7}]),
+    }
+    # A manager of our own, so loaders registered by other analyzers do not apply
+    monkeypatch.setattr(sentiment_service, "model_manager", ModelManager())
+    monkeypatch.setattr(sentiment_service, "create_sentiment_pipeline", lambda backend: stubs["sentiment"])
+    monkeypatch.setattr(sentiment_service, "create_emotion_pipeline", lambda backend: stubs["emotion"])
+    monkeypatch.setenv("HF_BATCH_MAX_SIZE", "1")
+    return stubs
+
+
+def test_analysis_runs_each_model_once(pipelines):
+    text = "I am stressed about the deadline but excited about the launch"
+    result = sentiment_service.SentimentAnalyzer(backend="torch").analyze(text)
+
+    assert pipelines["sentiment"].calls == [[text]]
+    assert pipelines["emotion"].calls == [[text]]
+    assert result["sentiment"] == {"label": "POSITIVE", "score": 0.9}
+    assert result["emotions"][0]["label"] == "fear"
+    # Insights reuse the outputs above rather than running the models again
+    assert result["productivity_insights"][0]["type"] == "stress_warning"
+
+
+def test_unavailable_model_is_not_run(pipelines, monkeypatch):
+    def fail(backend):
+        raise OSError("emotion model not downloaded")
+
+    monkeypatch.setattr(sentiment_service, "create_emotion_pipeline", fail)
+    result = sentiment_service.SentimentAnalyzer(backend="torch").analyze("Finished the report")
+
+    assert pipelines["sentiment"].calls == [["Finished the report"]]
+    assert result["emotions"] == [{"label": "unknown", "score": 1.0}]
@@ -2,6 +2,7 @@ const express = require('express');
 const router = express.Router();
 const { protect } = require('../../middleware/auth');
 const nlpService = require('../../services/nlp');
+const pythonAI = require('../../services/pythonAI');
 const User = require('../../models/User');
 const Task = require('../../models/Task');
 const Habit = require('../../models/Habit');
@@ -21,7 +22,7 @@ router.post('/', protect, async (req, res) => {
     }
 
     // Process the text using NLP
-    const result = await nlpService.process(text);
+    const result = await nlpService.process(text, req.user.id);
     
     // Handle the command based on intent
     let response = await handleIntent(result, req.user.id);
@@ -63,6 +64,9 @@ async function handleIntent(nlpResult, userId) {
           dueDate: new Date(Date.now() + 24 * 60 * 60 * 1000) // Default due date is tomorrow
         });
 
+        // Not awaited: completions catch up without delaying the reply
+        pythonAI.recordTaskTitle(userId, taskContent);
+
         response.message = `I've created a task: "${taskContent}"`;
         response.data = task;
       }
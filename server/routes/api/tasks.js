@@ -1,6 +1,7 @@
 const express = require('express');
 const router = express.Router();
 const Task = require('../../models/Task');
+const pythonAI = require('../../services/pythonAI');
 const { protect } = require('../../middleware/auth');
 const { Op } = require('sequelize');
 
@@ -58,6 +59,9 @@ router.post('/', protect, async (req, res) => {
       recurringPattern,
     });
 
+    // Not awaited: completions catch up without delaying the reply
+    pythonAI.recordTaskTitle(req.user.id, task.title);
+
     res.status(201).json({
       success: true,
       data: task,
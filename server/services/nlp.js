@@ -1,5 +1,9 @@
 const { NlpManager } = require('node-nlp');
 const pythonAI = require('./pythonAI');
+const commands = require('../data/commands.json');
+
+// Wall-clock budget for a completion suggestion on an ambiguous command
+const COMPLETION_DEADLINE_MS = parseInt(process.env.COMPLETION_DEADLINE_MS || '1000', 10);
 
 class NLPService {
   constructor() {
@@ -20,76 +24,13 @@ class NLPService {
       this.usePythonAI = false;
     }
 
-    // Add task-related intents
-    this.manager.addDocument('en', 'add task %task%', 'task.create');
-    this.manager.addDocument('en', 'create task %task%', 'task.create');
-    this.manager.addDocument('en', 'new task %task%', 'task.create');
-    this.manager.addDocument('en', 'remind me to %task%', 'task.create');
-    this.manager.addDocument('en', 'i need to %task%', 'task.create');
-
-    this.manager.addDocument('en', 'list my tasks', 'task.list');
-    this.manager.addDocument('en', 'show me my tasks', 'task.list');
-    this.manager.addDocument('en', 'what are my tasks', 'task.list');
-    this.manager.addDocument('en', 'show tasks for today', 'task.list.today');
-    this.manager.addDocument('en', 'what do I have to do today', 'task.list.today');
-
-    this.manager.addDocument('en', 'mark task %task% as done', 'task.complete');
-    this.manager.addDocument('en', 'complete task %task%', 'task.complete');
-    this.manager.addDocument('en', 'finish task %task%', 'task.complete');
-    this.manager.addDocument('en', 'i finished %task%', 'task.complete');
-
-    // Add habit-related intents
-    this.manager.addDocument('en', 'track habit %habit%', 'habit.create');
-    this.manager.addDocument('en', 'create habit %habit%', 'habit.create');
-    this.manager.addDocument('en', 'new habit %habit%', 'habit.create');
-    this.manager.addDocument('en', 'help me build habit of %habit%', 'habit.create');
-
-    this.manager.addDocument('en', 'show my habits', 'habit.list');
-    this.manager.addDocument('en', 'list my habits', 'habit.list');
-    this.manager.addDocument('en', 'what habits am I tracking', 'habit.list');
-
-    this.manager.addDocument('en', 'log %habit% for today', 'habit.log');
-    this.manager.addDocument('en', 'completed %habit% today', 'habit.log');
-    this.manager.addDocument('en', 'i did %habit% today', 'habit.log');
-
-    // Add focus mode intents
-    this.manager.addDocument('en', 'start focus mode', 'focus.start');
-    this.manager.addDocument('en', 'begin focus session', 'focus.start');
-    this.manager.addDocument('en', 'help me focus', 'focus.start');
-    this.manager.addDocument('en', 'start pomodoro', 'focus.start');
-
-    this.manager.addDocument('en', 'end focus mode', 'focus.stop');
-    this.manager.addDocument('en', 'stop focus session', 'focus.stop');
-    this.manager.addDocument('en', 'finish pomodoro', 'focus.stop');
-
-    // Add email-related intents
-    this.manager.addDocument('en', 'send email to %recipient% about %subject%', 'email.send');
-    this.manager.addDocument('en', 'email %recipient% about %subject%', 'email.send');
-    this.manager.addDocument('en', 'compose email to %recipient%', 'email.send');
-
-    this.manager.addDocument('en', 'check my emails', 'email.check');
-    this.manager.addDocument('en', 'any new emails', 'email.check');
-    this.manager.addDocument('en', 'show me my inbox', 'email.check');
-
-    // Add calendar-related intents
-    this.manager.addDocument('en', 'schedule meeting with %person% on %date%', 'calendar.schedule');
-    this.manager.addDocument('en', 'add event %event% on %date%', 'calendar.schedule');
-    this.manager.addDocument('en', 'create appointment for %event% on %date%', 'calendar.schedule');
-
-    this.manager.addDocument('en', 'show my calendar', 'calendar.view');
-    this.manager.addDocument('en', 'what meetings do I have today', 'calendar.view.today');
-    this.manager.addDocument('en', 'show my schedule for tomorrow', 'calendar.view.tomorrow');
-
-    // Add sentiment analysis intents
-    this.manager.addDocument('en', 'how am I feeling', 'sentiment.analyze');
-    this.manager.addDocument('en', 'analyze my mood', 'sentiment.analyze');
-    this.manager.addDocument('en', 'detect my sentiment', 'sentiment.analyze');
-
-    // Add task suggestion intents
-    this.manager.addDocument('en', 'suggest tasks', 'task.suggest');
-    this.manager.addDocument('en', 'what should I work on', 'task.suggest');
-    this.manager.addDocument('en', 'recommend tasks', 'task.suggest');
-    this.manager.addDocument('en', 'what should I do next', 'task.suggest');
+    // Command patterns per intent, shared with the Python AI service's
+    // completion index. %slot% marks free text such as a task title.
+    for (const [intent, patterns] of Object.entries(commands)) {
+      for (const pattern of patterns) {
+        this.manager.addDocument('en', pattern, intent);
+      }
+    }
 
     // Add responses
     this.manager.addAnswer('en', 'task.create', 'I\'ll create a task for: {{task}}');
@@ -120,7 +61,7 @@ class NLPService {
     this.initialized = true;
   }
 
-  async process(text) {
+  async process(text, userId = null) {
     if (!this.initialized) {
       await this.init();
     }
@@ -158,8 +99,14 @@ class NLPService {
         
         // Get text completion suggestions for ambiguous commands
         if (result.score < 0.7) {
-          const completion = await pythonAI.predictCompletion(text);
-          enhancedResult.suggestedCompletion = completion;
+          // Streamed, so GPT-2 stops at the deadline instead of running to max length
+          const completion = await pythonAI.streamCompletion(text, undefined, {
+            ...(userId != null && { user_id: userId }),
+            deadline_ms: COMPLETION_DEADLINE_MS
+          });
+          if (completion.completion) {
+            enhancedResult.suggestedCompletion = text + completion.completion;
+          }
         }
         
       } catch (error) {
@@ -52,11 +52,15 @@ class PythonAIClient {
   /**
    * Predict completion for text
    * @param {string} text - The text to complete
+   * @param {string} userId - Optional user whose past task titles can complete the text
    * @returns {Promise<string>} - The predicted completion
    */
-  async predictCompletion(text) {
+  async predictCompletion(text, userId = null) {
     try {
-      const response = await axios.post(`${PYTHON_AI_URL}/api/predict-completion`, { text });
+      const response = await axios.post(`${PYTHON_AI_URL}/api/predict-completion`, {
+        text,
+        ...(userId != null && { user_id: userId })
+      });
       return response.data.completion;
     } catch (error) {
       console.error('Error predicting completion with Python AI service:', error.message);
@@ -64,6 +68,69 @@ class PythonAIClient {
     }
   }
 
+  /**
+   * Stream a completion, calling onToken as each piece is generated
+   * @param {string} text - The text to complete
+   * @param {Function} onToken - Called with each generated piece of text
+   * @param {Object} options - user_id, max_new_tokens, deadline_ms and stop_at_sentence_end
+   * @returns {Promise<Object>} - The final event: completion, reason and partial
+   */
+  async streamCompletion(text, onToken = () => {}, options = {}) {
+    try {
+      const response = await axios.post(
+        `${PYTHON_AI_URL}/api/predict-completion`,
+        { text, stream: true, ...options },
+        { responseType: 'stream' }
+      );
+
+      return await new Promise((resolve, reject) => {
+        let buffer = '';
+        let result = { completion: '', reason: 'error', partial: true };
+        response.data.on('data', (chunk) => {
+          buffer += chunk.toString();
+          const lines = buffer.split('\n');
+          buffer = lines.pop();
+          try {
+            for (const line of lines) {
+              if (!line.trim()) continue;
+              const event = JSON.parse(line);
+              if (event.done) {
+                result = event;
+              } else {
+                onToken(event.token);
+              }
+            }
+          } catch (error) {
+            // A malformed line (or a failing onToken) ends the stream
+            response.data.destroy();
+            reject(error);
+          }
+        });
+        response.data.on('end', () => resolve(result));
+        response.data.on('error', reject);
+      });
+    } catch (error) {
+      console.error('Error streaming completion from Python AI service:', error.message);
+      return { completion: '', reason: 'error', partial: true };
+    }
+  }
+
+  /**
+   * Add a newly created task title to the user's command completions
+   * @param {string} userId - The user ID
+   * @param {string} title - The task title
+   * @returns {Promise<boolean>} - True if the title was recorded
+   */
+  async recordTaskTitle(userId, title) {
+    try {
+      await axios.post(`${PYTHON_AI_URL}/api/task-titles`, { user_id: userId, title });
+      return true;
+    } catch (error) {
+      console.error('Error recording task title with Python AI service:', error.message);
+      return false;
+    }
+  }
+
   /**
    * Get task suggestions for a user
    * @param {string} userId - The user ID